@@ -0,0 +1,312 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, Sequence
+
+import asyncpg
+from opentelemetry.metrics import CallbackOptions, Observation
+from opentelemetry.trace import Status, StatusCode, SpanKind
+
+from internal import interface, common
+
+# :name -> $n, при этом не трогаем приведение типов вида ::text
+PLACEHOLDER_PATTERN = re.compile(r"(?<![:\w]):([a-zA-Z_]\w*)")
+
+
+def compile_query(query: str) -> tuple[str, tuple[str, ...]]:
+    params: list[str] = []
+
+    def _replace(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in params:
+            params.append(name)
+        return f"${params.index(name) + 1}"
+
+    return PLACEHOLDER_PATTERN.sub(_replace, query), tuple(params)
+
+
+class Row:
+    """Обертка над asyncpg.Record с доступом по атрибутам, как у строк SQLAlchemy."""
+    __slots__ = ("_record",)
+
+    def __init__(self, record: asyncpg.Record):
+        self._record = record
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._record[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, key: int | str) -> Any:
+        return self._record[key]
+
+    def __iter__(self):
+        return iter(self._record.values())
+
+    def __len__(self) -> int:
+        return len(self._record)
+
+
+class NativePG(interface.IDB):
+    """
+    IDB поверх пула asyncpg без ORM-сессий.
+    Запросы с :name переводятся в $n один раз и кешируются, подготовленные выражения
+    кешируются на каждом соединении пула (statement_cache_size).
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            db_user,
+            db_pass,
+            db_host,
+            db_port,
+            db_name,
+            queries: list[str] = None,
+            db_replica_host: str = None,
+            min_pool_size: int = 5,
+            max_pool_size: int = 30,
+            statement_cache_size: int = 256,
+            acquire_timeout: float = 30,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.dsn = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
+        self.replica_dsn = None
+        if db_replica_host:
+            self.replica_dsn = f"postgresql://{db_user}:{db_pass}@{db_replica_host}:{db_port}/{db_name}"
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
+        self.statement_cache_size = statement_cache_size
+        self.acquire_timeout = acquire_timeout
+
+        self.pool: asyncpg.Pool | None = None
+        self.replica_pool: asyncpg.Pool | None = None
+        self.pool_lock = asyncio.Lock()
+
+        self.compiled_queries: dict[str, tuple[str, tuple[str, ...]]] = {}
+        for query in queries or []:
+            self._compile(query)
+
+        self.meter.create_observable_gauge(
+            name=common.DB_POOL_CHECKED_OUT_METRIC,
+            callbacks=[self._observe_checked_out],
+            description="Number of connections currently checked out from the pool",
+            unit="1"
+        )
+        self.meter.create_observable_gauge(
+            name=common.DB_POOL_OVERFLOW_METRIC,
+            callbacks=[self._observe_overflow],
+            description="Number of connections opened above min_pool_size",
+            unit="1"
+        )
+        self.acquire_duration = self.meter.create_histogram(
+            name=common.DB_POOL_ACQUIRE_DURATION_METRIC,
+            description="Time spent waiting for a connection from the pool",
+            unit="s"
+        )
+        self.pool_timeout_counter = self.meter.create_counter(
+            name=common.DB_POOL_TIMEOUT_TOTAL_METRIC,
+            description="Total count of pool acquire timeouts",
+            unit="1"
+        )
+
+    async def insert(self, query: str, query_params: dict) -> int:
+        with self.tracer.start_as_current_span(
+                "NativePG.insert",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                sql, args = self._bind(query, query_params)
+                async with self._connection() as conn:
+                    result = await conn.fetchval(sql, *args)
+
+                span.set_status(Status(StatusCode.OK))
+                return result
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def delete(self, query: str, query_params: dict) -> None:
+        with self.tracer.start_as_current_span(
+                "NativePG.delete",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                sql, args = self._bind(query, query_params)
+                async with self._connection() as conn:
+                    await conn.execute(sql, *args)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def update(self, query: str, query_params: dict) -> None:
+        with self.tracer.start_as_current_span(
+                "NativePG.update",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                sql, args = self._bind(query, query_params)
+                async with self._connection() as conn:
+                    await conn.execute(sql, *args)
+
+                span.set_status(Status(StatusCode.OK))
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def select(self, query: str, query_params: dict) -> Sequence[Any]:
+        with self.tracer.start_as_current_span(
+                "NativePG.select",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                sql, args = self._bind(query, query_params)
+                async with self._connection() as conn:
+                    records = await conn.fetch(sql, *args)
+
+                span.set_status(Status(StatusCode.OK))
+                return [Row(record) for record in records]
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def execute_returning(self, query: str, query_params: dict) -> Sequence[Any]:
+        with self.tracer.start_as_current_span(
+                "NativePG.execute_returning",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                sql, args = self._bind(query, query_params)
+                async with self._connection() as conn:
+                    records = await conn.fetch(sql, *args)
+
+                span.set_status(Status(StatusCode.OK))
+                return [Row(record) for record in records]
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def read_only_select(self, query: str, query_params: dict) -> Sequence[Any]:
+        with self.tracer.start_as_current_span(
+                "NativePG.read_only_select",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                # Вне явной транзакции asyncpg и так работает в autocommit, отличается только пул
+                sql, args = self._bind(query, query_params)
+                async with self._connection(replica=True) as conn:
+                    records = await conn.fetch(sql, *args)
+
+                span.set_status(Status(StatusCode.OK))
+                return [Row(record) for record in records]
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def multi_query(
+            self,
+            queries: list[str],
+            autocommit: bool = False
+    ) -> None:
+        async with self._connection() as conn:
+            if autocommit:
+                for query in queries:
+                    await conn.execute(query)
+                return None
+
+            async with conn.transaction():
+                for query in queries:
+                    await conn.execute(query)
+        return None
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+        if self.replica_pool is not None:
+            await self.replica_pool.close()
+            self.replica_pool = None
+
+    @asynccontextmanager
+    async def _connection(self, replica: bool = False) -> AsyncIterator[asyncpg.Connection]:
+        if replica and self.replica_dsn is not None:
+            pool, pool_name = await self._get_replica_pool(), "replica"
+        else:
+            pool, pool_name = await self._get_pool(), "primary"
+
+        attributes = {common.DB_POOL_NAME_KEY: pool_name}
+        start_time = time.perf_counter()
+        try:
+            conn = await pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.pool_timeout_counter.add(1, attributes=attributes)
+            raise
+        finally:
+            self.acquire_duration.record(time.perf_counter() - start_time, attributes=attributes)
+
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    def _observe_checked_out(self, options: CallbackOptions) -> Iterable[Observation]:
+        for pool_name, pool in self._created_pools():
+            yield Observation(pool.get_size() - pool.get_idle_size(), {common.DB_POOL_NAME_KEY: pool_name})
+
+    def _observe_overflow(self, options: CallbackOptions) -> Iterable[Observation]:
+        for pool_name, pool in self._created_pools():
+            yield Observation(max(pool.get_size() - pool.get_min_size(), 0), {common.DB_POOL_NAME_KEY: pool_name})
+
+    def _created_pools(self) -> Iterable[tuple[str, asyncpg.Pool]]:
+        if self.pool is not None:
+            yield "primary", self.pool
+        if self.replica_pool is not None:
+            yield "replica", self.replica_pool
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self.pool is None:
+            async with self.pool_lock:
+                if self.pool is None:
+                    self.pool = await self._create_pool(self.dsn)
+        return self.pool
+
+    async def _get_replica_pool(self) -> asyncpg.Pool:
+        if self.replica_dsn is None:
+            return await self._get_pool()
+
+        if self.replica_pool is None:
+            async with self.pool_lock:
+                if self.replica_pool is None:
+                    self.replica_pool = await self._create_pool(self.replica_dsn)
+        return self.replica_pool
+
+    async def _create_pool(self, dsn: str) -> asyncpg.Pool:
+        return await asyncpg.create_pool(
+            dsn,
+            min_size=self.min_pool_size,
+            max_size=self.max_pool_size,
+            statement_cache_size=self.statement_cache_size,
+            max_inactive_connection_lifetime=300,
+        )
+
+    def _compile(self, query: str) -> tuple[str, tuple[str, ...]]:
+        compiled = self.compiled_queries.get(query)
+        if compiled is None:
+            compiled = compile_query(query)
+            self.compiled_queries[query] = compiled
+        return compiled
+
+    def _bind(self, query: str, query_params: dict) -> tuple[str, list[Any]]:
+        sql, params = self._compile(query)
+        return sql, [query_params[name] for name in params]
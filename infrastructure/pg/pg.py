@@ -1,28 +1,38 @@
-from typing import Any, Sequence
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable, Sequence
 
+from opentelemetry.metrics import CallbackOptions, Observation
 from opentelemetry.trace import Status, StatusCode, SpanKind
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from internal import interface
+from internal import interface, common
 
 
-def NewPool(
+def NewEngine(
         db_user,
         db_pass,
         db_host
         , db_port,
-        db_name
-):
-    async_engine = create_async_engine(
+        db_name,
+        pool_size: int = 15,
+        max_overflow: int = 15,
+        pool_timeout: float = 30,
+) -> AsyncEngine:
+    return create_async_engine(
         f"postgresql+asyncpg://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}",
         echo=False,
         future=True,
-        pool_size=15,
-        max_overflow=15,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
         pool_recycle=300
     )
 
+
+def NewPool(async_engine: AsyncEngine):
     pool = async_sessionmaker(
         bind=async_engine,
         class_=AsyncSession,
@@ -34,9 +44,61 @@ def NewPool(
 
 class PG(interface.IDB):
 
-    def __init__(self, tel: interface.ITelemetry, db_user, db_pass, db_host, db_port, db_name):
-        self.pool = NewPool(db_user, db_pass, db_host, db_port, db_name)
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            db_user,
+            db_pass,
+            db_host,
+            db_port,
+            db_name,
+            db_replica_host: str = None,
+            pool_size: int = 15,
+            max_overflow: int = 15,
+            pool_timeout: float = 30,
+    ):
+        self.engine = NewEngine(db_user, db_pass, db_host, db_port, db_name, pool_size, max_overflow, pool_timeout)
+        self.pool = NewPool(self.engine)
+
+        # Чтение без BEGIN/COMMIT: autocommit-соединения реплики, либо основного пула
+        read_engine = self.engine
+        self.read_pool_name = "primary"
+        if db_replica_host:
+            read_engine = NewEngine(
+                db_user, db_pass, db_replica_host, db_port, db_name, pool_size, max_overflow, pool_timeout
+            )
+            self.read_pool_name = "replica"
+        self.read_engine = read_engine.execution_options(isolation_level="AUTOCOMMIT")
+
         self.tracer = tel.tracer()
+        self.meter = tel.meter()
+
+        self.pools = {"primary": self.engine}
+        if db_replica_host:
+            self.pools["replica"] = read_engine
+
+        self.meter.create_observable_gauge(
+            name=common.DB_POOL_CHECKED_OUT_METRIC,
+            callbacks=[self._observe_checked_out],
+            description="Number of connections currently checked out from the pool",
+            unit="1"
+        )
+        self.meter.create_observable_gauge(
+            name=common.DB_POOL_OVERFLOW_METRIC,
+            callbacks=[self._observe_overflow],
+            description="Number of overflow connections opened above pool_size",
+            unit="1"
+        )
+        self.acquire_duration = self.meter.create_histogram(
+            name=common.DB_POOL_ACQUIRE_DURATION_METRIC,
+            description="Time spent waiting for a connection from the pool",
+            unit="s"
+        )
+        self.pool_timeout_counter = self.meter.create_counter(
+            name=common.DB_POOL_TIMEOUT_TOTAL_METRIC,
+            description="Total count of pool checkout timeouts",
+            unit="1"
+        )
 
     async def insert(self, query: str, query_params: dict) -> int:
         with self.tracer.start_as_current_span(
@@ -44,7 +106,7 @@ class PG(interface.IDB):
                 kind=SpanKind.CLIENT,
         ) as span:
             try:
-                async with self.pool() as session:
+                async with self._session() as session:
                     result = await session.execute(text(query), query_params)
                     rows = result.all()
                     await session.commit()
@@ -62,7 +124,7 @@ class PG(interface.IDB):
                 kind=SpanKind.CLIENT,
         ) as span:
             try:
-                async with self.pool() as session:
+                async with self._session() as session:
                     await session.execute(text(query), query_params)
                     await session.commit()
                     span.set_status(Status(StatusCode.OK))
@@ -77,7 +139,7 @@ class PG(interface.IDB):
                 kind=SpanKind.CLIENT,
         ) as span:
             try:
-                async with self.pool() as session:
+                async with self._session() as session:
                     await session.execute(text(query), query_params)
                     await session.commit()
                     span.set_status(Status(StatusCode.OK))
@@ -92,9 +154,42 @@ class PG(interface.IDB):
                 kind=SpanKind.CLIENT,
         ) as span:
             try:
-                async with self.pool() as session:
+                async with self._session() as session:
+                    result = await session.execute(text(query), query_params)
+                    await session.commit()
+                    rows = result.all()
+                    span.set_status(Status(StatusCode.OK))
+                    return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def execute_returning(self, query: str, query_params: dict) -> Sequence[Any]:
+        with self.tracer.start_as_current_span(
+                "PG.execute_returning",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                async with self._session() as session:
                     result = await session.execute(text(query), query_params)
+                    rows = result.all()
                     await session.commit()
+                    span.set_status(Status(StatusCode.OK))
+                    return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                raise err
+
+    async def read_only_select(self, query: str, query_params: dict) -> Sequence[Any]:
+        with self.tracer.start_as_current_span(
+                "PG.read_only_select",
+                kind=SpanKind.CLIENT,
+        ) as span:
+            try:
+                async with self._read_connection() as conn:
+                    result = await conn.execute(text(query), query_params)
                     rows = result.all()
                     span.set_status(Status(StatusCode.OK))
                     return rows
@@ -105,11 +200,59 @@ class PG(interface.IDB):
 
     async def multi_query(
             self,
-            queries: list[str]
+            queries: list[str],
+            autocommit: bool = False
     ) -> None:
+        if autocommit:
+            # Для запросов, которые нельзя выполнять в транзакции (CREATE INDEX CONCURRENTLY и т.п.)
+            async with self._connection(self.engine, "primary") as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                for query in queries:
+                    await conn.execute(text(query))
+            return None
 
-        async with self.pool() as session:
+        async with self._session() as session:
             for query in queries:
                 await session.execute(text(query))
             await session.commit()
         return None
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        async with self.pool() as session:
+            # Соединение берется явно, чтобы замерить ожидание пула отдельно от самого запроса
+            await self._acquire("primary", session.connection())
+            yield session
+
+    @asynccontextmanager
+    async def _read_connection(self) -> AsyncIterator[AsyncConnection]:
+        async with self._connection(self.read_engine, self.read_pool_name) as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def _connection(self, engine: AsyncEngine, pool_name: str) -> AsyncIterator[AsyncConnection]:
+        conn = await self._acquire(pool_name, engine.connect())
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+    async def _acquire(self, pool_name: str, awaitable) -> Any:
+        attributes = {common.DB_POOL_NAME_KEY: pool_name}
+        start_time = time.perf_counter()
+        try:
+            return await awaitable
+        except PoolTimeoutError:
+            self.pool_timeout_counter.add(1, attributes=attributes)
+            raise
+        finally:
+            self.acquire_duration.record(time.perf_counter() - start_time, attributes=attributes)
+
+    def _observe_checked_out(self, options: CallbackOptions) -> Iterable[Observation]:
+        for pool_name, engine in self.pools.items():
+            yield Observation(engine.sync_engine.pool.checkedout(), {common.DB_POOL_NAME_KEY: pool_name})
+
+    def _observe_overflow(self, options: CallbackOptions) -> Iterable[Observation]:
+        for pool_name, engine in self.pools.items():
+            # QueuePool.overflow() отрицателен, пока не открыты все pool_size соединений
+            yield Observation(max(engine.sync_engine.pool.overflow(), 0), {common.DB_POOL_NAME_KEY: pool_name})
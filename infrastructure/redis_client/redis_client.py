@@ -57,6 +57,13 @@ class RedisClient(interface.IRedis):
         except Exception as e:
             return default
 
+    async def delete(self, *keys: str) -> int:
+        try:
+            client = await self.get_async_client()
+            return await client.delete(*keys)
+        except Exception as e:
+            raise e
+
     async def get_async_client(self) -> aioredis.Redis:
         if self.async_client is None:
             self.async_pool = aioredis.ConnectionPool.from_url(
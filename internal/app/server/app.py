@@ -7,6 +7,8 @@ def NewServer(
         db: interface.IDB,
         http_middleware: interface.IHttpMiddleware,
         tg_webhook_controller: interface.ITelegramWebhookController,
+        file_cache_service: interface.IFileCacheService,
+        state_service: interface.IStateService,
         prefix: str
 ):
     app = FastAPI(
@@ -18,6 +20,8 @@ def NewServer(
 
     include_db_handler(app, db, prefix)
     include_tg_webhook(app, tg_webhook_controller, prefix)
+    include_file_cache_preload(app, file_cache_service)
+    include_state_write_behind_flush(app, state_service)
 
     return app
 
@@ -64,6 +68,19 @@ def include_tg_webhook(
         tg_webhook_controller.set_cache_file,
         methods=["POST"]
     )
+    app.add_api_route(
+        prefix + "/file/cache/bulk",
+        tg_webhook_controller.set_cache_files,
+        methods=["POST"]
+    )
+
+
+def include_file_cache_preload(app: FastAPI, file_cache_service: interface.IFileCacheService):
+    app.add_event_handler("startup", file_cache_service.preload)
+
+
+def include_state_write_behind_flush(app: FastAPI, state_service: interface.IStateService):
+    app.add_event_handler("shutdown", state_service.flush_pending_writes)
 
 
 def include_db_handler(app: FastAPI, db: interface.IDB, prefix):
@@ -57,6 +57,13 @@ def include_tg_middleware(
     dp.update.middleware(tg_middleware.logger_middleware03)
 
 
+def include_tg_state_middleware(
+        dp: Dispatcher,
+        tg_middleware: interface.ITelegramMiddleware,
+):
+    dp.update.middleware(tg_middleware.state_middleware04)
+
+
 def include_command_handlers(
         dp: Dispatcher,
         command_controller: interface.ICommandController,
@@ -47,6 +47,50 @@ ERROR_JOIN_CHAT_TOTAL_METRIC = "telegram.server.error.join_chat.total"
 MESSAGE_DURATION_METRIC = "telegram.server.message.duration"
 ACTIVE_MESSAGES_METRIC = "telegram.server.active_messages"
 
+STATE_CACHE_HIT_TOTAL_METRIC = "db.state_cache.hit.total"
+STATE_CACHE_MISS_TOTAL_METRIC = "db.state_cache.miss.total"
+
+FILE_CACHE_HIT_TOTAL_METRIC = "db.file_cache.hit.total"
+FILE_CACHE_MISS_TOTAL_METRIC = "db.file_cache.miss.total"
+
+CONTENT_STATS_SEED_TOTAL_METRIC = "content_stats.seed.total"
+CONTENT_STATS_DRIFT_TOTAL_METRIC = "content_stats.drift.total"
+
+CACHE_TIER_KEY = "cache.tier"
+
+DB_POOL_CHECKED_OUT_METRIC = "db.client.connections.checked_out"
+DB_POOL_OVERFLOW_METRIC = "db.client.connections.overflow"
+DB_POOL_ACQUIRE_DURATION_METRIC = "db.client.connections.wait_time"
+DB_POOL_TIMEOUT_TOTAL_METRIC = "db.client.connections.timeouts"
+DB_POOL_NAME_KEY = "db.client.connections.pool.name"
+
+HTTP_CLIENT_ACTIVE_REQUESTS_METRIC = "http.client.active_requests"
+HTTP_CLIENT_POOL_CONNECTIONS_METRIC = "http.client.open_connections"
+HTTP_CLIENT_POOL_KEEPALIVE_LIMIT_METRIC = "http.client.keepalive_limit"
+HTTP_CLIENT_POOL_TIMEOUT_TOTAL_METRIC = "http.client.pool.timeout.total"
+HTTP_CLIENT_CACHE_REQUEST_TOTAL_METRIC = "http.client.cache.request.total"
+HTTP_CLIENT_CACHE_SIZE_METRIC = "http.client.cache.size"
+HTTP_CLIENT_SINGLEFLIGHT_REQUEST_TOTAL_METRIC = "http.client.singleflight.request.total"
+HTTP_CLIENT_CIRCUIT_BREAKER_STATE_METRIC = "http.client.circuit_breaker.state"
+HTTP_CLIENT_HEDGE_REQUEST_TOTAL_METRIC = "http.client.hedge.request.total"
+HTTP_CLIENT_HEDGE_LATENCY_SAVED_METRIC = "http.client.hedge.latency_saved"
+HTTP_CLIENT_CONCURRENCY_LIMIT_METRIC = "http.client.concurrency.limit"
+HTTP_CLIENT_CONCURRENCY_QUEUE_DEPTH_METRIC = "http.client.concurrency.queue_depth"
+HTTP_CLIENT_CONCURRENCY_REJECTED_TOTAL_METRIC = "http.client.concurrency.rejected.total"
+HTTP_CLIENT_RETRY_TOTAL_METRIC = "http.client.retry.total"
+HTTP_CLIENT_RETRY_BUDGET_EXHAUSTED_TOTAL_METRIC = "http.client.retry_budget.exhausted.total"
+HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL_METRIC = "http.client.deadline_exceeded.total"
+HTTP_CLIENT_ENTITY_CACHE_HIT_TOTAL_METRIC = "http.client.entity_cache.hit.total"
+HTTP_CLIENT_ENTITY_CACHE_MISS_TOTAL_METRIC = "http.client.entity_cache.miss.total"
+HTTP_CLIENT_UPSTREAM_KEY = "server.address"
+HTTP_CLIENT_ROUTE_KEY = "http.route"
+CACHE_RESULT_KEY = "cache.result"
+SINGLEFLIGHT_SHARED_KEY = "singleflight.shared"
+HEDGE_WINNER_KEY = "hedge.winner"
+RETRY_BUDGET_KEY = "retry_budget"
+ENTITY_CACHE_ENTITY_KEY = "entity_cache.entity"
+HTTP_CLIENT_CONNECTION_STATE_KEY = "http.connection.state"
+
 TRACE_ID_HEADER = "X-Trace-ID"
 SPAN_ID_HEADER = "X-Span-ID"
 
@@ -22,6 +22,52 @@ class Config:
         self.db_name = os.getenv("LOOM_TG_BOT_POSTGRES_DB_NAME", "hr_interview")
         self.db_user = os.getenv("LOOM_TG_BOT_POSTGRES_USER", "postgres")
         self.db_pass = os.getenv("LOOM_TG_BOT_POSTGRES_PASSWORD", "password")
+        # Реплика для read_only_select, пусто — читаем с основного инстанса
+        self.db_replica_host = os.getenv("LOOM_TG_BOT_POSTGRES_REPLICA_CONTAINER_NAME", "")
+        # sqlalchemy — PG через AsyncSession, asyncpg — NativePG поверх пула asyncpg
+        self.db_driver = os.getenv("LOOM_TG_BOT_POSTGRES_DRIVER", "sqlalchemy")
+        self.db_statement_cache_size = int(os.getenv("LOOM_TG_BOT_POSTGRES_STATEMENT_CACHE_SIZE", "256"))
+        # Размер пула: pool_size постоянных соединений и до max_overflow сверху
+        self.db_pool_size = int(os.getenv("LOOM_TG_BOT_POSTGRES_POOL_SIZE", "15"))
+        self.db_max_overflow = int(os.getenv("LOOM_TG_BOT_POSTGRES_MAX_OVERFLOW", "15"))
+        self.db_pool_timeout = float(os.getenv("LOOM_TG_BOT_POSTGRES_POOL_TIMEOUT", "30"))
+
+        # Пулы соединений HTTP-клиентов к loom-сервисам
+        self.http_max_connections = int(os.getenv("LOOM_TG_BOT_HTTP_MAX_CONNECTIONS", "100"))
+        self.http_max_keepalive_connections = int(os.getenv("LOOM_TG_BOT_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.http_pool_autotune = os.getenv("LOOM_TG_BOT_HTTP_POOL_AUTOTUNE", "false").lower() == "true"
+        # Начальный адаптивный лимит одновременных запросов к каждому сервису, 0 — без лимита
+        self.http_concurrency_limit = int(os.getenv("LOOM_TG_BOT_HTTP_CONCURRENCY_LIMIT", "50"))
+        self.http_concurrency_queue_size = int(os.getenv("LOOM_TG_BOT_HTTP_CONCURRENCY_QUEUE_SIZE", "100"))
+        self.http_concurrency_queue_timeout = float(os.getenv("LOOM_TG_BOT_HTTP_CONCURRENCY_QUEUE_TIMEOUT", "1"))
+        # Число попыток для идемпотентных запросов и доля успешного трафика, которую могут занять ретраи
+        self.http_retry_count = int(os.getenv("LOOM_TG_BOT_HTTP_RETRY_COUNT", "3"))
+        self.http_retry_budget_ratio = float(os.getenv("LOOM_TG_BOT_HTTP_RETRY_BUDGET_RATIO", "0.1"))
+        # Бюджет времени на обработку апдейта для вызовов loom-сервисов и отдельный — для генерации
+        self.update_deadline = float(os.getenv("LOOM_TG_BOT_UPDATE_DEADLINE", "30"))
+        self.generation_deadline = float(os.getenv("LOOM_TG_BOT_GENERATION_DEADLINE", "240"))
+        # Кеш GET-ответов loom-сервисов в байтах, 0 — выключен
+        self.http_response_cache_max_bytes = int(os.getenv("LOOM_TG_BOT_HTTP_RESPONSE_CACHE_MAX_BYTES", "0"))
+        # Кеш декодированных сущностей loom-сервисов в записях, 0 — выключен
+        self.http_entity_cache_max_size = int(os.getenv("LOOM_TG_BOT_HTTP_ENTITY_CACHE_MAX_SIZE", "0"))
+        # Доля трафика хеджируемых GET, на которую разрешено отправлять дубли, 0 — без хеджирования
+        self.http_hedge_max_ratio = float(os.getenv("LOOM_TG_BOT_HTTP_HEDGE_MAX_RATIO", "0.05"))
+
+        # Кеш состояний пользователей
+        self.state_cache_max_size = int(os.getenv("LOOM_TG_BOT_STATE_CACHE_MAX_SIZE", "10000"))
+        self.state_cache_ttl = int(os.getenv("LOOM_TG_BOT_STATE_CACHE_TTL", "60"))
+        self.state_cache_redis_enabled = os.getenv("LOOM_TG_BOT_STATE_CACHE_REDIS_ENABLED", "false").lower() == "true"
+        self.state_cache_redis_db = int(os.getenv("LOOM_TG_BOT_STATE_CACHE_REDIS_DB", "3"))
+        # Интервал пакетной записи флагов состояний в секундах, 0 — писать сразу
+        self.state_write_behind_interval = float(os.getenv("LOOM_TG_BOT_STATE_WRITE_BEHIND_INTERVAL", "1"))
+
+        # Кеш file_id видео в Telegram
+        self.file_cache_max_size = int(os.getenv("LOOM_TG_BOT_FILE_CACHE_MAX_SIZE", "10000"))
+        self.file_cache_preload_size = int(os.getenv("LOOM_TG_BOT_FILE_CACHE_PRELOAD_SIZE", "1000"))
+
+        # Счетчики контента по статусам для меню контента
+        self.content_stats_max_organizations = int(os.getenv("LOOM_TG_BOT_CONTENT_STATS_MAX_ORGANIZATIONS", "10000"))
+        self.content_stats_reconcile_interval = float(os.getenv("LOOM_TG_BOT_CONTENT_STATS_RECONCILE_INTERVAL", "600"))
 
         # Настройки телеметрии
         self.alert_tg_bot_token = os.getenv("LOOM_ALERT_TG_BOT_TOKEN", "")
@@ -19,6 +19,8 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
             dp: Dispatcher,
             bot: Bot,
             state_service: interface.IStateService,
+            file_cache_service: interface.IFileCacheService,
+            content_stats_service: interface.IContentStatsService,
             dialog_bg_factory: BgManagerFactory,
             domain: str,
             prefix: str,
@@ -30,6 +32,8 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
         self.dp = dp
         self.bot = bot
         self.state_service = state_service
+        self.file_cache_service = file_cache_service
+        self.content_stats_service = content_stats_service
         self.dialog_bg_factory = dialog_bg_factory
 
         self.domain = domain
@@ -174,6 +178,15 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                     video_count=body.video_count,
                 )
 
+                # Нарезки vizard сохраняются черновиками автора генерации — меню контента видит их сразу, без сверки
+                self.content_stats_service.record_created(
+                    user_state.organization_id,
+                    model.VIDEO_CUT_CONTENT_TYPE,
+                    user_state.account_id,
+                    "draft",
+                    count=body.video_count,
+                )
+
                 if user_state.can_show_alerts:
                     dialog_manager = self.dialog_bg_factory.bg(
                         bot=self.bot,
@@ -216,7 +229,7 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                     )
 
                 # Сохраняем файл в кеш
-                await self.state_service.set_cache_file(
+                await self.file_cache_service.set_cache_file(
                     filename=body.filename,
                     file_id=body.file_id
                 )
@@ -250,6 +263,54 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                     status_code=500
                 )
 
+    async def set_cache_files(
+            self,
+            body: SetCacheFilesBody,
+    ) -> JSONResponse:
+        with self.tracer.start_as_current_span(
+                "TelegramWebhookController.set_cache_files",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                # Проверяем секретный ключ
+                if body.interserver_secret_key != self.interserver_secret_key:
+                    return JSONResponse(
+                        content={"status": "error", "message": "Wrong secret token !"},
+                        status_code=401
+                    )
+
+                # Повторы filename в одном запросе схлопываем — побеждает последний file_id
+                files = {item.filename: item.file_id for item in body.files}
+                await self.file_cache_service.set_cache_files(files)
+
+                self.logger.info(
+                    "Файлы сохранены в кеш",
+                    {
+                        "files_count": len(files),
+                    }
+                )
+
+                span.set_status(Status(StatusCode.OK))
+                return JSONResponse(
+                    content={"status": "ok", "message": "Files cached successfully"},
+                    status_code=200
+                )
+
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(Status(StatusCode.ERROR, str(err)))
+                self.logger.error(
+                    "Ошибка при сохранении файлов в кеш",
+                    {
+                        "files_count": len(body.files),
+                        "error": str(err)
+                    }
+                )
+                return JSONResponse(
+                    content={"status": "error", "message": "Failed to cache files"},
+                    status_code=500
+                )
+
     def _format_notification_message(self, body: EmployeeNotificationBody) -> str:
         role_names = {
             "employee": "Сотрудник",
@@ -279,13 +340,13 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                     {common.TELEGRAM_CHAT_ID_KEY: tg_chat_id}
                 )
 
-                # Получаем или создаем состояние пользователя
-                user_state = await self.state_service.state_by_id(tg_chat_id)
-                if not user_state:
-                    await self.state_service.create_state(tg_chat_id, tg_username)
-                    user_state = await self.state_service.state_by_id(tg_chat_id)
-
-                user_state = user_state[0]
+                # Получаем или создаем состояние пользователя сразу с флагами восстановления
+                user_state = await self.state_service.get_or_create_state(
+                    tg_chat_id,
+                    tg_username,
+                    show_error_recovery=True,
+                    can_show_alerts=True
+                )
 
                 # Создаем dialog_manager для восстановления
                 dialog_manager = self.dialog_bg_factory.bg(
@@ -305,12 +366,6 @@ class TelegramWebhookController(interface.ITelegramWebhookController):
                     target_state = model.MainMenuStates.main_menu
                     self.logger.info(f"Восстанавливаем в главное меню для пользователя {tg_chat_id}")
 
-                await self.state_service.change_user_state(
-                    state_id=user_state.id,
-                    show_error_recovery=True,
-                    can_show_alerts=True
-                )
-
                 # Запускаем соответствующий диалог
                 await dialog_manager.start(
                     target_state,
@@ -13,6 +13,14 @@ class SetCacheFileBody(BaseModel):
     filename: str
     file_id: str
 
+class CacheFileItem(BaseModel):
+    filename: str
+    file_id: str
+
+class SetCacheFilesBody(BaseModel):
+    interserver_secret_key: str
+    files: list[CacheFileItem]
+
 class NotifyVizardVideoCutGenerated(BaseModel):
     account_id: int
     youtube_video_reference: str
@@ -32,16 +32,10 @@ class CommandController(interface.ICommandController):
 
                 tg_chat_id = dialog_manager.event.chat.id
 
-                user_state = await self.state_service.state_by_id(tg_chat_id)
-                if not user_state:
-                    tg_username = message.from_user.username if message.from_user.username else "отсутвует username"
-                    await self.state_service.create_state(tg_chat_id, tg_username)
-                    user_state = await self.state_service.state_by_id(tg_chat_id)
-
-                user_state = user_state[0]
-
-                await self.state_service.change_user_state(
-                    state_id=user_state.id,
+                tg_username = message.from_user.username if message.from_user.username else "отсутвует username"
+                user_state = await self.state_service.get_or_create_state(
+                    tg_chat_id,
+                    tg_username,
                     show_error_recovery=False
                 )
 
@@ -9,6 +9,7 @@ from aiogram_dialog import StartMode, BgManagerFactory
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, common, model
+from pkg.client.deadline import deadline_scope
 
 
 class TgMiddleware(interface.ITelegramMiddleware):
@@ -18,6 +19,8 @@ class TgMiddleware(interface.ITelegramMiddleware):
             state_service: interface.IStateService,
             bot: Bot,
             dialog_bg_factory: BgManagerFactory,
+            update_deadline: float = 30,
+            generation_deadline: float = 240,
     ):
         self.tracer = tel.tracer()
         self.meter = tel.meter()
@@ -26,6 +29,8 @@ class TgMiddleware(interface.ITelegramMiddleware):
         self.state_service = state_service
         self.bot = bot
         self.dialog_bg_factory = dialog_bg_factory
+        self.update_deadline = update_deadline
+        self.generation_deadline = generation_deadline
 
         self.ok_message_counter = self.meter.create_counter(
             name=common.OK_MESSAGE_TOTAL_METRIC,
@@ -205,6 +210,40 @@ class TgMiddleware(interface.ITelegramMiddleware):
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
 
+    async def state_middleware04(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ):
+        # Все вызовы loom-сервисов в рамках апдейта укладываются в общий бюджет, генерация получает свой, больший.
+        # Бюджет открывается здесь: это единственный middleware, который подключен всегда
+        with deadline_scope(self.update_deadline, self.generation_deadline):
+            tg_chat_id = self._get_chat_id(event)
+            if not tg_chat_id:
+                return await handler(event, data)
+
+            with self.state_service.update_scope():
+                with self.tracer.start_as_current_span(
+                        "TgMiddleware.state_middleware04",
+                        kind=SpanKind.INTERNAL,
+                        attributes={
+                            common.TELEGRAM_CHAT_ID_KEY: tg_chat_id,
+                        }
+                ) as span:
+                    try:
+                        # Один запрос состояния на update, геттеры и сервисы берут его из data
+                        user_state = await self.state_service.state_by_id(tg_chat_id)
+                        data["user_state"] = user_state[0] if user_state else None
+
+                        span.set_status(Status(StatusCode.OK))
+                    except Exception as err:
+                        span.record_exception(err)
+                        span.set_status(Status(StatusCode.ERROR, str(err)))
+                        raise err
+
+                return await handler(event, data)
+
     async def _recovery_start_functionality(self, tg_chat_id: int, tg_username: str):
         """
         Функция восстановления, повторяющая функционал команды /start
@@ -220,13 +259,12 @@ class TgMiddleware(interface.ITelegramMiddleware):
                     {common.TELEGRAM_CHAT_ID_KEY: tg_chat_id}
                 )
 
-                # Получаем или создаем состояние пользователя
-                user_state = await self.state_service.state_by_id(tg_chat_id)
-                if not user_state:
-                    await self.state_service.create_state(tg_chat_id, tg_username)
-                    user_state = await self.state_service.state_by_id(tg_chat_id)
-
-                user_state = user_state[0]
+                # Получаем или создаем состояние пользователя и восстанавливаем флаг показа уведомлений
+                user_state = await self.state_service.get_or_create_state(
+                    tg_chat_id,
+                    tg_username,
+                    can_show_alerts=True
+                )
 
                 # Создаем dialog_manager для восстановления
                 dialog_manager = self.dialog_bg_factory.bg(
@@ -252,12 +290,6 @@ class TgMiddleware(interface.ITelegramMiddleware):
                     mode=StartMode.RESET_STACK
                 )
 
-                # Восстанавливаем флаг показа уведомлений
-                await self.state_service.change_user_state(
-                    state_id=user_state.id,
-                    can_show_alerts=True
-                )
-
                 self.logger.info(
                     f"Пользователь {tg_chat_id} успешно восстановлен в состояние {target_state}",
                     {common.TELEGRAM_CHAT_ID_KEY: tg_chat_id}
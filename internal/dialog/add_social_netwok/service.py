@@ -9,6 +9,7 @@ from opentelemetry.trace import SpanKind, Status, StatusCode
 from sqlalchemy.util import await_only
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
 
 
 class AddSocialNetworkService(interface.IAddSocialNetworkService):
@@ -98,7 +99,7 @@ class AddSocialNetworkService(interface.IAddSocialNetworkService):
                 autoselect_checkbox: ManagedCheckbox = dialog_manager.find("autoselect_checkbox")
                 autoselect = autoselect_checkbox.is_checked() if autoselect_checkbox else False
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 await self.loom_content_client.create_telegram(
                     organization_id=state.organization_id,
@@ -133,7 +134,7 @@ class AddSocialNetworkService(interface.IAddSocialNetworkService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 await self.loom_content_client.delete_telegram(
                     organization_id=state.organization_id
@@ -168,7 +169,7 @@ class AddSocialNetworkService(interface.IAddSocialNetworkService):
                 new_value = checkbox.is_checked()
 
                 if "working_state" not in dialog_manager.dialog_data:
-                    state = await self._get_state(dialog_manager)
+                    state = await get_user_state(dialog_manager, self.state_repo)
                     social_networks = await self.loom_content_client.get_social_networks_by_organization(
                         organization_id=state.organization_id
                     )
@@ -210,7 +211,7 @@ class AddSocialNetworkService(interface.IAddSocialNetworkService):
                 autoselect = working_state.get("autoselect", None)
                 new_telegram_channel_username = working_state.get("telegram_channel_username", None)
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 await self.loom_content_client.update_telegram(
                     organization_id=state.organization_id,
@@ -335,13 +336,8 @@ class AddSocialNetworkService(interface.IAddSocialNetworkService):
                 raise
 
     async def _check_alerts(self, dialog_manager: DialogManager) -> bool:
-        state = await self._get_state(dialog_manager)
-        await self.state_repo.change_user_state(
-            state_id=state.id,
-            can_show_alerts=True
-        )
-
-        vizard_alerts = await self.state_repo.get_vizard_video_cut_alert_by_state_id(
+        state = await get_user_state(dialog_manager, self.state_repo)
+        vizard_alerts = await self.state_repo.enable_alerts_and_get_pending(
             state_id=state.id
         )
         if vizard_alerts:
@@ -352,16 +348,3 @@ class AddSocialNetworkService(interface.IAddSocialNetworkService):
             return True
 
         return False
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -2,7 +2,8 @@ from aiogram_dialog import DialogManager
 
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model
+from internal import interface
+from internal.dialog.state import get_user_state
 
 
 class AuthGetter(interface.IAuthGetter):
@@ -49,7 +50,7 @@ class AuthGetter(interface.IAuthGetter):
             try:
                 user = dialog_manager.event.from_user
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 data = {
                     "name": user.first_name or "Пользователь",
@@ -63,14 +64,3 @@ class AuthGetter(interface.IAuthGetter):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            chat_id = None
-
-        state = (await self.state_repo.state_by_id(chat_id))[0]
-        return state
\ No newline at end of file
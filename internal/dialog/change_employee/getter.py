@@ -1,10 +1,14 @@
 from datetime import datetime
+from functools import partial
 
 from aiogram_dialog import DialogManager
 
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model
+from internal import interface
+from internal.dialog.graph import GetterGraph, DialogNodes, Node
+from internal.dialog.pagination import ContentListing
+from internal.dialog.state import get_user_state
 
 
 class ChangeEmployeeGetter(interface.IChangeEmployeeGetter):
@@ -15,6 +19,7 @@ class ChangeEmployeeGetter(interface.IChangeEmployeeGetter):
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_organization_client: interface.ILoomOrganizationClient,
             loom_content_client: interface.ILoomContentClient,
+            dialog_nodes: DialogNodes,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -23,6 +28,40 @@ class ChangeEmployeeGetter(interface.IChangeEmployeeGetter):
         self.loom_organization_client = loom_organization_client
         self.loom_content_client = loom_content_client
 
+        # Список сотрудников ждет только текущего сотрудника; выбранный сотрудник и его состояние независимы,
+        # а счетчики ждут выбранного сотрудника и берутся из одной выборки публикаций:
+        # сервис считает их по фильтрам, а если отдает всю историю — она скачивается один раз
+        self.graph = GetterGraph(
+            *dialog_nodes.all(),
+            Node("all_employees", lambda current_employee: self.loom_employee_client.get_employees_by_organization(
+                current_employee.organization_id
+            )),
+            Node("employee", lambda dialog_manager: self.loom_employee_client.get_employee_by_account_id(
+                int(dialog_manager.dialog_data.get("selected_account_id"))
+            )),
+            Node("employee_states", lambda dialog_manager: self.state_repo.state_by_account_id(
+                int(dialog_manager.dialog_data.get("selected_account_id"))
+            )),
+            Node("publications", lambda employee: ContentListing(
+                partial(self.loom_content_client.get_publications_page, employee.organization_id)
+            )),
+            Node("generated_publication_count", lambda employee, publications: publications.count(
+                creator_id=employee.account_id,
+            )),
+            Node("published_publication_count", lambda employee, publications: publications.count(
+                moderation_status="approved",
+                creator_id=employee.account_id,
+            )),
+            Node("approved_publication_count", lambda employee, publications: publications.count(
+                moderation_status="approved",
+                moderator_id=employee.account_id,
+            )),
+            Node("rejected_publication_count", lambda employee, publications: publications.count(
+                moderation_status="rejected",
+                moderator_id=employee.account_id,
+            )),
+        )
+
     async def get_employee_list_data(
             self,
             dialog_manager: DialogManager,
@@ -33,19 +72,9 @@ class ChangeEmployeeGetter(interface.IChangeEmployeeGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-                current_employee = await self.loom_employee_client.get_employee_by_account_id(
-                    state.account_id
-                )
-
-                organization = await self.loom_organization_client.get_organization_by_id(
-                    current_employee.organization_id
-                )
-
-                # Получаем список всех сотрудников организации
-                all_employees = await self.loom_employee_client.get_employees_by_organization(
-                    organization.id
-                )
+                fetched = await self.graph.resolve(dialog_manager, "organization", "all_employees")
+                organization = fetched["organization"]
+                all_employees = fetched["all_employees"]
 
                 # Фильтрация по поисковому запросу
                 search_query = dialog_manager.dialog_data.get("search_query", "")
@@ -104,42 +133,25 @@ class ChangeEmployeeGetter(interface.IChangeEmployeeGetter):
             try:
                 selected_account_id = int(dialog_manager.dialog_data.get("selected_account_id"))
 
-                # Получаем текущего пользователя
-                state = await self._get_state(dialog_manager)
-                current_employee = await self.loom_employee_client.get_employee_by_account_id(
-                    state.account_id
+                fetched = await self.graph.resolve(
+                    dialog_manager,
+                    "state",
+                    "current_employee",
+                    "employee",
+                    "employee_states",
+                    "generated_publication_count",
+                    "published_publication_count",
+                    "approved_publication_count",
+                    "rejected_publication_count",
                 )
-
-                # Получаем выбранного сотрудника
-                employee = await self.loom_employee_client.get_employee_by_account_id(
-                    selected_account_id
-                )
-                employee_state = (await self.state_repo.state_by_account_id(selected_account_id))[0]
-
-                # Получаем статистику публикаций
-                publications = await self.loom_content_client.get_publications_by_organization(
-                    employee.organization_id
-                )
-
-                generated_publication_count = 0
-                published_publication_count = 0
-
-                rejected_publication_count = 0
-                approved_publication_count = 0
-
-                for pub in publications:
-                    if pub.moderator_id == employee.account_id:
-                        if pub.moderation_status == "approved":
-                            approved_publication_count += 1
-                        elif pub.moderation_status == "rejected":
-                            rejected_publication_count += 1
-
-                    if pub.creator_id == employee.account_id:
-                        generated_publication_count += 1
-
-                        if pub.moderation_status == "approved":
-                            published_publication_count += 1
-
+                state = fetched["state"]
+                current_employee = fetched["current_employee"]
+                employee = fetched["employee"]
+                employee_state = fetched["employee_states"][0]
+                generated_publication_count = fetched["generated_publication_count"]
+                published_publication_count = fetched["published_publication_count"]
+                approved_publication_count = fetched["approved_publication_count"]
+                rejected_publication_count = fetched["rejected_publication_count"]
 
                 # Формируем список разрешений
                 permissions_list = []
@@ -320,7 +332,7 @@ class ChangeEmployeeGetter(interface.IChangeEmployeeGetter):
                 )
 
                 # Получаем данные текущего пользователя для определения доступных ролей
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 current_employee = await self.loom_employee_client.get_employee_by_account_id(
                     state.account_id
                 )
@@ -390,15 +402,3 @@ class ChangeEmployeeGetter(interface.IChangeEmployeeGetter):
             "owner": "Владелец",
         }
         return role_names.get(role, role.capitalize())
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -7,6 +7,7 @@ from aiogram_dialog import DialogManager, StartMode, ShowMode
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
 
 
 class ChangeEmployeeService(interface.IChangeEmployeeService):
@@ -560,13 +561,8 @@ class ChangeEmployeeService(interface.IChangeEmployeeService):
                 raise
 
     async def _check_alerts(self, dialog_manager: DialogManager) -> bool:
-        state = await self._get_state(dialog_manager)
-        await self.state_repo.change_user_state(
-            state_id=state.id,
-            can_show_alerts=True
-        )
-
-        vizard_alerts = await self.state_repo.get_vizard_video_cut_alert_by_state_id(
+        state = await get_user_state(dialog_manager, self.state_repo)
+        vizard_alerts = await self.state_repo.enable_alerts_and_get_pending(
             state_id=state.id
         )
         if vizard_alerts:
@@ -586,15 +582,3 @@ class ChangeEmployeeService(interface.IChangeEmployeeService):
             "owner": "Владелец",
         }
         return role_names.get(role, role.capitalize())
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
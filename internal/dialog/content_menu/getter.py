@@ -3,6 +3,7 @@ from aiogram_dialog import DialogManager
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
 
 
 class ContentMenuGetter(interface.IContentMenuGetter):
@@ -11,13 +12,13 @@ class ContentMenuGetter(interface.IContentMenuGetter):
             tel: interface.ITelemetry,
             state_repo: interface.IStateRepo,
             loom_employee_client: interface.ILoomEmployeeClient,
-            loom_content_client: interface.ILoomContentClient,
+            content_stats_service: interface.IContentStatsService,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.state_repo = state_repo
         self.loom_employee_client = loom_employee_client
-        self.loom_content_client = loom_content_client
+        self.content_stats_service = content_stats_service
 
     async def get_content_menu_data(
             self,
@@ -29,51 +30,18 @@ class ContentMenuGetter(interface.IContentMenuGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
-                # Получаем статистику публикаций
-                publications = await self.loom_content_client.get_publications_by_organization(
-                    state.organization_id
-                )
-
-                # Получаем статистику видео-нарезок
-                video_cuts = await self.loom_content_client.get_video_cuts_by_organization(
-                    state.organization_id
-                )
-
-                # Подсчитываем статистику
-                drafts_count = 0
-                moderation_count = 0
-                approved_count = 0
-                total_generations = 0
-
-                video_cut_count = 0
-                publication_count = 0
+                # Счетчики ведет ContentStatsService, рендер не зависит от объема контента
+                stats = await self.content_stats_service.get_stats(state.organization_id)
 
-                # Статистика публикаций
-                for pub in publications:
+                drafts_count = stats.count(moderation_status="draft")
+                moderation_count = stats.count(moderation_status="moderation")
+                approved_count = stats.count(moderation_status="approved")
 
-                    total_generations += 1
-                    publication_count += 1
-
-                    if pub.moderation_status == "draft":
-                        drafts_count += 1
-                    elif pub.moderation_status == "moderation":
-                        moderation_count += 1
-                    elif pub.moderation_status == "approved":
-                        approved_count += 1
-
-                # Статистика видео-нарезок
-                for video in video_cuts:
-                    total_generations += 1
-                    video_cut_count += 1
-
-                    if video.moderation_status == "draft":
-                        drafts_count += 1
-                    elif video.moderation_status == "moderation":
-                        moderation_count += 1
-                    elif video.moderation_status == "approved":
-                        approved_count += 1
+                publication_count = stats.count(content_type=model.PUBLICATION_CONTENT_TYPE)
+                video_cut_count = stats.count(content_type=model.VIDEO_CUT_CONTENT_TYPE)
+                total_generations = publication_count + video_cut_count
 
                 data = {
                     "drafts_count": drafts_count,
@@ -105,23 +73,21 @@ class ContentMenuGetter(interface.IContentMenuGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
-                # Получаем публикации организации
-                publications = await self.loom_content_client.get_publications_by_organization(
-                    state.organization_id
-                )
+                stats = await self.content_stats_service.get_stats(state.organization_id)
 
-                # Получаем видео-нарезки организации
-                video_cuts = await self.loom_content_client.get_video_cuts_by_organization(
-                    state.organization_id
+                # Подсчитываем свои черновики
+                publication_drafts_count = stats.count(
+                    content_type=model.PUBLICATION_CONTENT_TYPE,
+                    moderation_status="draft",
+                    creator_id=state.account_id,
+                )
+                video_drafts_count = stats.count(
+                    content_type=model.VIDEO_CUT_CONTENT_TYPE,
+                    moderation_status="draft",
+                    creator_id=state.account_id,
                 )
-
-                # Подсчитываем черновики
-                publication_drafts_count = sum(1 for pub in publications if pub.moderation_status == "draft"
-                                               and pub.creator_id == state.account_id)
-                video_drafts_count = sum(1 for video in video_cuts if video.moderation_status == "draft"
-                                         and video.creator_id == state.account_id)
 
                 data = {
                     "publication_drafts_count": publication_drafts_count,
@@ -148,21 +114,19 @@ class ContentMenuGetter(interface.IContentMenuGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-
-                # Получаем публикации организации
-                publications = await self.loom_content_client.get_publications_by_organization(
-                    state.organization_id
-                )
+                state = await get_user_state(dialog_manager, self.state_repo)
 
-                # Получаем видео-нарезки организации
-                video_cuts = await self.loom_content_client.get_video_cuts_by_organization(
-                    state.organization_id
-                )
+                stats = await self.content_stats_service.get_stats(state.organization_id)
 
                 # Подсчитываем элементы на модерации
-                publication_moderation_count = sum(1 for pub in publications if pub.moderation_status == "moderation")
-                video_moderation_count = sum(1 for video in video_cuts if video.moderation_status == "moderation")
+                publication_moderation_count = stats.count(
+                    content_type=model.PUBLICATION_CONTENT_TYPE,
+                    moderation_status="moderation",
+                )
+                video_moderation_count = stats.count(
+                    content_type=model.VIDEO_CUT_CONTENT_TYPE,
+                    moderation_status="moderation",
+                )
 
                 data = {
                     "publication_moderation_count": publication_moderation_count,
@@ -178,16 +142,3 @@ class ContentMenuGetter(interface.IContentMenuGetter):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -7,6 +7,7 @@ from aiogram_dialog import DialogManager, StartMode, ShowMode
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
 
 
 class ContentMenuService(interface.IContentMenuService):
@@ -35,7 +36,7 @@ class ContentMenuService(interface.IContentMenuService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 await self.state_repo.change_user_state(
                     state_id=state.id,
                     can_show_alerts=False
@@ -70,7 +71,7 @@ class ContentMenuService(interface.IContentMenuService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 await self.state_repo.change_user_state(
                     state_id=state.id,
                     can_show_alerts=False
@@ -105,7 +106,7 @@ class ContentMenuService(interface.IContentMenuService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 await self.state_repo.change_user_state(
                     state_id=state.id,
                     can_show_alerts=False
@@ -140,7 +141,7 @@ class ContentMenuService(interface.IContentMenuService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 await self.state_repo.change_user_state(
                     state_id=state.id,
                     can_show_alerts=False
@@ -175,7 +176,7 @@ class ContentMenuService(interface.IContentMenuService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 # Проверяем права доступа к модерации
                 employee = await self.loom_employee_client.get_employee_by_account_id(
@@ -226,7 +227,7 @@ class ContentMenuService(interface.IContentMenuService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 # Проверяем права доступа к модерации
                 employee = await self.loom_employee_client.get_employee_by_account_id(
@@ -315,16 +316,3 @@ class ContentMenuService(interface.IContentMenuService):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -5,7 +5,8 @@ from aiogram_dialog.widgets.kbd import ManagedCheckbox
 
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model
+from internal import interface
+from internal.dialog.state import get_user_state
 
 
 class GeneratePublicationDataGetter(interface.IGeneratePublicationGetter):
@@ -32,7 +33,7 @@ class GeneratePublicationDataGetter(interface.IGeneratePublicationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 employee = await self.loom_employee_client.get_employee_by_account_id(
                     state.account_id
                 )
@@ -124,7 +125,7 @@ class GeneratePublicationDataGetter(interface.IGeneratePublicationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 social_networks = await self.loom_content_client.get_social_networks_by_organization(
                     organization_id=state.organization_id
@@ -190,7 +191,7 @@ class GeneratePublicationDataGetter(interface.IGeneratePublicationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 employee = await self.loom_employee_client.get_employee_by_account_id(
                     state.account_id
                 )
@@ -312,15 +313,3 @@ class GeneratePublicationDataGetter(interface.IGeneratePublicationGetter):
         if not social_networks:
             return False
         return network_type in social_networks and len(social_networks[network_type]) > 0
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, AsyncIterator
 
 import aiohttp
 from aiogram_dialog.widgets.input import MessageInput
@@ -11,6 +11,8 @@ from aiogram_dialog.widgets.kbd import ManagedCheckbox
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
+from pkg.tg.file import stream_telegram_file
 
 
 class GeneratePublicationService(interface.IGeneratePublicationService):
@@ -20,12 +22,14 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             bot: Bot,
             state_repo: interface.IStateRepo,
             loom_content_client: interface.ILoomContentClient,
+            content_stats_service: interface.IContentStatsService,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.bot = bot
         self.state_repo = state_repo
         self.loom_content_client = loom_content_client
+        self.content_stats_service = content_stats_service
 
     async def handle_text_input(
             self,
@@ -102,7 +106,7 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
                 dialog_manager.dialog_data.pop("has_small_input_text", None)
                 dialog_manager.dialog_data.pop("has_big_input_text", None)
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 if message.content_type not in [ContentType.VOICE, ContentType.AUDIO]:
                     dialog_manager.dialog_data["has_invalid_voice_type"] = True
@@ -122,12 +126,10 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
                 dialog_manager.dialog_data["voice_transcribe"] = True
                 await dialog_manager.show()
 
-                file = await self.bot.get_file(file_id)
-                file_data = await self.bot.download_file(file.file_path)
-
+                # Голосовое идет из Telegram в loom-content чанками, не оседая в памяти целиком
                 text = await self.loom_content_client.transcribe_audio(
                     state.organization_id,
-                    audio_content=file_data.read(),
+                    audio_content=stream_telegram_file(self.bot, file_id),
                     audio_filename="audio.mp3",
                 )
 
@@ -723,7 +725,7 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 category_id = dialog_manager.dialog_data["category_id"]
                 text_reference = dialog_manager.dialog_data["input_text"]
@@ -754,6 +756,13 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
                         vk_source=vk_source,
                     )
 
+                self.content_stats_service.record_created(
+                    state.organization_id,
+                    model.PUBLICATION_CONTENT_TYPE,
+                    state.account_id,
+                    "draft",
+                )
+
                 self.logger.info("Публикация сохранена в черновики")
 
                 await callback.answer("💾 Сохранено в черновики!", show_alert=True)
@@ -787,7 +796,7 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 category_id = dialog_manager.dialog_data["category_id"]
                 text_reference = dialog_manager.dialog_data["input_text"]
@@ -818,6 +827,13 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
                         vk_source=vk_source,
                     )
 
+                self.content_stats_service.record_created(
+                    state.organization_id,
+                    model.PUBLICATION_CONTENT_TYPE,
+                    state.account_id,
+                    "moderation",
+                )
+
                 self.logger.info("Отправлено на модерацию")
 
                 await callback.answer("💾 Отправлено на модерацию!", show_alert=True)
@@ -883,7 +899,7 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
                 has_selected_networks = any(selected_networks.values())
@@ -930,6 +946,13 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
                     "approved"
                 )
 
+                self.content_stats_service.record_created(
+                    state.organization_id,
+                    model.PUBLICATION_CONTENT_TYPE,
+                    state.account_id,
+                    "approved",
+                )
+
                 # Сохраняем ссылки в данные диалога
                 dialog_manager.dialog_data["post_links"] = post_links
 
@@ -977,13 +1000,8 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
                 raise
 
     async def _check_alerts(self, dialog_manager: DialogManager) -> bool:
-        state = await self._get_state(dialog_manager)
-        await self.state_repo.change_user_state(
-            state_id=state.id,
-            can_show_alerts=True
-        )
-
-        vizard_alerts = await self.state_repo.get_vizard_video_cut_alert_by_state_id(
+        state = await get_user_state(dialog_manager, self.state_repo)
+        vizard_alerts = await self.state_repo.enable_alerts_and_get_pending(
             state_id=state.id
         )
         if vizard_alerts:
@@ -995,12 +1013,14 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
 
         return False
 
-    async def _get_current_image_data(self, dialog_manager: DialogManager) -> tuple[bytes, str] | None:
+    async def _get_current_image_data(
+            self,
+            dialog_manager: DialogManager
+    ) -> tuple[bytes | AsyncIterator[bytes], str] | None:
         try:
             if dialog_manager.dialog_data.get("custom_image_file_id"):
                 file_id = dialog_manager.dialog_data["custom_image_file_id"]
-                image_content = await self.bot.download(file_id)
-                return image_content.read(), f"{file_id}.jpg"
+                return stream_telegram_file(self.bot, file_id), f"{file_id}.jpg"
 
             elif dialog_manager.dialog_data.get("publication_images_url"):
                 images_url = dialog_manager.dialog_data["publication_images_url"]
@@ -1017,11 +1037,10 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
             return None
 
     async def _get_selected_image_data(self, dialog_manager: DialogManager) -> tuple[
-        str | None, bytes | None, str | None]:
+        str | None, bytes | AsyncIterator[bytes] | None, str | None]:
         if dialog_manager.dialog_data.get("custom_image_file_id"):
             file_id = dialog_manager.dialog_data["custom_image_file_id"]
-            image_content = await self.bot.download(file_id)
-            return None, image_content.read(), f"{file_id}.jpg"
+            return None, stream_telegram_file(self.bot, file_id), f"{file_id}.jpg"
 
         elif dialog_manager.dialog_data.get("publication_images_url"):
             images_url = dialog_manager.dialog_data["publication_images_url"]
@@ -1033,19 +1052,6 @@ class GeneratePublicationService(interface.IGeneratePublicationService):
 
         return None, None, None
 
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
-
     async def _download_image(self, image_url: str) -> tuple[bytes, str]:
         async with aiohttp.ClientSession() as session:
             async with session.get(image_url) as response:
@@ -6,6 +6,7 @@ from aiogram_dialog import DialogManager, StartMode, ShowMode
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
 
 
 class GenerateVideoCutService(interface.IGenerateVideoCutService):
@@ -44,7 +45,7 @@ class GenerateVideoCutService(interface.IGenerateVideoCutService):
                     return
 
                 # Получаем состояние пользователя
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 dialog_manager.dialog_data["is_processing_video"] = True
 
@@ -102,7 +103,7 @@ class GenerateVideoCutService(interface.IGenerateVideoCutService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 await self.state_repo.delete_vizard_video_cut_alert(
                     state.id
@@ -134,7 +135,7 @@ class GenerateVideoCutService(interface.IGenerateVideoCutService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 await self.state_repo.delete_vizard_video_cut_alert(
                     state.id
@@ -154,13 +155,8 @@ class GenerateVideoCutService(interface.IGenerateVideoCutService):
                 raise
 
     async def _check_alerts(self, dialog_manager: DialogManager) -> bool:
-        state = await self._get_state(dialog_manager)
-        await self.state_repo.change_user_state(
-            state_id=state.id,
-            can_show_alerts=True
-        )
-
-        vizard_alerts = await self.state_repo.get_vizard_video_cut_alert_by_state_id(
+        state = await get_user_state(dialog_manager, self.state_repo)
+        vizard_alerts = await self.state_repo.enable_alerts_and_get_pending(
             state_id=state.id
         )
         if vizard_alerts:
@@ -178,16 +174,3 @@ class GenerateVideoCutService(interface.IGenerateVideoCutService):
             r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
         )
         return bool(youtube_regex.match(url))
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
\ No newline at end of file
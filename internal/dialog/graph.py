@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Callable
+
+from aiogram_dialog import DialogManager
+from opentelemetry import trace
+
+from internal import interface
+from internal.dialog.state import get_user_state
+
+# Значение, которое есть у любого графа без объявления: узлы берут из него dialog_data и middleware_data
+DIALOG_MANAGER = "dialog_manager"
+
+# Ключ в middleware_data, под которым живут общие узлы текущего апдейта
+SHARED_SCOPE_KEY = "getter_graph_shared_nodes"
+
+
+class Node:
+    """
+    Узел данных геттера. Параметры resolve — имена узлов, от которых он зависит.
+    resolve может вернуть awaitable или готовое значение (например, None, если данные не нужны).
+    Общий (shared) узел вычисляется один раз на апдейт и переиспользуется всеми геттерами окна,
+    поэтому он не должен зависеть от dialog_data, которую меняют обработчики.
+    """
+    __slots__ = ("name", "resolve", "dependencies", "shared")
+
+    def __init__(self, name: str, resolve: Callable[..., Any], shared: bool = False):
+        self.name = name
+        self.resolve = resolve
+        self.dependencies = tuple(inspect.signature(resolve).parameters)
+        self.shared = shared
+
+
+class GetterGraph:
+    """
+    Разрешает объявленные узлы как DAG: независимые узлы идут параллельно, общие берутся из кеша апдейта.
+    Собственное время каждого узла пишется атрибутами в текущий спан геттера.
+    """
+
+    def __init__(self, *nodes: Node):
+        self.nodes = {node.name: node for node in nodes}
+        self._validate()
+
+    async def resolve(self, dialog_manager: DialogManager, *names: str) -> dict[str, Any]:
+        shared_scope: dict[Node, asyncio.Future] = dialog_manager.middleware_data.setdefault(SHARED_SCOPE_KEY, {})
+        local_scope: dict[Node, asyncio.Future] = {}
+        timings: dict[str, float] = {}
+        reused: set[str] = set()
+
+        def schedule(name: str) -> asyncio.Future:
+            node = self.nodes[name]
+            scope = shared_scope if node.shared else local_scope
+            future = scope.get(node)
+            if future is not None:
+                if node.shared and node not in local_scope:
+                    reused.add(name)
+                local_scope[node] = future
+                return future
+
+            # Задача создается в контексте геттера: спаны клиентов остаются дочерними, дедлайн апдейта действует
+            future = asyncio.ensure_future(run(node))
+            scope[node] = future
+            local_scope[node] = future
+            return future
+
+        async def run(node: Node) -> Any:
+            values = await asyncio.gather(*(
+                value_of(dependency) for dependency in node.dependencies
+            ))
+            started_at = time.perf_counter()
+            value = node.resolve(**dict(zip(node.dependencies, values)))
+            if inspect.isawaitable(value):
+                value = await value
+            timings[node.name] = (time.perf_counter() - started_at) * 1000
+            return value
+
+        async def value_of(name: str) -> Any:
+            if name == DIALOG_MANAGER:
+                return dialog_manager
+            return await schedule(name)
+
+        futures = [schedule(name) for name in names]
+        try:
+            values = await asyncio.gather(*futures)
+        except BaseException:
+            # Как в fan_out: после первой ошибки локальные узлы не нужны, общие могут ждать другие геттеры
+            pending = [
+                future for node, future in local_scope.items()
+                if not node.shared and not future.done()
+            ]
+            for future in pending:
+                future.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        finally:
+            self._record(timings, reused)
+
+        return dict(zip(names, values))
+
+    def _record(self, timings: dict[str, float], reused: set[str]) -> None:
+        span = trace.get_current_span()
+        for name, duration in timings.items():
+            span.set_attribute(f"getter.node.{name}.duration_ms", round(duration, 3))
+        for name in reused:
+            span.set_attribute(f"getter.node.{name}.shared", True)
+
+    def _validate(self) -> None:
+        for node in self.nodes.values():
+            unknown = [name for name in node.dependencies if name != DIALOG_MANAGER and name not in self.nodes]
+            if unknown:
+                raise ValueError(f"GetterGraph: узел {node.name} зависит от неизвестных {unknown}")
+
+        # Обход в глубину с серыми вершинами: граф проверяется один раз при сборке геттера
+        visiting: set[str] = set()
+        visited: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in visited or name == DIALOG_MANAGER:
+                return
+            if name in visiting:
+                raise ValueError(f"GetterGraph: цикл через узел {name}")
+            visiting.add(name)
+            for dependency in self.nodes[name].dependencies:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+
+class DialogNodes:
+    """Общие узлы, которые нужны большинству геттеров: состояние, текущий сотрудник, организация, соцсети."""
+
+    def __init__(
+            self,
+            state_repo: interface.IStateRepo,
+            loom_employee_client: interface.ILoomEmployeeClient,
+            loom_organization_client: interface.ILoomOrganizationClient,
+            loom_content_client: interface.ILoomContentClient,
+    ):
+        self.state_repo = state_repo
+
+        self.state = Node("state", lambda dialog_manager: get_user_state(dialog_manager, state_repo), shared=True)
+        self.current_employee = Node(
+            "current_employee",
+            lambda state: loom_employee_client.get_employee_by_account_id(state.account_id),
+            shared=True,
+        )
+        self.organization = Node(
+            "organization",
+            lambda state: loom_organization_client.get_organization_by_id(state.organization_id),
+            shared=True,
+        )
+        self.social_networks = Node(
+            "social_networks",
+            lambda state: loom_content_client.get_social_networks_by_organization(state.organization_id),
+            shared=True,
+        )
+
+    def all(self) -> tuple[Node, ...]:
+        return self.state, self.current_employee, self.organization, self.social_networks
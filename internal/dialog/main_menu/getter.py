@@ -1,7 +1,8 @@
 from aiogram_dialog import DialogManager
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model
+from internal import interface
+from internal.dialog.state import get_user_state
 
 
 class MainMenuGetter(interface.IMainMenuGetter):
@@ -25,7 +26,7 @@ class MainMenuGetter(interface.IMainMenuGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 user = dialog_manager.event.from_user
 
                 show_error_recovery = bool(
@@ -57,16 +58,3 @@ class MainMenuGetter(interface.IMainMenuGetter):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
\ No newline at end of file
@@ -10,6 +10,8 @@ from aiogram_dialog.widgets.input import MessageInput
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
+from pkg.tg.file import stream_telegram_file
 
 
 class MainMenuService(interface.IMainMenuService):
@@ -58,7 +60,7 @@ class MainMenuService(interface.IMainMenuService):
 
                     dialog_manager.dialog_data["is_processing_video"] = True
 
-                    state = await self._get_state(dialog_manager)
+                    state = await get_user_state(dialog_manager, self.state_repo)
                     await self.loom_content_client.generate_video_cut(
                         state.organization_id,
                         state.account_id,
@@ -124,7 +126,7 @@ class MainMenuService(interface.IMainMenuService):
                 dialog_manager.dialog_data.pop("has_small_input_text", None)
                 dialog_manager.dialog_data.pop("has_big_input_text", None)
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 if message.content_type not in [ContentType.VOICE, ContentType.AUDIO]:
                     dialog_manager.dialog_data["has_invalid_voice_type"] = True
@@ -144,12 +146,10 @@ class MainMenuService(interface.IMainMenuService):
                 dialog_manager.dialog_data["voice_transcribe"] = True
                 await dialog_manager.show()
 
-                file = await self.bot.get_file(file_id)
-                file_data = await self.bot.download_file(file.file_path)
-
+                # Голосовое идет из Telegram в loom-content чанками, не оседая в памяти целиком
                 text = await self.loom_content_client.transcribe_audio(
                     state.organization_id,
-                    audio_content=file_data.read(),
+                    audio_content=stream_telegram_file(self.bot, file_id),
                     audio_filename="audio.mp3",
                 )
 
@@ -195,7 +195,7 @@ class MainMenuService(interface.IMainMenuService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 await self.state_repo.change_user_state(
                     state_id=state.id,
                     show_error_recovery=False
@@ -228,7 +228,7 @@ class MainMenuService(interface.IMainMenuService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 await self.state_repo.change_user_state(
                     state_id=state.id,
                     show_error_recovery=False
@@ -259,7 +259,7 @@ class MainMenuService(interface.IMainMenuService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 await self.state_repo.change_user_state(
                     state_id=state.id,
                     show_error_recovery=False
@@ -286,16 +286,3 @@ class MainMenuService(interface.IMainMenuService):
             r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
         )
         return bool(youtube_regex.match(url))
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
\ No newline at end of file
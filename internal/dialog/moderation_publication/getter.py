@@ -8,7 +8,9 @@ from aiogram_dialog.widgets.kbd import ManagedCheckbox
 
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model
+from internal import interface
+from internal.dialog.graph import GetterGraph, DialogNodes, Node
+from internal.dialog.pagination import load_page_window
 
 
 class ModerationPublicationGetter(interface.IModerationPublicationGetter):
@@ -18,6 +20,7 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
             state_repo: interface.IStateRepo,
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_content_client: interface.ILoomContentClient,
+            dialog_nodes: DialogNodes,
             loom_domain: str
     ):
         self.tracer = tel.tracer()
@@ -27,6 +30,37 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
         self.loom_content_client = loom_content_client
         self.loom_domain = loom_domain
 
+        # Страница модерации и соцсети независимы, автор и категория ждут только страницу
+        self.graph = GetterGraph(
+            *dialog_nodes.all(),
+            # Сервис отдает только страницу публикаций на модерации, в которой стоит текущий индекс
+            Node("window", lambda dialog_manager, state: load_page_window(
+                dialog_manager.dialog_data,
+                "moderation_page",
+                lambda cursor, limit: self.loom_content_client.get_publications_page(
+                    state.organization_id,
+                    moderation_status="moderation",
+                    cursor=cursor,
+                    limit=limit,
+                ),
+            )),
+            Node("creator", lambda window: window and self.loom_employee_client.get_employee_by_account_id(
+                window.current.creator_id
+            )),
+            Node("category", lambda window: window and self.loom_content_client.get_category_by_id(
+                window.current.category_id
+            )),
+            Node("original_creator", lambda dialog_manager: self.loom_employee_client.get_employee_by_account_id(
+                dialog_manager.dialog_data["original_publication"]["creator_id"]
+            )),
+            Node("working_creator", lambda dialog_manager: self.loom_employee_client.get_employee_by_account_id(
+                dialog_manager.dialog_data["working_publication"]["creator_id"]
+            )),
+            Node("working_category", lambda dialog_manager: self.loom_content_client.get_category_by_id(
+                dialog_manager.dialog_data["working_publication"]["category_id"]
+            )),
+        )
+
     async def get_moderation_list_data(
             self,
             dialog_manager: DialogManager,
@@ -37,45 +71,26 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-
-                # Получаем публикации на модерации для организации
-                publications = await self.loom_content_client.get_publications_by_organization(
-                    organization_id=state.organization_id
-                )
+                selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
 
-                # Фильтруем только те, что на модерации
-                moderation_publications = [
-                    pub.to_dict() for pub in publications
-                    if pub.moderation_status == "moderation"
-                ]
+                nodes = ["window", "creator", "category"]
+                if not selected_networks:
+                    nodes.append("social_networks")
+                fetched = await self.graph.resolve(dialog_manager, *nodes)
+                window = fetched["window"]
 
-                if not moderation_publications:
+                if window is None:
                     return {
                         "has_publications": False,
                         "publications_count": 0,
                         "period_text": "",
                     }
 
-                # Сохраняем список для навигации
-                dialog_manager.dialog_data["moderation_list"] = moderation_publications
-
-                # Устанавливаем текущий индекс (0 если не был установлен)
-                if "current_index" not in dialog_manager.dialog_data:
-                    dialog_manager.dialog_data["current_index"] = 0
+                current_index = window.index
+                current_pub = window.current
 
-                current_index = dialog_manager.dialog_data["current_index"]
-                current_pub = model.Publication(**moderation_publications[current_index])
-
-                # Получаем информацию об авторе
-                creator = await self.loom_employee_client.get_employee_by_account_id(
-                    current_pub.creator_id
-                )
-
-                # Получаем категорию
-                category = await self.loom_content_client.get_category_by_id(
-                    current_pub.category_id
-                )
+                creator = fetched["creator"]
+                category = fetched["category"]
 
                 # Подготавливаем медиа для изображения
                 preview_image_media = None
@@ -98,9 +113,9 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
                     "has_image": bool(current_pub.image_fid),
                     "preview_image_media": preview_image_media,
                     "current_index": current_index + 1,
-                    "total_count": len(moderation_publications),
+                    "total_count": window.total_count,
                     "has_prev": current_index > 0,
-                    "has_next": current_index < len(moderation_publications) - 1,
+                    "has_next": current_index < window.total_count - 1,
                 }
 
                 # Сохраняем данные текущей публикации для редактирования
@@ -115,12 +130,8 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
                     "created_at": current_pub.created_at,
                 }
 
-                selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
-
                 if not selected_networks:
-                    social_networks = await self.loom_content_client.get_social_networks_by_organization(
-                        organization_id=state.organization_id
-                    )
+                    social_networks = fetched["social_networks"]
 
                     telegram_connected = self._is_network_connected(social_networks, "telegram")
                     vkontakte_connected = self._is_network_connected(social_networks, "vkontakte")
@@ -162,12 +173,8 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                original_pub = dialog_manager.dialog_data.get("original_publication", {})
-
                 # Получаем информацию об авторе
-                creator = await self.loom_employee_client.get_employee_by_account_id(
-                    original_pub["creator_id"],
-                )
+                creator = (await self.graph.resolve(dialog_manager, "original_creator"))["original_creator"]
 
                 data = {
                     "creator_name": creator.name,
@@ -202,15 +209,10 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
                 working_pub = dialog_manager.dialog_data["working_publication"]
                 original_pub = dialog_manager.dialog_data["original_publication"]
 
-                # Получаем информацию об авторе
-                creator = await self.loom_employee_client.get_employee_by_account_id(
-                    working_pub["creator_id"]
-                )
-
-                # Получаем категорию
-                category = await self.loom_content_client.get_category_by_id(
-                    working_pub["category_id"]
-                )
+                # Автор и категория независимы и запрашиваются параллельно
+                fetched = await self.graph.resolve(dialog_manager, "working_creator", "working_category")
+                creator = fetched["working_creator"]
+                category = fetched["working_category"]
 
                 # Подготавливаем медиа для изображения
                 preview_image_media = None
@@ -274,11 +276,7 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-
-                social_networks = await self.loom_content_client.get_social_networks_by_organization(
-                    organization_id=state.organization_id
-                )
+                social_networks = (await self.graph.resolve(dialog_manager, "social_networks"))["social_networks"]
 
                 telegram_connected = self._is_network_connected(social_networks, "telegram")
                 vkontakte_connected = self._is_network_connected(social_networks, "vkontakte")
@@ -453,16 +451,3 @@ class ModerationPublicationGetter(interface.IModerationPublicationGetter):
             return dt.strftime("%d.%m.%Y %H:%M")
         except:
             return dt
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -1,5 +1,5 @@
 import asyncio
-from typing import Any
+from typing import Any, AsyncIterator
 
 from aiogram.enums import ParseMode
 from aiogram_dialog.widgets.input import MessageInput
@@ -12,6 +12,9 @@ from aiogram_dialog.widgets.kbd import ManagedCheckbox
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model, common
+from internal.dialog.pagination import total_count, drop_current_item
+from internal.dialog.state import get_user_state
+from pkg.tg.file import stream_telegram_file
 
 
 class ModerationPublicationService(interface.IModerationPublicationService):
@@ -21,12 +24,14 @@ class ModerationPublicationService(interface.IModerationPublicationService):
             bot: Bot,
             state_repo: interface.IStateRepo,
             loom_content_client: interface.ILoomContentClient,
+            content_stats_service: interface.IContentStatsService,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.bot = bot
         self.state_repo = state_repo
         self.loom_content_client = loom_content_client
+        self.content_stats_service = content_stats_service
 
     async def handle_navigate_publication(
             self,
@@ -42,13 +47,13 @@ class ModerationPublicationService(interface.IModerationPublicationService):
                 dialog_manager.show_mode = ShowMode.EDIT
 
                 current_index = dialog_manager.dialog_data.get("current_index", 0)
-                moderation_list = dialog_manager.dialog_data.get("moderation_list", [])
+                total = total_count(dialog_manager.dialog_data, "moderation_page")
 
                 # Определяем направление навигации
                 if button.widget_id == "prev_publication":
                     new_index = max(0, current_index - 1)
                 else:  # next_publication
-                    new_index = min(len(moderation_list) - 1, current_index + 1)
+                    new_index = min(total - 1, current_index + 1)
 
                 if new_index == current_index:
                     await callback.answer()
@@ -128,7 +133,7 @@ class ModerationPublicationService(interface.IModerationPublicationService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 original_pub = dialog_manager.dialog_data["original_publication"]
                 publication_id = original_pub["id"]
                 reject_comment = dialog_manager.dialog_data.get("reject_comment", "Нет комментария")
@@ -140,6 +145,13 @@ class ModerationPublicationService(interface.IModerationPublicationService):
                     moderation_status="rejected",
                     moderation_comment=reject_comment,
                 )
+                self.content_stats_service.record_status_changed(
+                    state.organization_id,
+                    model.PUBLICATION_CONTENT_TYPE,
+                    original_pub["creator_id"],
+                    "moderation",
+                    "rejected",
+                )
 
                 creator_state = await self.state_repo.state_by_account_id(original_pub["creator_id"])
                 if creator_state:
@@ -730,7 +742,7 @@ class ModerationPublicationService(interface.IModerationPublicationService):
 
                 original_pub = dialog_manager.dialog_data["original_publication"]
                 publication_id = original_pub["id"]
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 # Получаем выбранные социальные сети
                 selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
@@ -756,6 +768,13 @@ class ModerationPublicationService(interface.IModerationPublicationService):
                     state.account_id,
                     "approved"
                 )
+                self.content_stats_service.record_status_changed(
+                    state.organization_id,
+                    model.PUBLICATION_CONTENT_TYPE,
+                    original_pub["creator_id"],
+                    "moderation",
+                    "approved",
+                )
 
                 dialog_manager.dialog_data["post_links"] = post_links
 
@@ -837,7 +856,7 @@ class ModerationPublicationService(interface.IModerationPublicationService):
             # Проверяем тип изображения и получаем выбранное
             if working_pub.get("custom_image_file_id"):
                 # Пользовательское изображение
-                image_content = await self.bot.download(working_pub["custom_image_file_id"])
+                image_content = stream_telegram_file(self.bot, working_pub["custom_image_file_id"])
                 image_filename = working_pub["custom_image_file_id"] + ".jpg"
 
             elif working_pub.get("generated_images_url"):
@@ -886,15 +905,17 @@ class ModerationPublicationService(interface.IModerationPublicationService):
                 text=working_pub["text"],
             )
 
-    async def _get_current_image_data_for_moderation(self, dialog_manager: DialogManager) -> tuple[bytes, str] | None:
+    async def _get_current_image_data_for_moderation(
+            self,
+            dialog_manager: DialogManager
+    ) -> tuple[bytes | AsyncIterator[bytes], str] | None:
         try:
             working_pub = dialog_manager.dialog_data.get("working_publication", {})
 
             # Проверяем пользовательское изображение
             if working_pub.get("custom_image_file_id"):
                 file_id = working_pub["custom_image_file_id"]
-                image_content = await self.bot.download(file_id)
-                return image_content.read(), f"{file_id}.jpg"
+                return stream_telegram_file(self.bot, file_id), f"{file_id}.jpg"
 
             # Проверяем сгенерированные изображения
             elif working_pub.get("generated_images_url"):
@@ -925,30 +946,15 @@ class ModerationPublicationService(interface.IModerationPublicationService):
             return None
 
     async def _remove_current_publication_from_list(self, dialog_manager: DialogManager) -> None:
-        moderation_list = dialog_manager.dialog_data.get("moderation_list", [])
-        current_index = dialog_manager.dialog_data.get("current_index", 0)
-
-        if moderation_list and current_index < len(moderation_list):
-            moderation_list.pop(current_index)
-
-            # Корректируем индекс если нужно
-            if current_index >= len(moderation_list) and moderation_list:
-                dialog_manager.dialog_data["current_index"] = len(moderation_list) - 1
-            elif not moderation_list:
-                dialog_manager.dialog_data["current_index"] = 0
+        drop_current_item(dialog_manager.dialog_data, "moderation_page")
 
-            # Сбрасываем рабочие данные
-            dialog_manager.dialog_data.pop("working_publication", None)
-            dialog_manager.dialog_data.pop("selected_networks", None)
+        # Сбрасываем рабочие данные
+        dialog_manager.dialog_data.pop("working_publication", None)
+        dialog_manager.dialog_data.pop("selected_networks", None)
 
     async def _check_alerts(self, dialog_manager: DialogManager) -> bool:
-        state = await self._get_state(dialog_manager)
-        await self.state_repo.change_user_state(
-            state_id=state.id,
-            can_show_alerts=True
-        )
-
-        vizard_alerts = await self.state_repo.get_vizard_video_cut_alert_by_state_id(
+        state = await get_user_state(dialog_manager, self.state_repo)
+        vizard_alerts = await self.state_repo.enable_alerts_and_get_pending(
             state_id=state.id
         )
         if vizard_alerts:
@@ -959,16 +965,3 @@ class ModerationPublicationService(interface.IModerationPublicationService):
             return True
 
         return False
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -8,6 +8,8 @@ from aiogram_dialog.widgets.kbd import ManagedCheckbox
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.graph import GetterGraph, DialogNodes, Node
+from internal.dialog.pagination import load_page_window
 
 
 class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
@@ -15,15 +17,47 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
             self,
             tel: interface.ITelemetry,
             state_repo: interface.IStateRepo,
+            file_cache_service: interface.IFileCacheService,
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_content_client: interface.ILoomContentClient,
+            dialog_nodes: DialogNodes,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.state_repo = state_repo
+        self.file_cache_service = file_cache_service
         self.loom_employee_client = loom_employee_client
         self.loom_content_client = loom_content_client
 
+        # Страница модерации и соцсети независимы, автор и медиа ждут только страницу
+        self.graph = GetterGraph(
+            *dialog_nodes.all(),
+            # Сервис отдает только страницу нарезок на модерации, в которой стоит текущий индекс
+            Node("window", lambda dialog_manager, state: load_page_window(
+                dialog_manager.dialog_data,
+                "moderation_page",
+                lambda cursor, limit: self.loom_content_client.get_video_cuts_page(
+                    state.organization_id,
+                    moderation_status="moderation",
+                    cursor=cursor,
+                    limit=limit,
+                ),
+            )),
+            Node("creator", lambda window: window and self.loom_employee_client.get_employee_by_account_id(
+                window.current.creator_id
+            )),
+            Node("video_media", lambda window: window and self._get_video_media(window.current)),
+            Node("original_creator", lambda dialog_manager: self.loom_employee_client.get_employee_by_account_id(
+                dialog_manager.dialog_data["original_video_cut"]["creator_id"]
+            )),
+            Node("working_creator", lambda dialog_manager: self.loom_employee_client.get_employee_by_account_id(
+                dialog_manager.dialog_data["working_video_cut"]["creator_id"]
+            )),
+            Node("working_video_media", lambda dialog_manager: self._get_video_media(
+                model.VideoCut(**dialog_manager.dialog_data["working_video_cut"])
+            )),
+        )
+
     async def get_moderation_list_data(
             self,
             dialog_manager: DialogManager,
@@ -34,40 +68,25 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-
-                # Получаем видео-нарезки на модерации для организации
-                video_cuts = await self.loom_content_client.get_video_cuts_by_organization(
-                    organization_id=state.organization_id
-                )
+                selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
 
-                # Фильтруем только те, что на модерации
-                moderation_video_cuts = [
-                    video_cut.to_dict() for video_cut in video_cuts
-                    if video_cut.moderation_status == "moderation"
-                ]
+                nodes = ["window", "creator", "video_media"]
+                if not selected_networks:
+                    nodes.append("social_networks")
+                fetched = await self.graph.resolve(dialog_manager, *nodes)
+                window = fetched["window"]
 
-                if not moderation_video_cuts:
+                if window is None:
                     return {
                         "has_video_cuts": False,
                         "video_cuts_count": 0,
                         "period_text": "",
                     }
 
-                # Сохраняем список для навигации
-                dialog_manager.dialog_data["moderation_list"] = moderation_video_cuts
+                current_index = window.index
+                current_video_cut = window.current
 
-                # Устанавливаем текущий индекс (0 если не был установлен)
-                if "current_index" not in dialog_manager.dialog_data:
-                    dialog_manager.dialog_data["current_index"] = 0
-
-                current_index = dialog_manager.dialog_data["current_index"]
-                current_video_cut = model.VideoCut(**moderation_video_cuts[current_index])
-
-                # Получаем информацию об авторе
-                creator = await self.loom_employee_client.get_employee_by_account_id(
-                    current_video_cut.creator_id
-                )
+                creator = fetched["creator"]
 
                 # Форматируем теги
                 tags = current_video_cut.tags or []
@@ -76,15 +95,14 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                 # Рассчитываем время ожидания
                 waiting_time = self._calculate_waiting_time_text(current_video_cut.created_at)
 
-                # Подготавливаем медиа для видео
-                video_media = await self._get_video_media(current_video_cut)
+                video_media = fetched["video_media"]
 
                 # Определяем период
-                period_text = self._get_period_text(moderation_video_cuts)
+                period_text = self._get_period_text(window.oldest_created_at)
 
                 data = {
                     "has_video_cuts": True,
-                    "video_cuts_count": len(moderation_video_cuts),
+                    "video_cuts_count": window.total_count,
                     "period_text": period_text,
                     "creator_name": creator.name,
                     "created_at": self._format_datetime(current_video_cut.created_at),
@@ -98,9 +116,9 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                     "has_video": bool(current_video_cut.video_fid),
                     "video_media": video_media,
                     "current_index": current_index + 1,
-                    "total_count": len(moderation_video_cuts),
+                    "total_count": window.total_count,
                     "has_prev": current_index > 0,
-                    "has_next": current_index < len(moderation_video_cuts) - 1,
+                    "has_next": current_index < window.total_count - 1,
                 }
 
                 # Сохраняем данные текущего видео для редактирования
@@ -127,12 +145,8 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                     "inst_source": current_video_cut.inst_source,
                 }
 
-                selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
-
                 if not selected_networks:
-                    social_networks = await self.loom_content_client.get_social_networks_by_organization(
-                        organization_id=state.organization_id
-                    )
+                    social_networks = fetched["social_networks"]
 
                     youtube_connected = self._is_network_connected(social_networks, "youtube")
                     instagram_connected = self._is_network_connected(social_networks, "instagram")
@@ -177,9 +191,7 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                 original_video_cut = dialog_manager.dialog_data.get("original_video_cut", {})
 
                 # Получаем информацию об авторе
-                creator = await self.loom_employee_client.get_employee_by_account_id(
-                    original_video_cut["creator_id"],
-                )
+                creator = (await self.graph.resolve(dialog_manager, "original_creator"))["original_creator"]
 
                 data = {
                     "video_name": original_video_cut["name"] or "Без названия",
@@ -218,18 +230,15 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                 working_video_cut = dialog_manager.dialog_data["working_video_cut"]
                 original_video_cut = dialog_manager.dialog_data["original_video_cut"]
 
-                # Получаем информацию об авторе
-                creator = await self.loom_employee_client.get_employee_by_account_id(
-                    working_video_cut["creator_id"]
-                )
+                # Автор и медиа независимы и запрашиваются параллельно
+                fetched = await self.graph.resolve(dialog_manager, "working_creator", "working_video_media")
+                creator = fetched["working_creator"]
+                video_media = fetched["working_video_media"]
 
                 # Форматируем теги
                 tags = working_video_cut.get("tags", [])
                 tags_text = ", ".join(tags) if tags else ""
 
-                # Подготавливаем медиа для видео
-                video_media = await self._get_video_media(model.VideoCut(**working_video_cut))
-
                 data = {
                     "video_name": working_video_cut["name"] or "Без названия",
                     "video_description": working_video_cut["description"] or "Описание отсутствует",
@@ -261,12 +270,8 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-
                 # Получаем подключенные социальные сети для организации
-                social_networks = await self.loom_content_client.get_social_networks_by_organization(
-                    organization_id=state.organization_id
-                )
+                social_networks = (await self.graph.resolve(dialog_manager, "social_networks"))["social_networks"]
 
                 # Проверяем подключенные сети
                 youtube_connected = self._is_network_connected(social_networks, "youtube")
@@ -419,21 +424,11 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
             else:
                 return f"{days} дней"
 
-    def _get_period_text(self, video_cuts: list) -> str:
-        if not video_cuts:
-            return "Нет данных"
-
-        # Находим самое старое и новое видео
-        dates = []
-        for video_cut in video_cuts:
-            if hasattr(video_cut, 'created_at') and video_cut.created_at:
-                dates.append(video_cut.created_at)
-
-        if not dates:
+    def _get_period_text(self, oldest_date: str | None) -> str:
+        # Период считаем по самому старому видео выборки — оно на последней странице
+        if not oldest_date:
             return "Сегодня"
 
-        # Простое определение периода на основе самого старого видео
-        oldest_date = min(dates)
         waiting_hours = self._calculate_waiting_hours(oldest_date)
 
         if waiting_hours < 24:
@@ -448,23 +443,10 @@ class VideoCutModerationGetter(interface.IVideoCutModerationGetter):
     async def _get_video_media(self, video_cut: model.VideoCut) -> MediaAttachment | None:
         video_media = None
         if video_cut.video_fid:
-            cached_file = await self.state_repo.get_cache_file(video_cut.video_name)
-            if cached_file:
+            file_id = await self.file_cache_service.get_file_id(video_cut.video_name)
+            if file_id:
                 video_media = MediaAttachment(
-                    file_id=MediaId(cached_file[0].file_id),
+                    file_id=MediaId(file_id),
                     type=ContentType.VIDEO,
                 )
         return video_media
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
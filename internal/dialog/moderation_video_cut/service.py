@@ -9,6 +9,8 @@ from aiogram_dialog.widgets.kbd import ManagedCheckbox
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.pagination import total_count, drop_current_item
+from internal.dialog.state import get_user_state
 
 
 class VideoCutModerationService(interface.IVideoCutModerationService):
@@ -18,12 +20,14 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
             bot: Bot,
             state_repo: interface.IStateRepo,
             loom_content_client: interface.ILoomContentClient,
+            content_stats_service: interface.IContentStatsService,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.bot = bot
         self.state_repo = state_repo
         self.loom_content_client = loom_content_client
+        self.content_stats_service = content_stats_service
 
     async def handle_navigate_video_cut(
             self,
@@ -37,13 +41,13 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
         ) as span:
             try:
                 current_index = dialog_manager.dialog_data.get("current_index", 0)
-                moderation_list = dialog_manager.dialog_data.get("moderation_list", [])
+                total = total_count(dialog_manager.dialog_data, "moderation_page")
 
                 # Определяем направление навигации
                 if button.widget_id == "prev_video_cut":
                     new_index = max(0, current_index - 1)
                 else:  # next_video_cut
-                    new_index = min(len(moderation_list) - 1, current_index + 1)
+                    new_index = min(total - 1, current_index + 1)
 
                 if new_index == current_index:
                     await callback.answer()
@@ -124,7 +128,7 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
             try:
                 dialog_manager.show_mode = ShowMode.EDIT
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 original_video_cut = dialog_manager.dialog_data["original_video_cut"]
                 video_cut_id = original_video_cut["id"]
@@ -137,6 +141,13 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
                     moderation_status="rejected",
                     moderation_comment=reject_comment,
                 )
+                self.content_stats_service.record_status_changed(
+                    state.organization_id,
+                    model.VIDEO_CUT_CONTENT_TYPE,
+                    original_video_cut["creator_id"],
+                    "moderation",
+                    "rejected",
+                )
 
                 # Отправляем уведомление автору
                 creator_state = await self.state_repo.state_by_account_id(original_video_cut["creator_id"])
@@ -399,7 +410,7 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
 
                 original_video_cut = dialog_manager.dialog_data["original_video_cut"]
                 video_cut_id = original_video_cut["id"]
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 # Получаем выбранные видео-платформы
                 selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
@@ -419,6 +430,13 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
                     moderator_id=state.account_id,
                     moderation_status="approved",
                 )
+                self.content_stats_service.record_status_changed(
+                    state.organization_id,
+                    model.VIDEO_CUT_CONTENT_TYPE,
+                    original_video_cut["creator_id"],
+                    "moderation",
+                    "approved",
+                )
 
                 await callback.answer("Опубликовано", show_alert=True)
 
@@ -464,21 +482,11 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
                 raise
 
     async def _remove_current_video_cut_from_list(self, dialog_manager: DialogManager) -> None:
-        moderation_list = dialog_manager.dialog_data.get("moderation_list", [])
-        current_index = dialog_manager.dialog_data.get("current_index", 0)
-
-        if moderation_list and current_index < len(moderation_list):
-            moderation_list.pop(current_index)
-
-            # Корректируем индекс если нужно
-            if current_index >= len(moderation_list) and moderation_list:
-                dialog_manager.dialog_data["current_index"] = len(moderation_list) - 1
-            elif not moderation_list:
-                dialog_manager.dialog_data["current_index"] = 0
+        drop_current_item(dialog_manager.dialog_data, "moderation_page")
 
-            # Сбрасываем рабочие данные
-            dialog_manager.dialog_data.pop("working_video_cut", None)
-            dialog_manager.dialog_data.pop("selected_social_networks", None)
+        # Сбрасываем рабочие данные
+        dialog_manager.dialog_data.pop("working_video_cut", None)
+        dialog_manager.dialog_data.pop("selected_social_networks", None)
 
     def _has_changes(self, dialog_manager: DialogManager) -> bool:
         original = dialog_manager.dialog_data.get("original_video_cut", {})
@@ -507,13 +515,8 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
         )
 
     async def _check_alerts(self, dialog_manager: DialogManager) -> bool:
-        state = await self._get_state(dialog_manager)
-        await self.state_repo.change_user_state(
-            state_id=state.id,
-            can_show_alerts=True
-        )
-
-        vizard_alerts = await self.state_repo.get_vizard_video_cut_alert_by_state_id(
+        state = await get_user_state(dialog_manager, self.state_repo)
+        vizard_alerts = await self.state_repo.enable_alerts_and_get_pending(
             state_id=state.id
         )
         if vizard_alerts:
@@ -524,16 +527,3 @@ class VideoCutModerationService(interface.IVideoCutModerationService):
             return True
 
         return False
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -2,7 +2,8 @@ from aiogram_dialog import DialogManager
 
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model, common
+from internal import interface, common
+from internal.dialog.state import get_user_state
 
 
 class OrganizationMenuGetter(interface.IOrganizationMenuGetter):
@@ -31,7 +32,7 @@ class OrganizationMenuGetter(interface.IOrganizationMenuGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self.__get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 # Получаем данные организации
                 organization = await self.loom_organization_client.get_organization_by_id(
@@ -60,14 +61,3 @@ class OrganizationMenuGetter(interface.IOrganizationMenuGetter):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise err
-
-    async def __get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            chat_id = None
-
-        state = (await self.state_repo.state_by_id(chat_id))[0]
-        return state
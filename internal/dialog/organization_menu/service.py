@@ -5,6 +5,7 @@ from aiogram_dialog import DialogManager, StartMode, ShowMode
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
 
 
 class OrganizationMenuService(interface.IOrganizationMenuService):
@@ -30,7 +31,7 @@ class OrganizationMenuService(interface.IOrganizationMenuService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 employee = await self.loom_employee_client.get_employee_by_account_id(
                     state.account_id,
@@ -71,7 +72,7 @@ class OrganizationMenuService(interface.IOrganizationMenuService):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
 
                 employee = await self.loom_employee_client.get_employee_by_account_id(
                     state.account_id,
@@ -168,16 +169,3 @@ class OrganizationMenuService(interface.IOrganizationMenuService):
                 span.record_exception(err)
                 span.set_status(Status(StatusCode.ERROR, str(err)))
                 raise
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
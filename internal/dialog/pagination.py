@@ -0,0 +1,140 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from internal import model
+
+PAGE_SIZE = 10
+
+FetchPage = Callable[[int | None, int], Awaitable[model.ContentPage]]
+
+
+@dataclass(slots=True)
+class PageWindow:
+    items: list
+    index: int
+    total_count: int
+    page_start: int
+    oldest_created_at: str | None
+
+    @property
+    def current(self) -> Any:
+        return self.items[self.index - self.page_start]
+
+
+async def load_page_window(
+        dialog_data: dict,
+        key: str,
+        fetch_page: FetchPage,
+        page_size: int = PAGE_SIZE,
+) -> PageWindow | None:
+    """
+    Загружает страницу, на которой стоит dialog_data["current_index"], вместо всей истории.
+    В dialog_data[key] хранятся курсоры уже пройденных страниц, поэтому листание на шаг назад
+    и вперед стоит одного запроса страницы.
+    """
+    pager = dialog_data.setdefault(key, {"cursors": [None], "total_count": 0, "oldest_created_at": None})
+    cursors = pager["cursors"]
+    index = max(dialog_data.get("current_index", 0), 0)
+
+    page_number = min(index // page_size, len(cursors) - 1)
+    page = await fetch_page(cursors[page_number], page_size)
+
+    # После модерации или удаления хвостовая страница могла опустеть — откатываемся назад
+    while not page.items and page_number > 0:
+        page_number -= 1
+        page = await fetch_page(cursors[page_number], page_size)
+
+    del cursors[page_number + 1:]
+    if page.next_cursor is not None:
+        cursors.append(page.next_cursor)
+
+    pager["total_count"] = page.total_count
+    if not page.items:
+        dialog_data["current_index"] = 0
+        return None
+
+    # Выборка идет от новых к старым: самый старый элемент знает сервис, иначе берем самый старый из увиденных
+    if page.oldest_created_at is not None:
+        pager["oldest_created_at"] = page.oldest_created_at
+    else:
+        seen = [pager["oldest_created_at"], *(item.created_at for item in page.items)]
+        pager["oldest_created_at"] = min((created_at for created_at in seen if created_at), default=None)
+
+    page_start = page_number * page_size
+    index = min(max(index, page_start), page_start + len(page.items) - 1)
+    dialog_data["current_index"] = index
+
+    return PageWindow(
+        items=page.items,
+        index=index,
+        total_count=page.total_count,
+        page_start=page_start,
+        oldest_created_at=pager["oldest_created_at"],
+    )
+
+
+class ContentListing:
+    """
+    Выборка публикаций или нарезок организации на время одного геттера.
+    Пока сервис отвечает всей историей вместо страницы {items, next_cursor, total_count},
+    история скачивается один раз, а остальные страницы и счетчики считаются из нее.
+    Keyset-запросы идут, только когда сервис действительно ответил страницей.
+    """
+
+    def __init__(self, fetch_page: Callable[..., Awaitable[model.ContentPage]]):
+        # fetch_page(cursor=..., limit=..., **filters) — метод клиента с уже подставленной организацией
+        self.fetch_page = fetch_page
+        self.history: list | None = None
+        self._first: asyncio.Future | None = None
+
+    async def page(self, cursor: int | None = None, limit: int = PAGE_SIZE, **filters) -> model.ContentPage:
+        if self._first is None:
+            # Первый ответ показывает, умеет ли сервис страницы; параллельные запросы ждут его
+            self._first = asyncio.ensure_future(self._fetch(cursor, limit, filters))
+            return await self._first
+
+        await asyncio.wait([self._first])
+        if self.history is not None:
+            return model.ContentPage.paginate(self.history, cursor, limit, **filters)
+        return await self._fetch(cursor, limit, filters)
+
+    async def count(self, **filters) -> int:
+        return (await self.page(None, 0, **filters)).total_count
+
+    async def all(self, page_size: int = 100, **filters) -> list:
+        # Для экранов, которые листают список локально: выборка страницами или одной выгрузкой истории
+        items = []
+        cursor = None
+        while True:
+            page = await self.page(cursor, page_size, **filters)
+            if self.history is not None:
+                return model.ContentPage.paginate(self.history, None, len(self.history), **filters).items
+            items.extend(page.items)
+            if page.next_cursor is None or not page.items:
+                return items
+            cursor = page.next_cursor
+
+    def pager(self, **filters) -> FetchPage:
+        return lambda cursor, limit: self.page(cursor, limit, **filters)
+
+    async def _fetch(self, cursor: int | None, limit: int, filters: dict) -> model.ContentPage:
+        page = await self.fetch_page(cursor=cursor, limit=limit, **filters)
+        if page.source is not None:
+            self.history = page.source
+        return page
+
+
+def total_count(dialog_data: dict, key: str) -> int:
+    return dialog_data.get(key, {}).get("total_count", 0)
+
+
+def drop_current_item(dialog_data: dict, key: str) -> None:
+    # Элемент ушел из выборки на стороне сервиса, следующая отрисовка перечитает страницу
+    pager = dialog_data.get(key)
+    if not pager:
+        return
+
+    pager["total_count"] = max(pager["total_count"] - 1, 0)
+    last_index = max(pager["total_count"] - 1, 0)
+    dialog_data["current_index"] = min(dialog_data.get("current_index", 0), last_index)
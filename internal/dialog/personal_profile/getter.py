@@ -1,9 +1,12 @@
 from datetime import datetime
+from functools import partial
 
 from aiogram_dialog import DialogManager
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model
+from internal import interface
+from internal.dialog.graph import GetterGraph, DialogNodes, Node
+from internal.dialog.pagination import ContentListing
 
 
 class PersonalProfileGetter(interface.IPersonalProfileGetter):
@@ -14,6 +17,7 @@ class PersonalProfileGetter(interface.IPersonalProfileGetter):
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_organization_client: interface.ILoomOrganizationClient,
             loom_content_client: interface.ILoomContentClient,
+            dialog_nodes: DialogNodes,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
@@ -22,6 +26,30 @@ class PersonalProfileGetter(interface.IPersonalProfileGetter):
         self.loom_organization_client = loom_organization_client
         self.loom_content_client = loom_content_client
 
+        # Сотрудник — это сам пользователь, поэтому все вызовы ждут только состояние и идут параллельно.
+        # Статистику считает сервис по фильтрам, а если он отдает всю историю — она скачивается один раз
+        self.graph = GetterGraph(
+            *dialog_nodes.all(),
+            Node("publications", lambda state: ContentListing(
+                partial(self.loom_content_client.get_publications_page, state.organization_id)
+            )),
+            Node("generated_publication_count", lambda state, publications: publications.count(
+                creator_id=state.account_id,
+            )),
+            Node("published_publication_count", lambda state, publications: publications.count(
+                moderation_status="approved",
+                creator_id=state.account_id,
+            )),
+            Node("approved_publication_count", lambda state, publications: publications.count(
+                moderation_status="approved",
+                moderator_id=state.account_id,
+            )),
+            Node("rejected_publication_count", lambda state, publications: publications.count(
+                moderation_status="rejected",
+                moderator_id=state.account_id,
+            )),
+        )
+
     async def get_personal_profile_data(
             self,
             dialog_manager: DialogManager,
@@ -32,38 +60,23 @@ class PersonalProfileGetter(interface.IPersonalProfileGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-
-                employee = await self.loom_employee_client.get_employee_by_account_id(
-                    state.account_id
-                )
-
-                organization = await self.loom_organization_client.get_organization_by_id(
-                    state.organization_id
+                fetched = await self.graph.resolve(
+                    dialog_manager,
+                    "state",
+                    "current_employee",
+                    "organization",
+                    "generated_publication_count",
+                    "published_publication_count",
+                    "approved_publication_count",
+                    "rejected_publication_count",
                 )
-
-                publications = await self.loom_content_client.get_publications_by_organization(
-                    state.organization_id
-                )
-
-                generated_publication_count = 0
-                published_publication_count = 0
-
-                rejected_publication_count = 0
-                approved_publication_count = 0
-
-                for pub in publications:
-                    if pub.moderator_id == employee.account_id:
-                        if pub.moderation_status == "approved":
-                            approved_publication_count += 1
-                        elif pub.moderation_status == "rejected":
-                            rejected_publication_count += 1
-
-                    if pub.creator_id == employee.account_id:
-                        generated_publication_count += 1
-
-                        if pub.moderation_status == "approved":
-                            published_publication_count += 1
+                state = fetched["state"]
+                employee = fetched["current_employee"]
+                organization = fetched["organization"]
+                generated_publication_count = fetched["generated_publication_count"]
+                published_publication_count = fetched["published_publication_count"]
+                approved_publication_count = fetched["approved_publication_count"]
+                rejected_publication_count = fetched["rejected_publication_count"]
 
                 # Формируем список разрешений
                 permissions_list = []
@@ -128,14 +141,3 @@ class PersonalProfileGetter(interface.IPersonalProfileGetter):
             "owner": "Владелец",
         }
         return role_names.get(role, role.capitalize())
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            chat_id = None
-
-        state = (await self.state_repo.state_by_id(chat_id))[0]
-        return state
\ No newline at end of file
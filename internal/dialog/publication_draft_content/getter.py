@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import partial
 
 from aiogram import Bot
 from aiogram_dialog import DialogManager
@@ -7,7 +8,9 @@ from aiogram.types import ContentType
 
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
-from internal import interface, model
+from internal import interface
+from internal.dialog.graph import GetterGraph, DialogNodes, Node
+from internal.dialog.pagination import ContentListing
 
 
 class PublicationDraftGetter(interface.IPublicationDraftGetter):
@@ -17,6 +20,7 @@ class PublicationDraftGetter(interface.IPublicationDraftGetter):
             state_repo: interface.IStateRepo,
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_content_client: interface.ILoomContentClient,
+            dialog_nodes: DialogNodes,
             loom_domain: str,
     ):
         self.tracer = tel.tracer()
@@ -26,6 +30,17 @@ class PublicationDraftGetter(interface.IPublicationDraftGetter):
         self.loom_content_client = loom_content_client
         self.loom_domain = loom_domain
 
+        # Черновик и текущий сотрудник независимы, категория ждет только черновик
+        self.graph = GetterGraph(
+            *dialog_nodes.all(),
+            Node("publication", lambda dialog_manager: self.loom_content_client.get_publication_by_id(
+                int(dialog_manager.dialog_data.get("selected_publication_id"))
+            )),
+            Node("category", lambda publication: self.loom_content_client.get_category_by_id(
+                publication.category_id
+            )),
+        )
+
     async def get_publication_list_data(
             self,
             dialog_manager: DialogManager,
@@ -41,13 +56,12 @@ class PublicationDraftGetter(interface.IPublicationDraftGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
+                state = (await self.graph.resolve(dialog_manager, "state"))["state"]
                 
-                # 📋 Получаем публикации организации и фильтруем черновики
-                publications = await self.loom_content_client.get_publications_by_organization(
-                    state.organization_id
-                )
-                drafts = [p for p in publications if getattr(p, "moderation_status", None) == "draft"]
+                # 📋 Получаем только черновики — страницами, а если сервис отдает всю историю, то одной выгрузкой
+                drafts = await ContentListing(
+                    partial(self.loom_content_client.get_publications_page, state.organization_id)
+                ).all(moderation_status="draft")
                 
                 # 📝 Форматируем для отображения
                 publications_data = []
@@ -107,11 +121,11 @@ class PublicationDraftGetter(interface.IPublicationDraftGetter):
             try:
                 publication_id = int(dialog_manager.dialog_data.get("selected_publication_id"))
                 
-                # 📖 Получаем детали публикации
-                publication = await self.loom_content_client.get_publication_by_id(publication_id)
-                
-                # 🏷️ Получаем категорию
-                category = await self.loom_content_client.get_category_by_id(publication.category_id)
+                # 📖 Детали публикации, категория и сотрудник для проверки прав запрашиваются одним графом
+                fetched = await self.graph.resolve(dialog_manager, "publication", "category", "current_employee")
+                publication = fetched["publication"]
+                category = fetched["category"]
+                employee = fetched["current_employee"]
                 
                 # 🎮 Навигация
                 all_publication_ids = dialog_manager.dialog_data.get("all_publication_ids", [])
@@ -122,10 +136,7 @@ class PublicationDraftGetter(interface.IPublicationDraftGetter):
                 dialog_manager.dialog_data["publication_content"] = publication.text
                 dialog_manager.dialog_data["publication_tags"] = publication.tags or []
                 dialog_manager.dialog_data["category_name"] = category.name
-                
-                # 📊 Проверяем права пользователя
-                state = await self._get_state(dialog_manager)
-                employee = await self.loom_employee_client.get_employee_by_account_id(state.account_id)
+                dialog_manager.dialog_data["publication_creator_id"] = publication.creator_id
                 
                 # 🖼️ Готовим превью изображения, если есть
                 preview_image_media = None
@@ -277,19 +288,3 @@ class PublicationDraftGetter(interface.IPublicationDraftGetter):
             "vkontakte_connected": True,
             "has_available_networks": True,
         }
-
-    # 🛠️ ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ
-    
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        """Получение состояния пользователя"""
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
\ No newline at end of file
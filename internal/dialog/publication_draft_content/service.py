@@ -7,6 +7,7 @@ from aiogram_dialog import DialogManager, StartMode
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.state import get_user_state
 
 
 class PublicationDraftService(interface.IPublicationDraftService):
@@ -16,12 +17,14 @@ class PublicationDraftService(interface.IPublicationDraftService):
             bot: Bot,
             state_repo: interface.IStateRepo,
             loom_content_client: interface.ILoomContentClient,
+            content_stats_service: interface.IContentStatsService,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.bot = bot
         self.state_repo = state_repo
         self.loom_content_client = loom_content_client
+        self.content_stats_service = content_stats_service
 
     async def handle_select_publication(
             self,
@@ -115,6 +118,14 @@ class PublicationDraftService(interface.IPublicationDraftService):
                 
                 # 🗑️ Удаляем через API
                 await self.loom_content_client.delete_publication(publication_id)
+
+                state = await get_user_state(dialog_manager, self.state_repo)
+                self.content_stats_service.record_deleted(
+                    state.organization_id,
+                    model.PUBLICATION_CONTENT_TYPE,
+                    dialog_manager.dialog_data.get("publication_creator_id"),
+                    "draft",
+                )
                 
                 self.logger.info(f"Черновик публикации удален: {publication_id}")
                 
@@ -375,6 +386,15 @@ class PublicationDraftService(interface.IPublicationDraftService):
             
             # 📤 Отправляем на модерацию
             await self.loom_content_client.send_publication_to_moderation(publication_id)
+
+            state = await get_user_state(dialog_manager, self.state_repo)
+            self.content_stats_service.record_status_changed(
+                state.organization_id,
+                model.PUBLICATION_CONTENT_TYPE,
+                dialog_manager.dialog_data.get("publication_creator_id"),
+                "draft",
+                "moderation",
+            )
             
             await callback.answer("📤 Отправлено на модерацию!", show_alert=True)
             await dialog_manager.start(model.ContentMenuStates.content_menu, mode=StartMode.RESET_STACK)
@@ -393,12 +413,19 @@ class PublicationDraftService(interface.IPublicationDraftService):
             publication_id = int(dialog_manager.dialog_data.get("selected_publication_id"))
             
             # 🚀 Публикуем (минуя модерацию): подтверждаем как опубликовано текущим пользователем
-            state = await self._get_state(dialog_manager)
+            state = await get_user_state(dialog_manager, self.state_repo)
             await self.loom_content_client.moderate_publication(
                 publication_id=publication_id,
                 moderator_id=state.account_id,
                 moderation_status="published",
             )
+            self.content_stats_service.record_status_changed(
+                state.organization_id,
+                model.PUBLICATION_CONTENT_TYPE,
+                dialog_manager.dialog_data.get("publication_creator_id"),
+                "draft",
+                "published",
+            )
             
             await callback.answer("🚀 Опубликовано!", show_alert=True)
             await dialog_manager.start(model.ContentMenuStates.content_menu, mode=StartMode.RESET_STACK)
@@ -438,17 +465,3 @@ class PublicationDraftService(interface.IPublicationDraftService):
             raise
 
     # 🛠️ ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ
-    
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        """Получение состояния пользователя"""
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
\ No newline at end of file
@@ -0,0 +1,26 @@
+from aiogram_dialog import DialogManager
+
+from internal import interface, model
+
+
+async def get_user_state(dialog_manager: DialogManager, state_repo: interface.IStateRepo) -> model.UserState:
+    """
+    Состояние пользователя текущего апдейта для геттеров и сервисов диалогов.
+    TgMiddleware уже положил его в middleware_data, в остальных случаях (другой чат, состояние создано
+    в этом апдейте) читаем через StateRepo — его scope апдейта дает не больше одного запроса.
+    """
+    if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
+        chat_id = dialog_manager.event.message.chat.id
+    elif hasattr(dialog_manager.event, 'chat'):
+        chat_id = dialog_manager.event.chat.id
+    else:
+        raise ValueError("Cannot extract chat_id from dialog_manager")
+
+    state = dialog_manager.middleware_data.get("user_state")
+    if state is not None and state.tg_chat_id == chat_id:
+        return state
+
+    state = await state_repo.state_by_id(chat_id)
+    if not state:
+        raise ValueError(f"State not found for chat_id: {chat_id}")
+    return state[0]
@@ -9,6 +9,8 @@ from aiogram_dialog.widgets.kbd import ManagedCheckbox
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.graph import GetterGraph, DialogNodes, Node
+from internal.dialog.pagination import load_page_window
 
 
 class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
@@ -16,17 +18,42 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
             self,
             tel: interface.ITelemetry,
             state_repo: interface.IStateRepo,
+            file_cache_service: interface.IFileCacheService,
             loom_employee_client: interface.ILoomEmployeeClient,
             loom_organization_client: interface.ILoomOrganizationClient,
             loom_content_client: interface.ILoomContentClient,
+            dialog_nodes: DialogNodes,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.state_repo = state_repo
+        self.file_cache_service = file_cache_service
         self.loom_employee_client = loom_employee_client
         self.loom_organization_client = loom_organization_client
         self.loom_content_client = loom_content_client
 
+        # Сотрудник, страница черновиков и соцсети независимы, медиа ждет только страницу
+        self.graph = GetterGraph(
+            *dialog_nodes.all(),
+            # Фильтры применяет сервис, сюда приходит только страница с текущим черновиком
+            Node("window", lambda dialog_manager, state: load_page_window(
+                dialog_manager.dialog_data,
+                "video_cuts_page",
+                lambda cursor, limit: self.loom_content_client.get_video_cuts_page(
+                    state.organization_id,
+                    moderation_status="draft",
+                    creator_id=state.account_id,
+                    with_video=True,
+                    cursor=cursor,
+                    limit=limit,
+                ),
+            )),
+            Node("video_media", lambda window: window and self._get_video_media(window.current)),
+            Node("working_video_media", lambda dialog_manager: self._get_video_media(
+                model.VideoCut(**dialog_manager.dialog_data["working_video_cut"])
+            )),
+        )
+
     async def get_video_cut_list_data(
             self,
             dialog_manager: DialogManager,
@@ -38,41 +65,33 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-                employee = await self.loom_employee_client.get_employee_by_account_id(state.account_id)
-
-                video_cuts = await self.loom_content_client.get_video_cuts_by_organization(state.organization_id)
-                video_cuts = [
-                    video_cut for video_cut in video_cuts if
-                    video_cut.video_fid != ""
-                    and video_cut.moderation_status == "draft"
-                    and video_cut.creator_id == state.account_id
-                ]
-
-                if not video_cuts:
+                selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
+
+                nodes = ["current_employee", "window", "video_media"]
+                if not selected_networks:
+                    nodes.append("social_networks")
+                fetched = await self.graph.resolve(dialog_manager, *nodes)
+                employee = fetched["current_employee"]
+                window = fetched["window"]
+
+                if window is None:
                     return {
                         "has_video_cuts": False,
                         "video_cuts_count": 0,
                         "period_text": "",
                     }
 
-                dialog_manager.dialog_data["video_cuts_list"] = [video_cut.to_dict() for video_cut in video_cuts]
-
-                if "current_index" not in dialog_manager.dialog_data:
-                    dialog_manager.dialog_data["current_index"] = 0
-
-                current_index = dialog_manager.dialog_data["current_index"]
-                current_video_cut = model.VideoCut(**dialog_manager.dialog_data["video_cuts_list"][current_index])
+                current_index = window.index
+                current_video_cut = window.current
 
                 # Форматируем теги
                 tags = current_video_cut.tags or []
                 tags_text = ", ".join(tags) if tags else ""
 
                 # Определяем период
-                period_text = self._get_period_text(video_cuts)
+                period_text = self._get_period_text(window.oldest_created_at)
 
-                # Подготавливаем медиа для видео
-                video_media = await self._get_video_media(current_video_cut)
+                video_media = fetched["video_media"]
 
                 # Сохраняем данные текущего черновика для редактирования
                 dialog_manager.dialog_data["original_video_cut"] = current_video_cut.to_dict()
@@ -94,19 +113,15 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
                     "has_video": bool(current_video_cut.video_fid),
                     "video_media": video_media,
                     "current_index": current_index + 1,
-                    "video_cuts_count": len(video_cuts),
+                    "video_cuts_count": window.total_count,
                     "has_prev": current_index > 0,
-                    "has_next": current_index < len(video_cuts) - 1,
+                    "has_next": current_index < window.total_count - 1,
                     "can_publish": False if employee.required_moderation else True,
                     "not_can_publish": True if employee.required_moderation else False
                 }
 
-                selected_networks = dialog_manager.dialog_data.get("selected_social_networks", {})
-
                 if not selected_networks:
-                    social_networks = await self.loom_content_client.get_social_networks_by_organization(
-                        organization_id=state.organization_id
-                    )
+                    social_networks = fetched["social_networks"]
 
                     youtube_connected = self._is_network_connected(social_networks, "youtube")
                     instagram_connected = self._is_network_connected(social_networks, "instagram")
@@ -157,7 +172,7 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
                 tags = working_video_cut.get("tags", [])
                 tags_text = ", ".join(tags) if tags else ""
 
-                video_media = await self._get_video_media(model.VideoCut(**working_video_cut))
+                video_media = (await self.graph.resolve(dialog_manager, "working_video_media"))["working_video_media"]
 
                 data = {
                     "created_at": self._format_datetime(original_video_cut["created_at"]),
@@ -229,11 +244,7 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
-                state = await self._get_state(dialog_manager)
-
-                social_networks = await self.loom_content_client.get_social_networks_by_organization(
-                    organization_id=state.organization_id
-                )
+                social_networks = (await self.graph.resolve(dialog_manager, "social_networks"))["social_networks"]
 
                 # Проверяем подключенные сети
                 youtube_connected = self._is_network_connected(social_networks, "youtube")
@@ -271,12 +282,12 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
     async def _get_video_media(self, current_video_cut: model.VideoCut) -> MediaAttachment | None:
         video_media = None
         if current_video_cut.video_fid:
-            cached_file = await self.state_repo.get_cache_file(current_video_cut.video_name)
-
-            video_media = MediaAttachment(
-                file_id=MediaId(cached_file[0].file_id),
-                type=ContentType.VIDEO,
-            )
+            file_id = await self.file_cache_service.get_file_id(current_video_cut.video_name)
+            if file_id:
+                video_media = MediaAttachment(
+                    file_id=MediaId(file_id),
+                    type=ContentType.VIDEO,
+                )
 
         return video_media
 
@@ -311,22 +322,11 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
         except:
             return str(dt)
 
-    def _get_period_text(self, video_cuts: list) -> str:
-        if not video_cuts:
-            return "Нет данных"
-
-        # Находим самый старый и новый черновик
-        dates = []
-        for video_cut in video_cuts:
-            if hasattr(video_cut, 'created_at') and video_cut.created_at:
-                dates.append(video_cut.created_at)
-
-        if not dates:
+    def _get_period_text(self, oldest_date: str | None) -> str:
+        # Период считаем по самому старому черновику выборки — он на последней странице
+        if not oldest_date:
             return "Сегодня"
 
-        # Простое определение периода на основе самого старого черновика
-        oldest_date = min(dates)
-
         try:
             if isinstance(oldest_date, str):
                 oldest_dt = datetime.fromisoformat(oldest_date.replace('Z', '+00:00'))
@@ -347,15 +347,3 @@ class VideoCutsDraftGetter(interface.IVideoCutsDraftGetter):
                 return "За месяц"
         except:
             return "За неделю"
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
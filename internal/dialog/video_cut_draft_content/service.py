@@ -6,6 +6,8 @@ from aiogram_dialog import DialogManager, StartMode, ShowMode
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from internal import interface, model
+from internal.dialog.pagination import total_count, drop_current_item
+from internal.dialog.state import get_user_state
 
 
 class VideoCutsDraftService(interface.IVideoCutsDraftService):
@@ -14,11 +16,13 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
             tel: interface.ITelemetry,
             state_repo: interface.IStateRepo,
             loom_content_client: interface.ILoomContentClient,
+            content_stats_service: interface.IContentStatsService,
     ):
         self.tracer = tel.tracer()
         self.logger = tel.logger()
         self.state_repo = state_repo
         self.loom_content_client = loom_content_client
+        self.content_stats_service = content_stats_service
 
     async def handle_navigate_video_cut(
             self,
@@ -34,13 +38,13 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
                 dialog_manager.show_mode = ShowMode.EDIT
 
                 current_index = dialog_manager.dialog_data.get("current_index", 0)
-                video_cuts_list = dialog_manager.dialog_data.get("video_cuts_list", [])
+                total = total_count(dialog_manager.dialog_data, "video_cuts_page")
 
                 # Определяем направление навигации
                 if button.widget_id == "prev_video_cut":
                     new_index = max(0, current_index - 1)
                 else:  # next_video_cut
-                    new_index = min(len(video_cuts_list) - 1, current_index + 1)
+                    new_index = min(total - 1, current_index + 1)
 
                 if new_index == current_index:
                     await callback.answer()
@@ -83,6 +87,14 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
                     video_cut_id=video_cut_id
                 )
 
+                state = await get_user_state(dialog_manager, self.state_repo)
+                self.content_stats_service.record_deleted(
+                    state.organization_id,
+                    model.VIDEO_CUT_CONTENT_TYPE,
+                    original_video_cut["creator_id"],
+                    "draft",
+                )
+
                 self.logger.info("Черновик видео удален")
                 await callback.answer("🗑 Черновик удален", show_alert=True)
 
@@ -290,6 +302,15 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
                     video_cut_id=video_cut_id
                 )
 
+                state = await get_user_state(dialog_manager, self.state_repo)
+                self.content_stats_service.record_status_changed(
+                    state.organization_id,
+                    model.VIDEO_CUT_CONTENT_TYPE,
+                    original_video_cut["creator_id"],
+                    "draft",
+                    "moderation",
+                )
+
                 self.logger.info("Черновик видео отправлен на модерацию с выбранными соцсетями")
                 await callback.answer(f"📤 Отправлено на модерацию!", show_alert=True)
 
@@ -333,7 +354,7 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
 
                 await self._save_selected_networks(dialog_manager)
 
-                state = await self._get_state(dialog_manager)
+                state = await get_user_state(dialog_manager, self.state_repo)
                 original_video_cut = dialog_manager.dialog_data["original_video_cut"]
                 video_cut_id = original_video_cut["id"]
 
@@ -343,6 +364,13 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
                     moderator_id=state.account_id,
                     moderation_status="approved",
                 )
+                self.content_stats_service.record_status_changed(
+                    state.organization_id,
+                    model.VIDEO_CUT_CONTENT_TYPE,
+                    original_video_cut["creator_id"],
+                    "draft",
+                    "approved",
+                )
 
                 self.logger.info("Черновик видео опубликован с выбранными соцсетями")
                 await callback.answer("Черновик видео опубликован с выбранными соцсетями", show_alert=True)
@@ -469,30 +497,15 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
         )
 
     async def _remove_current_video_cut_from_list(self, dialog_manager: DialogManager) -> None:
-        video_cuts_list = dialog_manager.dialog_data.get("video_cuts_list", [])
-        current_index = dialog_manager.dialog_data.get("current_index", 0)
+        drop_current_item(dialog_manager.dialog_data, "video_cuts_page")
 
-        if video_cuts_list and current_index < len(video_cuts_list):
-            video_cuts_list.pop(current_index)
-
-            # Корректируем индекс если нужно
-            if current_index >= len(video_cuts_list) and video_cuts_list:
-                dialog_manager.dialog_data["current_index"] = len(video_cuts_list) - 1
-            elif not video_cuts_list:
-                dialog_manager.dialog_data["current_index"] = 0
-
-            # Сбрасываем рабочие данные
-            dialog_manager.dialog_data.pop("working_video_cut", None)
-            dialog_manager.dialog_data.pop("original_video_cut", None)
+        # Сбрасываем рабочие данные
+        dialog_manager.dialog_data.pop("working_video_cut", None)
+        dialog_manager.dialog_data.pop("original_video_cut", None)
 
     async def _check_alerts(self, dialog_manager: DialogManager) -> bool:
-        state = await self._get_state(dialog_manager)
-        await self.state_repo.change_user_state(
-            state_id=state.id,
-            can_show_alerts=True
-        )
-
-        vizard_alerts = await self.state_repo.get_vizard_video_cut_alert_by_state_id(
+        state = await get_user_state(dialog_manager, self.state_repo)
+        vizard_alerts = await self.state_repo.enable_alerts_and_get_pending(
             state_id=state.id
         )
         if vizard_alerts:
@@ -503,15 +516,3 @@ class VideoCutsDraftService(interface.IVideoCutsDraftService):
             return True
 
         return False
-
-    async def _get_state(self, dialog_manager: DialogManager) -> model.UserState:
-        if hasattr(dialog_manager.event, 'message') and dialog_manager.event.message:
-            chat_id = dialog_manager.event.message.chat.id
-        elif hasattr(dialog_manager.event, 'chat'):
-            chat_id = dialog_manager.event.chat.id
-        else:
-            raise ValueError("Cannot extract chat_id from dialog_manager")
-        state = await self.state_repo.state_by_id(chat_id)
-        if not state:
-            raise ValueError(f"State not found for chat_id: {chat_id}")
-        return state[0]
@@ -1,5 +1,4 @@
-import io
-from typing import Protocol
+from typing import IO, AsyncIterable, Protocol
 from abc import abstractmethod
 from datetime import datetime
 
@@ -50,7 +49,7 @@ class ILoomContentClient(Protocol):
             publication_text: str,
             text_reference: str,
             prompt: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> list[str]: pass
 
@@ -64,7 +63,7 @@ class ILoomContentClient(Protocol):
             text: str,
             moderation_status: str,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> dict: pass
 
@@ -77,7 +76,7 @@ class ILoomContentClient(Protocol):
             text: str = None,
             time_for_publication: datetime = None,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> None: pass
 
@@ -109,7 +108,18 @@ class ILoomContentClient(Protocol):
     async def get_publications_by_organization(self, organization_id: int) -> list[model.Publication]: pass
 
     @abstractmethod
-    async def download_publication_image(self, publication_id: int) -> tuple[io.BytesIO, str]: pass
+    async def get_publications_page(
+            self,
+            organization_id: int,
+            moderation_status: str = None,
+            creator_id: int = None,
+            moderator_id: int = None,
+            cursor: int = None,
+            limit: int = 20,
+    ) -> model.ContentPage: pass
+
+    @abstractmethod
+    async def download_publication_image(self, publication_id: int) -> tuple[IO[bytes], str]: pass
 
     # РУБРИКИ
     @abstractmethod
@@ -194,6 +204,18 @@ class ILoomContentClient(Protocol):
     @abstractmethod
     async def get_video_cuts_by_organization(self, organization_id: int) -> list[model.VideoCut]: pass
 
+    @abstractmethod
+    async def get_video_cuts_page(
+            self,
+            organization_id: int,
+            moderation_status: str = None,
+            creator_id: int = None,
+            moderator_id: int = None,
+            with_video: bool = False,
+            cursor: int = None,
+            limit: int = 20,
+    ) -> model.ContentPage: pass
+
     @abstractmethod
     async def moderate_video_cut(
             self,
@@ -204,12 +226,12 @@ class ILoomContentClient(Protocol):
     ) -> None: pass
 
     @abstractmethod
-    async def download_video_cut(self, video_cut_id: int) -> tuple[io.BytesIO, str]: pass
+    async def download_video_cut(self, video_cut_id: int) -> tuple[IO[bytes], str]: pass
 
     @abstractmethod
     async def transcribe_audio(
             self,
             organization_id: int,
-            audio_content: bytes = None,
+            audio_content: bytes | AsyncIterable[bytes] = None,
             audio_filename: str = None,
     ) -> str: pass
@@ -47,6 +47,14 @@ class ITelegramMiddleware(Protocol):
             data: dict[str, Any]
     ): pass
 
+    @abstractmethod
+    async def state_middleware04(
+            self,
+            handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: dict[str, Any]
+    ): pass
+
 
 
 class ITelegramWebhookController(Protocol):
@@ -78,6 +86,12 @@ class ITelegramWebhookController(Protocol):
             body: SetCacheFileBody,
     ) -> JSONResponse: pass
 
+    @abstractmethod
+    async def set_cache_files(
+            self,
+            body: SetCacheFilesBody,
+    ) -> JSONResponse: pass
+
 
 class IHttpMiddleware(Protocol):
     @abstractmethod
@@ -129,6 +143,9 @@ class IRedis(Protocol):
     @abstractmethod
     async def get(self, key: str, default: Any = None) -> Any: pass
 
+    @abstractmethod
+    async def delete(self, *keys: str) -> int: pass
+
 
 class IDB(Protocol):
     @abstractmethod
@@ -144,4 +161,10 @@ class IDB(Protocol):
     async def select(self, query: str, query_params: dict) -> Sequence[Any]: pass
 
     @abstractmethod
-    async def multi_query(self, queries: list[str]) -> None: pass
+    async def read_only_select(self, query: str, query_params: dict) -> Sequence[Any]: pass
+
+    @abstractmethod
+    async def execute_returning(self, query: str, query_params: dict) -> Sequence[Any]: pass
+
+    @abstractmethod
+    async def multi_query(self, queries: list[str], autocommit: bool = False) -> None: pass
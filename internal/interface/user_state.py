@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Protocol, ContextManager
 from abc import abstractmethod
 
 from internal import model
@@ -9,9 +9,24 @@ class IStateService(Protocol):
     @abstractmethod
     async def create_state(self, tg_chat_id: int, tg_username: str) -> int: pass
 
+    @abstractmethod
+    async def get_or_create_state(
+            self,
+            tg_chat_id: int,
+            tg_username: str,
+            can_show_alerts: bool = None,
+            show_error_recovery: bool = None,
+    ) -> model.UserState: pass
+
     @abstractmethod
     async def state_by_id(self, tg_chat_id: int) -> list[model.UserState]: pass
 
+    @abstractmethod
+    def update_scope(self) -> ContextManager[None]: pass
+
+    @abstractmethod
+    async def flush_pending_writes(self) -> None: pass
+
     @abstractmethod
     async def state_by_account_id(self, account_id: int) -> list[model.UserState]: pass
 
@@ -57,18 +72,39 @@ class IStateRepo(Protocol):
     @abstractmethod
     async def create_state(self, tg_chat_id: int, tg_username: str) -> int: pass
 
+    @abstractmethod
+    async def get_or_create_state(
+            self,
+            tg_chat_id: int,
+            tg_username: str,
+            can_show_alerts: bool = None,
+            show_error_recovery: bool = None,
+    ) -> model.UserState: pass
+
     @abstractmethod
     async def state_by_id(self, tg_chat_id: int) -> list[model.UserState]: pass
 
+    @abstractmethod
+    def update_scope(self) -> ContextManager[None]: pass
+
+    @abstractmethod
+    async def flush_pending_writes(self) -> None: pass
+
     @abstractmethod
     async def state_by_account_id(self, account_id: int) -> list[model.UserState]: pass
 
     @abstractmethod
     async def set_cache_file(self, filename: str, file_id: str): pass
 
+    @abstractmethod
+    async def set_cache_files(self, files: dict[str, str]): pass
+
     @abstractmethod
     async def get_cache_file(self, filename: str) -> list[model.CachedFile]: pass
 
+    @abstractmethod
+    async def get_recent_cache_files(self, limit: int) -> list[model.CachedFile]: pass
+
     @abstractmethod
     async def change_user_state(
             self,
@@ -100,4 +136,57 @@ class IStateRepo(Protocol):
     ) -> list[model.VizardVideoCutAlert]: pass
 
     @abstractmethod
-    async def delete_vizard_video_cut_alert(self, state_id: int) -> None: pass
\ No newline at end of file
+    async def enable_alerts_and_get_pending(
+        self,
+        state_id: int
+    ) -> list[model.VizardVideoCutAlert]: pass
+
+    @abstractmethod
+    async def delete_vizard_video_cut_alert(self, state_id: int) -> None: pass
+
+class IFileCacheService(Protocol):
+    @abstractmethod
+    async def preload(self) -> None: pass
+
+    @abstractmethod
+    async def get_file_id(self, filename: str) -> str | None: pass
+
+    @abstractmethod
+    async def set_cache_file(self, filename: str, file_id: str) -> None: pass
+
+    @abstractmethod
+    async def set_cache_files(self, files: dict[str, str]) -> None: pass
+
+
+class IContentStatsService(Protocol):
+    @abstractmethod
+    async def get_stats(self, organization_id: int) -> model.ContentStats: pass
+
+    @abstractmethod
+    def record_created(
+            self,
+            organization_id: int,
+            content_type: str,
+            creator_id: int | None,
+            moderation_status: str,
+            count: int = 1,
+    ) -> None: pass
+
+    @abstractmethod
+    def record_status_changed(
+            self,
+            organization_id: int,
+            content_type: str,
+            creator_id: int | None,
+            old_status: str,
+            new_status: str,
+    ) -> None: pass
+
+    @abstractmethod
+    def record_deleted(
+            self,
+            organization_id: int,
+            content_type: str,
+            creator_id: int | None,
+            moderation_status: str,
+    ) -> None: pass
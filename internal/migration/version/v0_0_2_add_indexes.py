@@ -0,0 +1,171 @@
+from internal import interface
+from internal.migration.base import Migration, MigrationInfo
+
+
+# Построение уникального индекса повторяется, если дубликат успел появиться после чистки
+INDEX_BUILD_ATTEMPTS = 3
+
+
+class AddIndexesMigration(Migration):
+
+    def get_info(self) -> MigrationInfo:
+        return MigrationInfo(
+            version="v0_0_2",
+            name="add_indexes",
+            depends_on="v0_0_1",
+        )
+
+    async def up(self, db: interface.IDB):
+        # Уникальные индексы строим после чистки дубликатов своей таблицы
+        await self.build_index(
+            db,
+            "user_states_tg_chat_id_uindex",
+            create_user_states_tg_chat_id_index,
+            drop_user_states_tg_chat_id_index,
+            [repoint_duplicate_state_alerts, delete_duplicate_states],
+        )
+        await self.build_index(
+            db,
+            "user_states_account_id_index",
+            create_user_states_account_id_index,
+            drop_user_states_account_id_index,
+        )
+        await self.build_index(
+            db,
+            "cache_files_filename_uindex",
+            create_cache_files_filename_index,
+            drop_cache_files_filename_index,
+            [delete_duplicate_cache_files],
+        )
+        await self.build_index(
+            db,
+            "vizard_video_cut_alerts_state_id_index",
+            create_vizard_video_cut_alerts_state_id_index,
+            drop_vizard_video_cut_alerts_state_id_index,
+        )
+
+    async def build_index(
+            self,
+            db: interface.IDB,
+            index_name: str,
+            create_index: str,
+            drop_index: str,
+            dedupe: list[str] = None,
+    ):
+        """
+        CONCURRENTLY нельзя выполнять в транзакции, поэтому чистка и построение идут разными запросами.
+        Бот продолжает писать: дубликат, вставленный между ними, роняет построение и оставляет INVALID индекс,
+        который IF NOT EXISTS потом молча считает готовым. Такой индекс удаляем и повторяем с новой чистки.
+        """
+        for attempt in range(1, INDEX_BUILD_ATTEMPTS + 1):
+            if dedupe:
+                await db.multi_query(dedupe)
+            if await self.index_is_invalid(db, index_name):
+                await db.multi_query([drop_index], autocommit=True)
+
+            try:
+                await db.multi_query([create_index], autocommit=True)
+                return
+            except Exception:
+                # Ошибку без невалидного индекса (нет соединения, нет прав) повтор не исправит
+                if attempt == INDEX_BUILD_ATTEMPTS or not await self.index_is_invalid(db, index_name):
+                    raise
+
+    async def index_is_invalid(self, db: interface.IDB, index_name: str) -> bool:
+        rows = await db.select(invalid_index, {"index_name": index_name})
+        return bool(rows)
+
+    async def down(self, db: interface.IDB):
+        await db.multi_query([
+            drop_user_states_tg_chat_id_index,
+            drop_user_states_account_id_index,
+            drop_cache_files_filename_index,
+            drop_vizard_video_cut_alerts_state_id_index,
+        ], autocommit=True)
+
+
+# Из дубликатов user_states оставляем самое "полное" состояние (с организацией и аккаунтом),
+# при равенстве — самое раннее (строки без created_at — в последнюю очередь). Алерты удаляемых дубликатов переносим на оставшуюся запись
+ranked_user_states = """
+SELECT id,
+       tg_chat_id,
+       FIRST_VALUE(id) OVER (
+           PARTITION BY tg_chat_id
+           ORDER BY (organization_id <> 0) DESC, (account_id <> 0) DESC, created_at ASC NULLS LAST, id
+       ) AS keep_id
+FROM user_states
+"""
+
+repoint_duplicate_state_alerts = f"""
+UPDATE vizard_video_cut_alerts AS alerts
+SET state_id = ranked.keep_id
+FROM ({ranked_user_states}) AS ranked
+WHERE alerts.state_id = ranked.id
+  AND ranked.id <> ranked.keep_id;
+"""
+
+delete_duplicate_states = f"""
+DELETE FROM user_states
+WHERE id IN (
+    SELECT id FROM ({ranked_user_states}) AS ranked
+    WHERE ranked.id <> ranked.keep_id
+);
+"""
+
+# Для cache_files актуален последний сохраненный file_id; без NULLS LAST строка без created_at
+# при DESC оказалась бы первой
+delete_duplicate_cache_files = """
+DELETE FROM cache_files
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (PARTITION BY filename ORDER BY created_at DESC NULLS LAST, id DESC) AS rn
+        FROM cache_files
+    ) AS ranked
+    WHERE ranked.rn > 1
+);
+"""
+
+invalid_index = """
+SELECT 1
+FROM pg_index
+JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+WHERE pg_class.relname = :index_name
+  AND NOT pg_index.indisvalid;
+"""
+
+create_user_states_tg_chat_id_index = """
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS user_states_tg_chat_id_uindex
+ON user_states (tg_chat_id);
+"""
+
+create_user_states_account_id_index = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_states_account_id_index
+ON user_states (account_id);
+"""
+
+create_cache_files_filename_index = """
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS cache_files_filename_uindex
+ON cache_files (filename);
+"""
+
+create_vizard_video_cut_alerts_state_id_index = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS vizard_video_cut_alerts_state_id_index
+ON vizard_video_cut_alerts (state_id);
+"""
+
+drop_user_states_tg_chat_id_index = """
+DROP INDEX CONCURRENTLY IF EXISTS user_states_tg_chat_id_uindex;
+"""
+
+drop_user_states_account_id_index = """
+DROP INDEX CONCURRENTLY IF EXISTS user_states_account_id_index;
+"""
+
+drop_cache_files_filename_index = """
+DROP INDEX CONCURRENTLY IF EXISTS cache_files_filename_uindex;
+"""
+
+drop_vizard_video_cut_alerts_state_id_index = """
+DROP INDEX CONCURRENTLY IF EXISTS vizard_video_cut_alerts_state_id_index;
+"""
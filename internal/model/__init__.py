@@ -1,5 +1,6 @@
 from internal.model.sql_model import *
 from internal.model.user_state import *
+from internal.model.content_stats import *
 
 from internal.model.dialog_states.auth import *
 from internal.model.dialog_states.main_menu import *
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 
 from pydantic import BaseModel
 
-@dataclass
+@dataclass(slots=True)
 class AuthorizationDataDTO:
     account_id: int
     access_token: str
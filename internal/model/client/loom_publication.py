@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Publication:
     id: int
     organization_id: int
@@ -46,7 +46,7 @@ class Publication:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Category:
     id: int
     organization_id: int
@@ -90,7 +90,7 @@ class Category:
 
     created_at: str
 
-@dataclass
+@dataclass(slots=True)
 class Autoposting:
     id: int
     organization_id: int
@@ -101,7 +101,7 @@ class Autoposting:
 
     created_at: str
 
-@dataclass
+@dataclass(slots=True)
 class VideoCut:
     id: int
     project_id: int
@@ -150,4 +150,49 @@ class VideoCut:
             "moderation_comment": self.moderation_comment,
             "publication_at": self.publication_at,
             "created_at": self.created_at
-        }
\ No newline at end of file
+        }
+
+
+@dataclass(slots=True)
+class ContentPage:
+    # Страница списка публикаций или нарезок от новых к старым; next_cursor — id последнего элемента,
+    # следующая страница начинается с id < next_cursor, None на последней странице
+    items: list
+    next_cursor: int | None
+    total_count: int
+    # Вся история без фильтров, если сервис ответил списком вместо страницы
+    source: list | None = None
+    # created_at самого старого элемента выборки: он на последней странице, а период нужен уже на первой
+    oldest_created_at: str | None = None
+
+    @classmethod
+    def paginate(cls, items: list, cursor: int | None, limit: int, **filters) -> "ContentPage":
+        """Страница из уже загруженной истории: те же фильтры и keyset по убыванию id, что и у сервиса."""
+
+        def matches(item) -> bool:
+            for name, value in filters.items():
+                if value is None:
+                    continue
+                if name in ("has_video", "with_video"):
+                    if value and not item.video_fid:
+                        return False
+                elif getattr(item, name) != value:
+                    return False
+            return True
+
+        # Новые сверху, как сервис отдает историю и как карусели показывали ее до страниц
+        matched = sorted((item for item in items if matches(item)), key=lambda item: item.id, reverse=True)
+        total_count = len(matched)
+        oldest_created_at = min((item.created_at for item in matched if item.created_at), default=None)
+        if cursor is not None:
+            matched = [item for item in matched if item.id < cursor]
+
+        page = matched[:limit]
+        next_cursor = page[-1].id if page and len(matched) > limit else None
+        return cls(
+            items=page,
+            next_cursor=next_cursor,
+            total_count=total_count,
+            source=items,
+            oldest_created_at=oldest_created_at,
+        )
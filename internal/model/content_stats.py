@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+
+PUBLICATION_CONTENT_TYPE = "publication"
+VIDEO_CUT_CONTENT_TYPE = "video_cut"
+
+
+@dataclass(slots=True)
+class ContentStats:
+    # (content_type, moderation_status) -> количество по всей организации
+    by_status: dict[tuple[str, str], int] = field(default_factory=dict)
+    # creator_id -> (content_type, moderation_status) -> количество
+    by_creator: dict[int, dict[tuple[str, str], int]] = field(default_factory=dict)
+
+    def count(
+            self,
+            content_type: str = None,
+            moderation_status: str = None,
+            creator_id: int = None,
+    ) -> int:
+        counters = self.by_status if creator_id is None else self.by_creator.get(creator_id, {})
+        if content_type is not None and moderation_status is not None:
+            return counters.get((content_type, moderation_status), 0)
+
+        # Типов контента и статусов единицы, поэтому проход по ключам не зависит от объема контента
+        return sum(
+            value for (item_type, item_status), value in counters.items()
+            if (content_type is None or item_type == content_type)
+            and (moderation_status is None or item_status == moderation_status)
+        )
+
+    def add(self, content_type: str, moderation_status: str, creator_id: int | None, delta: int) -> None:
+        key = (content_type, moderation_status)
+        self.by_status[key] = max(self.by_status.get(key, 0) + delta, 0)
+        if creator_id is not None:
+            creator_counters = self.by_creator.setdefault(creator_id, {})
+            creator_counters[key] = max(creator_counters.get(key, 0) + delta, 0)
@@ -35,6 +35,22 @@ CREATE TABLE IF NOT EXISTS vizard_video_cut_alerts (
 );
 """
 
+create_user_states_tg_chat_id_index = """
+CREATE UNIQUE INDEX IF NOT EXISTS user_states_tg_chat_id_uindex ON user_states (tg_chat_id);
+"""
+
+create_user_states_account_id_index = """
+CREATE INDEX IF NOT EXISTS user_states_account_id_index ON user_states (account_id);
+"""
+
+create_cache_files_filename_index = """
+CREATE UNIQUE INDEX IF NOT EXISTS cache_files_filename_uindex ON cache_files (filename);
+"""
+
+create_vizard_video_cut_alerts_state_id_index = """
+CREATE INDEX IF NOT EXISTS vizard_video_cut_alerts_state_id_index ON vizard_video_cut_alerts (state_id);
+"""
+
 
 drop_state_table = """
 DROP TABLE IF EXISTS user_states;
@@ -53,6 +69,10 @@ create_queries = [
     create_state_table,
     create_cache_files_table,
     create_vizard_video_cut_alerts_table,
+    create_user_states_tg_chat_id_index,
+    create_user_states_account_id_index,
+    create_cache_files_filename_index,
+    create_vizard_video_cut_alerts_state_id_index,
 ]
 drop_queries = [
     drop_state_table,
@@ -4,6 +4,21 @@ VALUES (:tg_chat_id, :tg_username)
 RETURNING id;
 """
 
+# Один запрос на /start и восстановление: создает состояние или сбрасывает флаги существующего
+get_or_create_state = """
+INSERT INTO user_states (tg_chat_id, tg_username, can_show_alerts, show_error_recovery)
+VALUES (
+    :tg_chat_id,
+    :tg_username,
+    COALESCE(CAST(:can_show_alerts AS BOOLEAN), TRUE),
+    COALESCE(CAST(:show_error_recovery AS BOOLEAN), FALSE)
+)
+ON CONFLICT (tg_chat_id) DO UPDATE SET
+    can_show_alerts = COALESCE(CAST(:can_show_alerts AS BOOLEAN), user_states.can_show_alerts),
+    show_error_recovery = COALESCE(CAST(:show_error_recovery AS BOOLEAN), user_states.show_error_recovery)
+RETURNING *;
+"""
+
 state_by_id = """
 SELECT * FROM user_states
 WHERE tg_chat_id = :tg_chat_id;
@@ -17,14 +32,28 @@ WHERE account_id = :account_id;
 set_cache_file = """
 INSERT INTO cache_files (filename, file_id)
 VALUES (:filename, :file_id)
+ON CONFLICT (filename) DO UPDATE SET file_id = EXCLUDED.file_id, created_at = CURRENT_TIMESTAMP
 RETURNING id;
 """
 
+# Пакетный upsert: массивы filename/file_id разворачиваются в строки одним запросом
+set_cache_files = """
+INSERT INTO cache_files (filename, file_id)
+SELECT * FROM UNNEST(CAST(:filenames AS TEXT[]), CAST(:file_ids AS TEXT[]))
+ON CONFLICT (filename) DO UPDATE SET file_id = EXCLUDED.file_id, created_at = CURRENT_TIMESTAMP;
+"""
+
 get_cache_file = """
 SELECT * FROM cache_files
 WHERE filename = :filename;
 """
 
+get_recent_cache_files = """
+SELECT * FROM cache_files
+ORDER BY created_at DESC
+LIMIT :limit;
+"""
+
 delete_state_by_tg_chat_id = """
 DELETE FROM user_states
 WHERE tg_chat_id = :tg_chat_id;
@@ -41,7 +70,57 @@ SELECT * FROM vizard_video_cut_alerts
 WHERE state_id = :state_id;
 """
 
+# Включает показ уведомлений и сразу возвращает ожидающие алерты — один round-trip вместо трех
+enable_alerts_and_get_pending = """
+WITH enabled AS (
+    UPDATE user_states
+    SET can_show_alerts = TRUE
+    WHERE id = :state_id AND can_show_alerts IS DISTINCT FROM TRUE
+)
+SELECT * FROM vizard_video_cut_alerts
+WHERE state_id = :state_id;
+"""
+
 delete_vizard_video_cut_alert = """
 DELETE FROM vizard_video_cut_alerts
 WHERE state_id = :state_id;
-"""
\ No newline at end of file
+"""
+
+tg_chat_id_by_state_id = """
+SELECT tg_chat_id FROM user_states
+WHERE id = :state_id;
+"""
+
+# Пакетный сброс отложенных флагов. NULL в массиве — поле у этого состояния не менялось.
+# Один текст запроса на любой размер пачки, поэтому подготовленное выражение переиспользуется.
+# RETURNING отдает чаты сброшенных состояний, чтобы очистить их кеш без отдельного запроса
+flush_state_flags = """
+UPDATE user_states AS us
+SET can_show_alerts = COALESCE(v.can_show_alerts, us.can_show_alerts),
+    show_error_recovery = COALESCE(v.show_error_recovery, us.show_error_recovery)
+FROM UNNEST(
+    CAST(:state_ids AS INTEGER[]),
+    CAST(:can_show_alerts AS BOOLEAN[]),
+    CAST(:show_error_recovery AS BOOLEAN[])
+) AS v(id, can_show_alerts, show_error_recovery)
+WHERE us.id = v.id
+RETURNING us.id, us.tg_chat_id;
+"""
+
+queries = [
+    create_state,
+    get_or_create_state,
+    state_by_id,
+    state_by_account_id,
+    set_cache_file,
+    set_cache_files,
+    get_cache_file,
+    get_recent_cache_files,
+    delete_state_by_tg_chat_id,
+    create_vizard_video_cut_alert,
+    get_vizard_video_cut_alert_by_state_id,
+    enable_alerts_and_get_pending,
+    delete_vizard_video_cut_alert,
+    tg_chat_id_by_state_id,
+    flush_state_flags,
+]
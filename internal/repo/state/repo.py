@@ -1,14 +1,75 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, replace
+from datetime import datetime
+from typing import Iterator
+
 from opentelemetry.trace import SpanKind, Status, StatusCode
 
 from .query import *
 from internal import model
-from internal import interface
+from internal import interface, common
+from pkg.cache.cache import LRUCache
+
+
+# tg_chat_id -> UserState в рамках обработки одного telegram update.
+# Объекты общие для всех читателей update, поэтому записи через change_user_state видны сразу.
+update_states: ContextVar[dict[int, model.UserState] | None] = ContextVar("update_states", default=None)
+
+# Флаги, которые пишутся почти на каждой навигации и могут уйти в Postgres с задержкой
+WRITE_BEHIND_FIELDS = ("can_show_alerts", "show_error_recovery")
 
 
 class StateRepo(interface.IStateRepo):
-    def __init__(self, tel: interface.ITelemetry, db: interface.IDB):
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            db: interface.IDB,
+            redis: interface.IRedis = None,
+            state_cache_max_size: int = 10000,
+            state_cache_ttl: int = 60,
+            read_after_write_window: int = 5,
+            write_behind_interval: float = 1.0,
+    ):
         self.db = db
+        self.redis = redis
         self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+
+        # tg_chat_id -> UserState
+        self.state_cache = LRUCache(state_cache_max_size, state_cache_ttl)
+        self.state_cache_ttl = state_cache_ttl
+        # state_id -> tg_chat_id, нужен change_user_state для поиска записи в кеше
+        self.state_chat_ids = LRUCache(state_cache_max_size, None)
+        # state_id -> есть ли у пользователя непрочитанные алерты нарезок. Без redis — только локально
+        self.pending_alerts = LRUCache(state_cache_max_size, state_cache_ttl)
+        # Чаты, записанные за последние секунды: читаем их с основного инстанса, а не с реплики
+        self.recent_state_writes = LRUCache(state_cache_max_size, read_after_write_window)
+        # Увеличивается при каждой записи, чтобы не положить в кеш строку, прочитанную до записи
+        self.state_cache_epoch = 0
+
+        # state_id -> {поле: значение} для флагов, еще не записанных в Postgres. 0 — писать сразу.
+        # Буфер живет только в памяти: при падении процесса флаги за последние write_behind_interval
+        # секунд теряются, сбрасывает их только штатная остановка (flush_pending_writes на shutdown)
+        self.write_behind_interval = write_behind_interval
+        self.pending_flag_writes: dict[int, dict[str, bool]] = {}
+        # Пачка, которая прямо сейчас пишется в Postgres: до коммита она тоже накладывается на чтения
+        self.flushing_flag_writes: dict[int, dict[str, bool]] = {}
+        self.flush_lock = asyncio.Lock()
+        self.flush_task: asyncio.Task | None = None
+
+        self.state_cache_hit_counter = self.meter.create_counter(
+            name=common.STATE_CACHE_HIT_TOTAL_METRIC,
+            description="Total count of user state cache hits",
+            unit="1"
+        )
+        self.state_cache_miss_counter = self.meter.create_counter(
+            name=common.STATE_CACHE_MISS_TOTAL_METRIC,
+            description="Total count of user state cache misses",
+            unit="1"
+        )
 
     async def create_state(self, tg_chat_id: int, tg_username: str) -> int:
         with self.tracer.start_as_current_span(
@@ -24,6 +85,7 @@ class StateRepo(interface.IStateRepo):
                     'tg_username': tg_username,
                 }
                 state_id = await self.db.insert(create_state, args)
+                await self._invalidate_state(tg_chat_id)
 
                 span.set_status(StatusCode.OK)
                 return state_id
@@ -32,6 +94,55 @@ class StateRepo(interface.IStateRepo):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise err
 
+    async def get_or_create_state(
+            self,
+            tg_chat_id: int,
+            tg_username: str,
+            can_show_alerts: bool = None,
+            show_error_recovery: bool = None,
+    ) -> model.UserState:
+        with self.tracer.start_as_current_span(
+                "StateRepo.get_or_create_state",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id,
+                }
+        ) as span:
+            try:
+                args = {
+                    'tg_chat_id': tg_chat_id,
+                    'tg_username': tg_username,
+                    'can_show_alerts': can_show_alerts,
+                    'show_error_recovery': show_error_recovery,
+                }
+                rows = await self.db.execute_returning(get_or_create_state, args)
+                state = model.UserState.serialize(rows)[0]
+
+                flags = {field: args[field] for field in WRITE_BEHIND_FIELDS if args[field] is not None}
+                self._supersede_flag_writes(state.id, flags)
+                self._apply_flag_writes(state)
+
+                self.state_cache_epoch += 1
+                self.recent_state_writes.set(tg_chat_id, True)
+                await self._cache_state(state)
+
+                scope = update_states.get()
+                if scope is not None:
+                    if tg_chat_id in scope:
+                        # Объект из scope уже отдан в middleware_data, обновляем его на месте
+                        for field, value in asdict(state).items():
+                            setattr(scope[tg_chat_id], field, value)
+                        state = scope[tg_chat_id]
+                    else:
+                        scope[tg_chat_id] = state
+
+                span.set_status(StatusCode.OK)
+                return state
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
     async def state_by_id(self, tg_chat_id) -> list[model.UserState]:
         with self.tracer.start_as_current_span(
                 "StateRepo.state_by_id",
@@ -41,10 +152,30 @@ class StateRepo(interface.IStateRepo):
                 }
         ) as span:
             try:
-                args = {'tg_chat_id': tg_chat_id}
-                rows = await self.db.select(state_by_id, args)
+                scope = update_states.get()
+                if scope is not None and tg_chat_id in scope:
+                    span.set_status(StatusCode.OK)
+                    return [scope[tg_chat_id]]
+
+                state = await self._get_cached_state(tg_chat_id)
+                if state is not None:
+                    rows = [state]
+                else:
+                    epoch = self.state_cache_epoch
+                    args = {'tg_chat_id': tg_chat_id}
+                    if tg_chat_id in self.recent_state_writes:
+                        rows = await self.db.select(state_by_id, args)
+                    else:
+                        rows = await self.db.read_only_select(state_by_id, args)
+                    if rows:
+                        rows = model.UserState.serialize(rows)
+                        if epoch == self.state_cache_epoch:
+                            await self._cache_state(rows[0])
+
                 if rows:
-                    rows = model.UserState.serialize(rows)
+                    self._apply_flag_writes(rows[0])
+                if rows and scope is not None:
+                    scope[tg_chat_id] = rows[0]
 
                 span.set_status(StatusCode.OK)
                 return rows
@@ -66,6 +197,8 @@ class StateRepo(interface.IStateRepo):
                 rows = await self.db.select(state_by_account_id, args)
                 if rows:
                     rows = model.UserState.serialize(rows)
+                    for state in rows:
+                        self._apply_flag_writes(state)
 
                 span.set_status(StatusCode.OK)
                 return rows
@@ -89,14 +222,49 @@ class StateRepo(interface.IStateRepo):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
 
+    async def set_cache_files(self, files: dict[str, str]):
+        with self.tracer.start_as_current_span(
+                "StateRepo.set_cache_files",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "files_count": len(files),
+                }
+        ) as span:
+            try:
+                args = {'filenames': list(files.keys()), 'file_ids': list(files.values())}
+                await self.db.update(set_cache_files, args)
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
     async def get_cache_file(self, filename: str) -> list[model.CachedFile]:
         with self.tracer.start_as_current_span(
-                "StateRepo.set_cache_file",
+                "StateRepo.get_cache_file",
                 kind=SpanKind.INTERNAL
         ) as span:
             try:
                 args = {'filename': filename}
-                rows = await self.db.select(get_cache_file, args)
+                rows = await self.db.read_only_select(get_cache_file, args)
+                if rows:
+                    rows = model.CachedFile.serialize(rows)
+                span.set_status(StatusCode.OK)
+                return rows
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def get_recent_cache_files(self, limit: int) -> list[model.CachedFile]:
+        with self.tracer.start_as_current_span(
+                "StateRepo.get_recent_cache_files",
+                kind=SpanKind.INTERNAL
+        ) as span:
+            try:
+                args = {'limit': limit}
+                rows = await self.db.read_only_select(get_recent_cache_files, args)
                 if rows:
                     rows = model.CachedFile.serialize(rows)
                 span.set_status(StatusCode.OK)
@@ -124,47 +292,41 @@ class StateRepo(interface.IStateRepo):
                 }
         ) as span:
             try:
-                # Формируем запрос динамически в зависимости от переданных параметров
-                update_fields = []
-                args: dict = {'state_id': state_id}
-
-                if account_id is not None:
-                    update_fields.append("account_id = :account_id")
-                    args['account_id'] = account_id
-
-                if organization_id is not None:
-                    update_fields.append("organization_id = :organization_id")
-                    args['organization_id'] = organization_id
-
-                if access_token is not None:
-                    update_fields.append("access_token = :access_token")
-                    args['access_token'] = access_token
-
-                if refresh_token is not None:
-                    update_fields.append("refresh_token = :refresh_token")
-                    args['refresh_token'] = refresh_token
-
-                if can_show_alerts is not None:
-                    update_fields.append("can_show_alerts = :can_show_alerts")
-                    args['can_show_alerts'] = can_show_alerts
-
-                if show_error_recovery is not None:
-                    update_fields.append("show_error_recovery = :show_error_recovery")
-                    args['show_error_recovery'] = show_error_recovery
+                changes = {
+                    'account_id': account_id,
+                    'organization_id': organization_id,
+                    'access_token': access_token,
+                    'refresh_token': refresh_token,
+                    'can_show_alerts': can_show_alerts,
+                    'show_error_recovery': show_error_recovery,
+                }
+                changes = {field: value for field, value in changes.items() if value is not None}
 
-                if not update_fields:
+                if not changes:
                     # Если нет полей для обновления, просто возвращаемся
                     span.set_status(Status(StatusCode.OK))
                     return
 
-                # Формируем финальный запрос
-                query = f"""
-                UPDATE user_states 
-                SET {', '.join(update_fields)}
-                WHERE id = :state_id;
-                """
+                if self.write_behind_interval > 0 and set(changes) <= set(WRITE_BEHIND_FIELDS):
+                    # Только некритичные флаги: копим в буфере, в Postgres они уйдут пачкой
+                    self._buffer_flag_writes(state_id, changes)
+                    await self._update_cached_state(state_id, changes, buffered=True)
+                else:
+                    # Запрос все равно идет в Postgres — заодно забираем отложенные флаги этого состояния
+                    db_changes = {**self.pending_flag_writes.get(state_id, {}), **changes}
+
+                    # Формируем запрос динамически в зависимости от переданных параметров
+                    update_fields = [f"{field} = :{field}" for field in db_changes]
+                    query = f"""
+                    UPDATE user_states 
+                    SET {', '.join(update_fields)}
+                    WHERE id = :state_id;
+                    """
+
+                    await self.db.update(query, {**db_changes, 'state_id': state_id})
+                    self._supersede_flag_writes(state_id, db_changes)
+                    await self._update_cached_state(state_id, changes)
 
-                await self.db.update(query, args)
                 span.set_status(StatusCode.OK)
             except Exception as err:
                 span.record_exception(err)
@@ -184,6 +346,7 @@ class StateRepo(interface.IStateRepo):
                     'tg_chat_id': tg_chat_id
                 }
                 await self.db.delete(delete_state_by_tg_chat_id, args)
+                await self._invalidate_state(tg_chat_id)
 
                 span.set_status(StatusCode.OK)
             except Exception as err:
@@ -208,6 +371,7 @@ class StateRepo(interface.IStateRepo):
                     'video_count': video_count,
                 }
                 alert_id = await self.db.insert(create_vizard_video_cut_alert, args)
+                await self._set_pending_alerts(state_id, True)
 
                 span.set_status(StatusCode.OK)
                 return alert_id
@@ -226,9 +390,10 @@ class StateRepo(interface.IStateRepo):
         ) as span:
             try:
                 args = {'state_id': state_id}
-                rows = await self.db.select(get_vizard_video_cut_alert_by_state_id, args)
+                rows = await self.db.read_only_select(get_vizard_video_cut_alert_by_state_id, args)
                 if rows:
                     rows = model.VizardVideoCutAlert.serialize(rows)
+                await self._set_pending_alerts(state_id, bool(rows))
 
                 span.set_status(StatusCode.OK)
                 return rows
@@ -237,6 +402,83 @@ class StateRepo(interface.IStateRepo):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
 
+    async def enable_alerts_and_get_pending(self, state_id: int) -> list[model.VizardVideoCutAlert]:
+        with self.tracer.start_as_current_span(
+                "StateRepo.enable_alerts_and_get_pending",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "state_id": state_id,
+                }
+        ) as span:
+            try:
+                if await self._get_pending_alerts(state_id) is False:
+                    # Алертов точно нет: в Postgres идем, только если флаг еще не включен
+                    state = self._known_state(state_id)
+                    if state is None or not state.can_show_alerts:
+                        await self.change_user_state(state_id, can_show_alerts=True)
+
+                    span.set_status(StatusCode.OK)
+                    return []
+
+                args = {'state_id': state_id}
+                rows = await self.db.execute_returning(enable_alerts_and_get_pending, args)
+                alerts = model.VizardVideoCutAlert.serialize(rows) if rows else []
+                self._supersede_flag_writes(state_id, {'can_show_alerts': True})
+
+                await self._update_cached_state(state_id, {'can_show_alerts': True})
+                await self._set_pending_alerts(state_id, bool(alerts))
+
+                span.set_status(StatusCode.OK)
+                return alerts
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def flush_pending_writes(self) -> None:
+        with self.tracer.start_as_current_span(
+                "StateRepo.flush_pending_writes",
+                kind=SpanKind.INTERNAL,
+        ) as span:
+            async with self.flush_lock:
+                batch = self.pending_flag_writes
+                if not batch:
+                    span.set_status(StatusCode.OK)
+                    return
+
+                self.pending_flag_writes = {}
+                self.flushing_flag_writes = batch
+                span.set_attribute("states_count", len(batch))
+                try:
+                    args = {
+                        'state_ids': list(batch.keys()),
+                        'can_show_alerts': [changes.get('can_show_alerts') for changes in batch.values()],
+                        'show_error_recovery': [changes.get('show_error_recovery') for changes in batch.values()],
+                    }
+                    rows = await self.db.execute_returning(flush_state_flags, args)
+                except Exception as err:
+                    # Возвращаем пачку в буфер, не затирая значения, записанные во время сброса
+                    for state_id, changes in batch.items():
+                        self.pending_flag_writes[state_id] = {**changes, **self.pending_flag_writes.get(state_id, {})}
+
+                    span.record_exception(err)
+                    span.set_status(StatusCode.ERROR, str(err))
+                    self.logger.error(
+                        "Не удалось сбросить отложенные флаги состояний",
+                        {common.ERROR_KEY: str(err), "states_count": len(batch)}
+                    )
+                    return
+                finally:
+                    self.flushing_flag_writes = {}
+
+            # Чаты приходят из RETURNING: отложенная запись не искала их в Postgres.
+            # Другие инстансы могли положить в redis строку, прочитанную до сброса, а реплика может отставать
+            for row in rows:
+                self.recent_state_writes.set(row.tg_chat_id, True)
+                await self._delete_redis_state(row.tg_chat_id)
+
+            span.set_status(StatusCode.OK)
+
     async def delete_vizard_video_cut_alert(self, state_id: int) -> None:
         with self.tracer.start_as_current_span(
                 "StateRepo.delete_vizard_video_cut_alert",
@@ -250,9 +492,181 @@ class StateRepo(interface.IStateRepo):
                     'state_id': state_id
                 }
                 await self.db.delete(delete_vizard_video_cut_alert, args)
+                await self._set_pending_alerts(state_id, False)
 
                 span.set_status(StatusCode.OK)
             except Exception as err:
                 span.record_exception(err)
                 span.set_status(StatusCode.ERROR, str(err))
-                raise
\ No newline at end of file
+                raise
+
+    async def _get_cached_state(self, tg_chat_id: int) -> model.UserState | None:
+        state = self.state_cache.get(tg_chat_id)
+        if state is not None:
+            self.state_cache_hit_counter.add(1, attributes={common.CACHE_TIER_KEY: "local"})
+            return replace(state)
+
+        if self.redis is not None:
+            cached = await self.redis.get(self._state_redis_key(tg_chat_id))
+            if isinstance(cached, dict):
+                created_at = cached.get("created_at")
+                state = model.UserState(**{
+                    **cached,
+                    "created_at": datetime.fromisoformat(created_at) if created_at else None,
+                })
+                self.state_cache.set(tg_chat_id, state)
+                self.state_chat_ids.set(state.id, tg_chat_id)
+
+                self.state_cache_hit_counter.add(1, attributes={common.CACHE_TIER_KEY: "redis"})
+                return replace(state)
+
+        self.state_cache_miss_counter.add(1)
+        return None
+
+    async def _cache_state(self, state: model.UserState) -> None:
+        self.state_cache.set(state.tg_chat_id, replace(state))
+        self.state_chat_ids.set(state.id, state.tg_chat_id)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._state_redis_key(state.tg_chat_id), asdict(state), self.state_cache_ttl)
+            except Exception as err:
+                self.logger.warning(
+                    "Не удалось сохранить состояние в redis",
+                    {common.ERROR_KEY: str(err), common.TELEGRAM_CHAT_ID_KEY: state.tg_chat_id}
+                )
+
+    @contextmanager
+    def update_scope(self) -> Iterator[None]:
+        token = update_states.set({})
+        try:
+            yield
+        finally:
+            update_states.reset(token)
+
+    async def _update_cached_state(self, state_id: int, changes: dict, buffered: bool = False) -> None:
+        self.state_cache_epoch += 1
+
+        tg_chat_id = None
+        scope = update_states.get()
+        if scope:
+            for chat_id, state in scope.items():
+                if state.id == state_id:
+                    tg_chat_id = chat_id
+                    for field, value in changes.items():
+                        setattr(state, field, value)
+
+        if tg_chat_id is None:
+            tg_chat_id = self.state_chat_ids.get(state_id)
+        if tg_chat_id is None:
+            if self.redis is None:
+                # Локально состояние не закешировано, обновлять нечего
+                return
+            if buffered:
+                # Отложенный флаг не идет в Postgres сейчас и не должен ради кеша: чат вернет сброс пачки
+                return
+            rows = await self.db.select(tg_chat_id_by_state_id, {'state_id': state_id})
+            if not rows:
+                return
+            tg_chat_id = rows[0][0]
+
+        self.recent_state_writes.set(tg_chat_id, True)
+        state = self.state_cache.get(tg_chat_id)
+        if state is not None:
+            self.state_cache.set(tg_chat_id, replace(state, **changes))
+
+        await self._delete_redis_state(tg_chat_id)
+
+    def _buffer_flag_writes(self, state_id: int, changes: dict) -> None:
+        self.pending_flag_writes.setdefault(state_id, {}).update(changes)
+
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while self.pending_flag_writes:
+            await asyncio.sleep(self.write_behind_interval)
+            await self.flush_pending_writes()
+
+    def _supersede_flag_writes(self, state_id: int, changes: dict) -> None:
+        # Прямая запись новее буфера: отложенные значения тех же полей больше не нужны
+        pending = self.pending_flag_writes.get(state_id)
+        if pending:
+            for field in changes:
+                pending.pop(field, None)
+            if not pending:
+                del self.pending_flag_writes[state_id]
+
+        # Пачка в полете может закоммититься позже прямой записи — повторим свежие значения следующим сбросом
+        flushing = self.flushing_flag_writes.get(state_id)
+        if flushing:
+            overwritten = {field: value for field, value in changes.items() if field in flushing}
+            if overwritten:
+                self._buffer_flag_writes(state_id, overwritten)
+
+    def _apply_flag_writes(self, state: model.UserState) -> None:
+        for changes in (self.flushing_flag_writes.get(state.id), self.pending_flag_writes.get(state.id)):
+            if changes:
+                for field, value in changes.items():
+                    setattr(state, field, value)
+
+    async def _invalidate_state(self, tg_chat_id: int) -> None:
+        self.state_cache_epoch += 1
+
+        scope = update_states.get()
+        if scope is not None:
+            scope.pop(tg_chat_id, None)
+        self.state_cache.delete(tg_chat_id)
+        self.recent_state_writes.set(tg_chat_id, True)
+        await self._delete_redis_state(tg_chat_id)
+
+    def _known_state(self, state_id: int) -> model.UserState | None:
+        scope = update_states.get()
+        if scope:
+            for state in scope.values():
+                if state.id == state_id:
+                    return state
+
+        tg_chat_id = self.state_chat_ids.get(state_id)
+        if tg_chat_id is None:
+            return None
+        return self.state_cache.get(tg_chat_id)
+
+    async def _get_pending_alerts(self, state_id: int) -> bool | None:
+        # None — неизвестно, нужно спросить Postgres
+        if self.redis is not None:
+            value = await self.redis.get(self._pending_alerts_redis_key(state_id))
+            return value if isinstance(value, bool) else None
+        return self.pending_alerts.get(state_id)
+
+    async def _set_pending_alerts(self, state_id: int, has_pending: bool) -> None:
+        self.pending_alerts.set(state_id, has_pending)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._pending_alerts_redis_key(state_id), has_pending, self.state_cache_ttl)
+            except Exception as err:
+                self.pending_alerts.delete(state_id)
+                self.logger.warning(
+                    "Не удалось сохранить признак алертов в redis",
+                    {common.ERROR_KEY: str(err), "state_id": state_id}
+                )
+
+    async def _delete_redis_state(self, tg_chat_id: int) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(self._state_redis_key(tg_chat_id))
+        except Exception as err:
+            self.logger.warning(
+                "Не удалось удалить состояние из redis",
+                {common.ERROR_KEY: str(err), common.TELEGRAM_CHAT_ID_KEY: tg_chat_id}
+            )
+
+    @staticmethod
+    def _state_redis_key(tg_chat_id: int) -> str:
+        return f"user_state:{tg_chat_id}"
+
+    @staticmethod
+    def _pending_alerts_redis_key(state_id: int) -> str:
+        return f"vizard_alerts_pending:{state_id}"
@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import time
+
+from opentelemetry.trace import StatusCode, SpanKind
+
+from internal import interface, model, common
+from pkg.cache.cache import LRUCache
+
+
+class _OrganizationStats:
+    __slots__ = ("stats", "seeded_at", "dirty")
+
+    def __init__(self, stats: model.ContentStats, seeded_at: float, dirty: bool = False):
+        self.stats = stats
+        self.seeded_at = seeded_at
+        self.dirty = dirty
+
+
+class ContentStatsService(interface.IContentStatsService):
+    """
+    Счетчики публикаций и видео-нарезок по статусам для организации и для каждого автора.
+    Счетчики засеваются один раз полной выгрузкой, дальше их двигают сервисы диалогов после своих мутаций.
+    Нарезки из асинхронной генерации учитывает вебхук vizard, контент из веб-интерфейса подтягивается сверкой.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            loom_content_client: interface.ILoomContentClient,
+            max_organizations: int = 10000,
+            reconcile_interval: float = 600,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+        self.loom_content_client = loom_content_client
+
+        self.reconcile_interval = reconcile_interval
+        self.organizations = LRUCache(max_organizations, None)
+        self._seeding: dict[int, asyncio.Task] = {}
+        self._seed_conflicts: dict[int, int] = {}
+
+        self.seed_counter = self.meter.create_counter(
+            name=common.CONTENT_STATS_SEED_TOTAL_METRIC,
+            description="Total count of content statistics seeds from full content lists",
+            unit="1"
+        )
+        self.drift_counter = self.meter.create_counter(
+            name=common.CONTENT_STATS_DRIFT_TOTAL_METRIC,
+            description="Total count of reconciliations that found counters out of sync",
+            unit="1"
+        )
+
+    async def get_stats(self, organization_id: int) -> model.ContentStats:
+        with self.tracer.start_as_current_span(
+                "ContentStatsService.get_stats",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "organization_id": organization_id
+                }
+        ) as span:
+            try:
+                entry = self.organizations.get(organization_id)
+                if entry is None:
+                    entry = await self._seed(organization_id)
+                elif entry.dirty or time.monotonic() - entry.seeded_at >= self.reconcile_interval:
+                    # Сверка идет в фоне, рендер отдает текущие счетчики без ожидания
+                    self._schedule_reconcile(organization_id)
+
+                span.set_status(StatusCode.OK)
+                return entry.stats
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    def record_created(
+            self,
+            organization_id: int,
+            content_type: str,
+            creator_id: int | None,
+            moderation_status: str,
+            count: int = 1,
+    ) -> None:
+        entry = self._entry_for_update(organization_id, creator_id)
+        if entry is not None:
+            entry.stats.add(content_type, moderation_status, creator_id, count)
+
+    def record_status_changed(
+            self,
+            organization_id: int,
+            content_type: str,
+            creator_id: int | None,
+            old_status: str,
+            new_status: str,
+    ) -> None:
+        if old_status == new_status:
+            return
+
+        entry = self._entry_for_update(organization_id, creator_id)
+        if entry is not None:
+            entry.stats.add(content_type, old_status, creator_id, -1)
+            entry.stats.add(content_type, new_status, creator_id, 1)
+
+    def record_deleted(
+            self,
+            organization_id: int,
+            content_type: str,
+            creator_id: int | None,
+            moderation_status: str,
+    ) -> None:
+        entry = self._entry_for_update(organization_id, creator_id)
+        if entry is not None:
+            entry.stats.add(content_type, moderation_status, creator_id, -1)
+
+    def _entry_for_update(self, organization_id: int, creator_id: int | None) -> _OrganizationStats | None:
+        if organization_id in self._seeding:
+            # Выгрузка уже в пути и могла не увидеть эту мутацию — после нее понадобится еще одна сверка
+            self._seed_conflicts[organization_id] = self._seed_conflicts.get(organization_id, 0) + 1
+
+        entry = self.organizations.get(organization_id)
+        if entry is not None and creator_id is None:
+            # Автор неизвестен — счетчики организации верны, а по авторам поправит сверка
+            entry.dirty = True
+        return entry
+
+    async def _seed(self, organization_id: int) -> _OrganizationStats:
+        task = self._seeding.get(organization_id)
+        if task is None:
+            task = self._start_seed(organization_id)
+        # shield: отмена одного рендера не должна обрывать выгрузку, которую ждут другие
+        return await asyncio.shield(task)
+
+    def _schedule_reconcile(self, organization_id: int) -> None:
+        if organization_id in self._seeding:
+            return
+
+        # Фоновая сверка не наследует дедлайн и трейс апдейта, который ее запустил
+        task = self._start_seed(organization_id, context=contextvars.Context())
+        task.add_done_callback(self._log_reconcile_error)
+
+    def _start_seed(self, organization_id: int, context: contextvars.Context = None) -> asyncio.Task:
+        self._seed_conflicts.pop(organization_id, None)
+        task = asyncio.create_task(self._load(organization_id), context=context)
+        self._seeding[organization_id] = task
+        task.add_done_callback(lambda _: self._seeding.pop(organization_id, None))
+        return task
+
+    async def _load(self, organization_id: int) -> _OrganizationStats:
+        with self.tracer.start_as_current_span(
+                "ContentStatsService._load",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "organization_id": organization_id
+                }
+        ) as span:
+            try:
+                publications = await self.loom_content_client.get_publications_by_organization(organization_id)
+                video_cuts = await self.loom_content_client.get_video_cuts_by_organization(organization_id)
+
+                stats = model.ContentStats()
+                for publication in publications:
+                    stats.add(
+                        model.PUBLICATION_CONTENT_TYPE,
+                        publication.moderation_status,
+                        publication.creator_id,
+                        1,
+                    )
+                for video_cut in video_cuts:
+                    stats.add(
+                        model.VIDEO_CUT_CONTENT_TYPE,
+                        video_cut.moderation_status,
+                        video_cut.creator_id,
+                        1,
+                    )
+
+                previous = self.organizations.get(organization_id)
+                if previous is not None and _non_zero(previous.stats.by_status) != stats.by_status:
+                    self.drift_counter.add(1)
+                    self.logger.info("Счетчики контента разошлись с сервисом и пересчитаны", {
+                        "organization_id": organization_id,
+                    })
+
+                dirty = self._seed_conflicts.pop(organization_id, 0) > 0
+                entry = _OrganizationStats(stats, time.monotonic(), dirty)
+                self.organizations.set(organization_id, entry)
+                self.seed_counter.add(1)
+
+                span.set_attributes({
+                    "publications_count": len(publications),
+                    "video_cuts_count": len(video_cuts),
+                })
+                span.set_status(StatusCode.OK)
+                return entry
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+
+                previous = self.organizations.get(organization_id)
+                if previous is not None:
+                    # Старые счетчики лучше пустого меню — повторим сверку через интервал
+                    previous.seeded_at = time.monotonic()
+                    previous.dirty = False
+                raise
+
+    def _log_reconcile_error(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        self.logger.error("Не удалось сверить счетчики контента", {"error": str(task.exception())})
+
+
+def _non_zero(counters: dict) -> dict:
+    # Обнуленные мутациями счетчики остаются ключами, а в свежей выгрузке их нет
+    return {key: value for key, value in counters.items() if value}
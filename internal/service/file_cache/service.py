@@ -0,0 +1,140 @@
+from opentelemetry.trace import StatusCode, SpanKind
+
+from internal import interface, common
+from pkg.cache.cache import LRUCache
+
+# Отсутствующий в cache_files файл запоминаем ненадолго: контент-сервис скоро его зарегистрирует
+MISSING_FILE_ID = ""
+
+
+class FileCacheService(interface.IFileCacheService):
+    """
+    Кеш соответствия filename -> Telegram file_id поверх таблицы cache_files.
+    file_id стабилен, поэтому записи живут без TTL и вытесняются только по LRU.
+    """
+
+    def __init__(
+            self,
+            tel: interface.ITelemetry,
+            state_repo: interface.IStateRepo,
+            max_size: int = 10000,
+            preload_size: int = 1000,
+            missing_ttl: int = 30,
+    ):
+        self.tracer = tel.tracer()
+        self.meter = tel.meter()
+        self.logger = tel.logger()
+        self.state_repo = state_repo
+
+        self.preload_size = preload_size
+        self.missing_ttl = missing_ttl
+        self.file_ids = LRUCache(max_size, None)
+
+        self.hit_counter = self.meter.create_counter(
+            name=common.FILE_CACHE_HIT_TOTAL_METRIC,
+            description="Total count of telegram file_id cache hits",
+            unit="1"
+        )
+        self.miss_counter = self.meter.create_counter(
+            name=common.FILE_CACHE_MISS_TOTAL_METRIC,
+            description="Total count of telegram file_id cache misses",
+            unit="1"
+        )
+
+    async def preload(self) -> None:
+        with self.tracer.start_as_current_span(
+                "FileCacheService.preload",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "preload_size": self.preload_size
+                }
+        ) as span:
+            try:
+                if self.preload_size <= 0:
+                    span.set_status(StatusCode.OK)
+                    return
+
+                cached_files = await self.state_repo.get_recent_cache_files(self.preload_size)
+                # Идем от старых к новым, чтобы самые свежие оказались в голове LRU
+                for cached_file in reversed(cached_files):
+                    self.file_ids.set(cached_file.filename, cached_file.file_id)
+
+                self.logger.info("Кеш file_id прогрет", {"files_count": len(cached_files)})
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                # Без прогрева бот работает, просто первые превью пойдут в БД
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                self.logger.error("Не удалось прогреть кеш file_id", {"error": str(err)})
+
+    async def get_file_id(self, filename: str) -> str | None:
+        with self.tracer.start_as_current_span(
+                "FileCacheService.get_file_id",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "filename": filename
+                }
+        ) as span:
+            try:
+                file_id = self.file_ids.get(filename)
+                if file_id is not None:
+                    self.hit_counter.add(1)
+                    span.set_status(StatusCode.OK)
+                    return file_id or None
+
+                self.miss_counter.add(1)
+                cached_file = await self.state_repo.get_cache_file(filename)
+                if cached_file:
+                    file_id = cached_file[0].file_id
+                    self.file_ids.set(filename, file_id)
+                else:
+                    file_id = None
+                    self.file_ids.set(filename, MISSING_FILE_ID, self.missing_ttl)
+
+                span.set_status(StatusCode.OK)
+                return file_id
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def set_cache_file(self, filename: str, file_id: str) -> None:
+        with self.tracer.start_as_current_span(
+                "FileCacheService.set_cache_file",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "filename": filename
+                }
+        ) as span:
+            try:
+                await self.state_repo.set_cache_file(filename, file_id)
+                self.file_ids.set(filename, file_id)
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
+    async def set_cache_files(self, files: dict[str, str]) -> None:
+        with self.tracer.start_as_current_span(
+                "FileCacheService.set_cache_files",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "files_count": len(files)
+                }
+        ) as span:
+            try:
+                if not files:
+                    span.set_status(StatusCode.OK)
+                    return
+
+                await self.state_repo.set_cache_files(files)
+                for filename, file_id in files.items():
+                    self.file_ids.set(filename, file_id)
+
+                span.set_status(StatusCode.OK)
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
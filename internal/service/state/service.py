@@ -1,3 +1,5 @@
+from typing import ContextManager
+
 from opentelemetry.trace import StatusCode, SpanKind
 
 from internal import model, interface
@@ -27,6 +29,35 @@ class StateService(interface.IStateService):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
 
+    async def get_or_create_state(
+            self,
+            tg_chat_id: int,
+            tg_username: str,
+            can_show_alerts: bool = None,
+            show_error_recovery: bool = None,
+    ) -> model.UserState:
+        with self.tracer.start_as_current_span(
+                "StateService.get_or_create_state",
+                kind=SpanKind.INTERNAL,
+                attributes={
+                    "tg_chat_id": tg_chat_id
+                }
+        ) as span:
+            try:
+                state = await self.state_repo.get_or_create_state(
+                    tg_chat_id,
+                    tg_username,
+                    can_show_alerts,
+                    show_error_recovery
+                )
+
+                span.set_status(StatusCode.OK)
+                return state
+            except Exception as err:
+                span.record_exception(err)
+                span.set_status(StatusCode.ERROR, str(err))
+                raise
+
     async def state_by_id(self, tg_chat_id: int) -> list[model.UserState]:
         with self.tracer.start_as_current_span(
                 "StateService.state_by_id",
@@ -45,6 +76,12 @@ class StateService(interface.IStateService):
                 span.set_status(StatusCode.ERROR, str(err))
                 raise
 
+    def update_scope(self) -> ContextManager[None]:
+        return self.state_repo.update_scope()
+
+    async def flush_pending_writes(self) -> None:
+        await self.state_repo.flush_pending_writes()
+
     async def state_by_account_id(self, account_id: int) -> list[model.UserState]:
         with self.tracer.start_as_current_span(
                 "StateService.state_by_account_id",
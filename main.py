@@ -6,6 +6,8 @@ from aiogram.fsm.storage.redis import RedisStorage
 from sulguk import AiogramSulgukMiddleware
 
 from infrastructure.pg.pg import PG
+from infrastructure.pg.native_pg import NativePG
+from infrastructure.redis_client.redis_client import RedisClient
 from infrastructure.telemetry.telemetry import Telemetry, AlertManager
 
 from pkg.client.internal.loom_account.client import LoomAccountClient
@@ -37,6 +39,8 @@ from internal.dialog.moderation_video_cut.dialog import VideoCutModerationDialog
 from internal.dialog.publication_draft_content.dialog import PublicationDraftDialog
 
 from internal.service.state.service import StateService
+from internal.service.file_cache.service import FileCacheService
+from internal.service.content_stats.service import ContentStatsService
 from internal.dialog.auth.service import AuthService
 from internal.dialog.main_menu.service import MainMenuService
 from internal.dialog.organization_menu.service import OrganizationMenuService
@@ -66,10 +70,12 @@ from internal.dialog.generate_video_cut.getter import GenerateVideoCutGetter
 from internal.dialog.video_cut_draft_content.getter import VideoCutsDraftGetter
 from internal.dialog.moderation_video_cut.getter import VideoCutModerationGetter
 from internal.dialog.publication_draft_content.getter import PublicationDraftGetter
+from internal.dialog.graph import DialogNodes
 
 from internal.repo.state.repo import StateRepo
+from internal.repo.state.query import queries as state_queries
 
-from internal.app.tg.app import NewTg
+from internal.app.tg.app import NewTg, include_tg_state_middleware
 from internal.app.server.app import NewServer
 
 from internal.config.config import Config
@@ -116,15 +122,92 @@ bot = Bot(token=cfg.tg_bot_token)
 bot.session.middleware(AiogramSulgukMiddleware())
 
 # Инициализация клиентов
-db = PG(tel, cfg.db_user, cfg.db_pass, cfg.db_host, cfg.db_port, cfg.db_name)
-loom_account_client = LoomAccountClient(tel, cfg.loom_account_host, cfg.loom_account_port)
+if cfg.db_driver == "asyncpg":
+    db = NativePG(
+        tel,
+        cfg.db_user,
+        cfg.db_pass,
+        cfg.db_host,
+        cfg.db_port,
+        cfg.db_name,
+        queries=state_queries,
+        db_replica_host=cfg.db_replica_host,
+        statement_cache_size=cfg.db_statement_cache_size,
+        min_pool_size=cfg.db_pool_size,
+        max_pool_size=cfg.db_pool_size + cfg.db_max_overflow,
+        acquire_timeout=cfg.db_pool_timeout,
+    )
+else:
+    db = PG(
+        tel,
+        cfg.db_user,
+        cfg.db_pass,
+        cfg.db_host,
+        cfg.db_port,
+        cfg.db_name,
+        cfg.db_replica_host,
+        cfg.db_pool_size,
+        cfg.db_max_overflow,
+        cfg.db_pool_timeout,
+    )
+
+http_client_kwargs = dict(
+    max_connections=cfg.http_max_connections,
+    max_keepalive_connections=cfg.http_max_keepalive_connections,
+    pool_autotune=cfg.http_pool_autotune,
+    concurrency_limit=cfg.http_concurrency_limit,
+    concurrency_queue_size=cfg.http_concurrency_queue_size,
+    concurrency_queue_timeout=cfg.http_concurrency_queue_timeout,
+    retry_count=cfg.http_retry_count,
+    retry_budget_ratio=cfg.http_retry_budget_ratio,
+)
+loom_account_client = LoomAccountClient(tel, cfg.loom_account_host, cfg.loom_account_port, **http_client_kwargs)
 loom_authorization_client = LoomAuthorizationClient(tel, cfg.loom_authorization_host,
-                                                        cfg.loom_authorization_port)
-loom_employee_client = LoomEmployeeClient(tel, cfg.loom_employee_host, cfg.loom_employee_port)
-loom_organization_client = LoomOrganizationClient(tel, cfg.loom_organization_host, cfg.loom_organization_port)
-loom_content_client = LoomContentClient(tel, cfg.loom_content_host, cfg.loom_content_port)
+                                                        cfg.loom_authorization_port, **http_client_kwargs)
+loom_employee_client = LoomEmployeeClient(tel, cfg.loom_employee_host, cfg.loom_employee_port, **http_client_kwargs,
+                                          response_cache_max_bytes=cfg.http_response_cache_max_bytes,
+                                          entity_cache_max_size=cfg.http_entity_cache_max_size,
+                                          hedge_max_ratio=cfg.http_hedge_max_ratio)
+loom_organization_client = LoomOrganizationClient(tel, cfg.loom_organization_host, cfg.loom_organization_port,
+                                                  **http_client_kwargs,
+                                                  response_cache_max_bytes=cfg.http_response_cache_max_bytes,
+                                                  entity_cache_max_size=cfg.http_entity_cache_max_size)
+loom_content_client = LoomContentClient(tel, cfg.loom_content_host, cfg.loom_content_port, **http_client_kwargs,
+                                        response_cache_max_bytes=cfg.http_response_cache_max_bytes,
+                                        entity_cache_max_size=cfg.http_entity_cache_max_size,
+                                        hedge_max_ratio=cfg.http_hedge_max_ratio)
+
+state_cache_redis = None
+if cfg.state_cache_redis_enabled:
+    state_cache_redis = RedisClient(
+        cfg.monitoring_redis_host,
+        cfg.monitoring_redis_port,
+        cfg.state_cache_redis_db,
+        cfg.monitoring_redis_password
+    )
 
-state_repo = StateRepo(tel, db)
+state_repo = StateRepo(
+    tel,
+    db,
+    state_cache_redis,
+    cfg.state_cache_max_size,
+    cfg.state_cache_ttl,
+    write_behind_interval=cfg.state_write_behind_interval,
+)
+
+file_cache_service = FileCacheService(
+    tel,
+    state_repo,
+    cfg.file_cache_max_size,
+    cfg.file_cache_preload_size,
+)
+
+content_stats_service = ContentStatsService(
+    tel,
+    loom_content_client,
+    cfg.content_stats_max_organizations,
+    cfg.content_stats_reconcile_interval,
+)
 
 # Инициализация геттеров
 auth_getter = AuthGetter(
@@ -146,11 +229,19 @@ organization_menu_getter = OrganizationMenuGetter(
     loom_content_client,
 )
 
+# Общие узлы графа геттеров: состояние, сотрудник, организация и соцсети запрашиваются один раз на апдейт
+dialog_nodes = DialogNodes(
+    state_repo,
+    loom_employee_client,
+    loom_organization_client,
+    loom_content_client,
+)
+
 content_menu_getter = ContentMenuGetter(
     tel,
     state_repo,
     loom_employee_client,
-    loom_content_client,
+    content_stats_service,
 )
 generate_publication_getter = GeneratePublicationDataGetter(
     tel,
@@ -164,14 +255,17 @@ moderation_publication_getter = ModerationPublicationGetter(
     state_repo,
     loom_employee_client,
     loom_content_client,
+    dialog_nodes,
     cfg.domain,
 )
 
 video_cut_moderation_getter = VideoCutModerationGetter(
     tel,
     state_repo,
+    file_cache_service,
     loom_employee_client,
     loom_content_client,
+    dialog_nodes,
 )
 
 generate_video_cut_getter = GenerateVideoCutGetter(
@@ -184,7 +278,8 @@ change_employee_getter = ChangeEmployeeGetter(
     state_repo,
     loom_employee_client,
     loom_organization_client,
-    loom_content_client
+    loom_content_client,
+    dialog_nodes,
 )
 
 personal_profile_getter = PersonalProfileGetter(
@@ -192,15 +287,18 @@ personal_profile_getter = PersonalProfileGetter(
     state_repo,
     loom_employee_client,
     loom_organization_client,
-    loom_content_client
+    loom_content_client,
+    dialog_nodes,
 )
 
 video_cuts_draft_getter = VideoCutsDraftGetter(
     tel,
     state_repo,
+    file_cache_service,
     loom_employee_client,
     loom_organization_client,
     loom_content_client,
+    dialog_nodes,
 )
 
 publication_draft_getter = PublicationDraftGetter(
@@ -208,6 +306,7 @@ publication_draft_getter = PublicationDraftGetter(
     state_repo,
     loom_employee_client,
     loom_content_client,
+    dialog_nodes,
     cfg.domain,
 )
 
@@ -269,6 +368,7 @@ generate_publication_service = GeneratePublicationService(
     bot,
     state_repo,
     loom_content_client,
+    content_stats_service,
 )
 
 generate_video_cut_service = GenerateVideoCutService(
@@ -282,12 +382,14 @@ moderation_publication_service = ModerationPublicationService(
     bot,
     state_repo,
     loom_content_client,
+    content_stats_service,
 )
 
 video_cuts_draft_service = VideoCutsDraftService(
     tel,
     state_repo,
     loom_content_client,
+    content_stats_service,
 )
 
 publication_draft_service = PublicationDraftService(
@@ -295,6 +397,7 @@ publication_draft_service = PublicationDraftService(
     bot,
     state_repo,
     loom_content_client,
+    content_stats_service,
 )
 
 video_cut_moderation_service = VideoCutModerationService(
@@ -302,6 +405,7 @@ video_cut_moderation_service = VideoCutModerationService(
     bot,
     state_repo,
     loom_content_client,
+    content_stats_service,
 )
 
 add_social_network_service = AddSocialNetworkService(
@@ -417,8 +521,12 @@ tg_middleware = TgMiddleware(
     tel,
     state_service,
     bot,
-    dialog_bg_factory
+    dialog_bg_factory,
+    cfg.update_deadline,
+    cfg.generation_deadline,
 )
+include_tg_state_middleware(dp, tg_middleware)
+
 http_middleware = HttpMiddleware(
     tel,
     cfg.prefix,
@@ -428,6 +536,8 @@ tg_webhook_controller = TelegramWebhookController(
     dp,
     bot,
     state_service,
+    file_cache_service,
+    content_stats_service,
     dialog_bg_factory,
     cfg.domain,
     cfg.prefix,
@@ -439,6 +549,8 @@ if __name__ == "__main__":
         db,
         http_middleware,
         tg_webhook_controller,
+        file_cache_service,
+        state_service,
         cfg.prefix,
     )
     uvicorn.run(app, host="0.0.0.0", port=int(cfg.http_port), access_log=False)
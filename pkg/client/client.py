@@ -1,121 +1,208 @@
+import math
+import time
 import httpx
 import asyncio
 import random
 import weakref
+import tempfile
 from pathlib import Path
 from collections import deque
-from datetime import datetime, timedelta
-from typing import Optional, Any, AsyncIterator, Callable
-from tenacity import stop_after_attempt, AsyncRetrying, RetryCallState
+from contextlib import aclosing, asynccontextmanager
+from typing import Optional, Any, AsyncIterator, Callable, Iterable, IO
 
 from opentelemetry import propagate
+from opentelemetry.metrics import Meter, CallbackOptions, Observation
 
-from internal import interface
+from internal import interface, common
+from pkg.client.response_cache import ResponseCache, ResponseCacheRule
+from pkg.client.route import route_template
+from pkg.client.singleflight import SingleFlight, share_decoded_json
+from pkg.client.hedging import RouteLatency, HedgeBudget
+from pkg.client.limiter import AIMDLimiter, ConcurrencyLimitExceededError
+from pkg.client.retry_budget import RetryBudget
+from pkg.client.deadline import Deadline, DeadlineExceededError, current_deadline
+from pkg.client.multipart import StreamingMultipart
+from pkg.client.codec import install_json_decoder
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+
+class CircuitBreakerOpenError(Exception):
+    pass
+
+
+class RollingWindow:
+    """Счетчики вызовов за последние window секунд, разбитые на bucket_count корзин по монотонному времени."""
+
+    def __init__(self, window: float, bucket_count: int = 10):
+        self.bucket_count = bucket_count
+        self.bucket_width = window / bucket_count
+        # (номер корзины, [вызовы, ошибки, медленные вызовы])
+        self._buckets: deque[tuple[int, list[int]]] = deque()
+
+    def record(self, failed: bool, slow: bool, now: float) -> None:
+        index = int(now // self.bucket_width)
+        if not self._buckets or self._buckets[-1][0] != index:
+            self._buckets.append((index, [0, 0, 0]))
+        self._expire(index)
+
+        counters = self._buckets[-1][1]
+        counters[0] += 1
+        counters[1] += failed
+        counters[2] += slow
+
+    def totals(self, now: float) -> tuple[int, int, int]:
+        self._expire(int(now // self.bucket_width))
+        calls = failures = slow_calls = 0
+        for _, counters in self._buckets:
+            calls += counters[0]
+            failures += counters[1]
+            slow_calls += counters[2]
+        return calls, failures, slow_calls
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def _expire(self, index: int) -> None:
+        while self._buckets and self._buckets[0][0] <= index - self.bucket_count:
+            self._buckets.popleft()
 
 
 class CircuitBreaker:
+    """
+    closed -> open, когда в скользящем окне набралось minimum_calls вызовов
+    и доля ошибок или медленных вызовов достигла порога. Через recovery_timeout — half-open:
+    пропускается half_open_max_calls пробных вызовов, успех закрывает breaker, ошибка снова открывает.
+    Блокировок нет: переходы не содержат await, а event loop однопоточный.
+    """
+
     def __init__(
             self,
-            failure_threshold: int = 5,
-            recovery_timeout: int = 60,
+            failure_rate_threshold: float = 0.5,
+            slow_call_rate_threshold: float = 0.8,
+            slow_call_duration: Optional[float] = 10,
+            minimum_calls: int = 10,
+            window: float = 30,
+            recovery_timeout: float = 60,
+            half_open_max_calls: int = 1,
             expected_exceptions: tuple[type[Exception], ...] = (httpx.HTTPError,),
-            logger: interface.IOtelLogger = None
+            logger: interface.IOtelLogger = None,
+            name: str = "",
     ):
-        self.failure_threshold = failure_threshold
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.minimum_calls = minimum_calls
         self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
         self.expected_exceptions = expected_exceptions
-        self._failures: deque[datetime] = deque(maxlen=failure_threshold)
-        self._last_failure_time: Optional[datetime] = None
-        self._state = "closed"  # closed, open, half-open
-        self._lock = asyncio.Lock()
         self.logger = logger
+        self.name = name
+
+        self._window = RollingWindow(window)
+        self._state = "closed"  # closed, open, half-open
+        self._opened_at = 0.0
+        self._half_open_calls = 0
 
     @property
     def state(self) -> str:
         return self._state
 
-    def _log_state_change(self, old_state: str, new_state: str, context: str = ""):
-        self.logger.warning(
-            f"Circuit Breaker изменил состояние: {old_state} -> {new_state}. "
-            f"количество ошибок: {len(self._failures)}/{self.failure_threshold}. "
-            f"Подробности: {context}"
-        )
+    def before_call(self) -> None:
+        if self._state == "closed":
+            return
+
+        if self._state == "open":
+            time_since_open = time.monotonic() - self._opened_at
+            if time_since_open < self.recovery_timeout:
+                raise CircuitBreakerOpenError(
+                    f"Circuit breaker {self.name} is OPEN, "
+                    f"recovery in {self.recovery_timeout - time_since_open:.1f}s"
+                )
+            self._half_open_calls = 0
+            self._transition("half-open", f"Восстановление после {time_since_open:.1f} секунд")
+
+        if self._half_open_calls >= self.half_open_max_calls:
+            raise CircuitBreakerOpenError(f"Circuit breaker {self.name} is HALF-OPEN, probe in progress")
+        self._half_open_calls += 1
+
+    def record(self, failed: bool, duration: float) -> None:
+        slow = self.slow_call_duration is not None and duration >= self.slow_call_duration
+
+        if self._state == "half-open":
+            self._half_open_calls = max(self._half_open_calls - 1, 0)
+            if failed or slow:
+                self._open("Пробный вызов неуспешен")
+            else:
+                self._window.clear()
+                self._transition("closed", "Восстановились. Circuit breaker выключен")
+            return
+
+        if self._state == "open":
+            # Вызов начался до открытия, его результат уже ничего не меняет
+            return
+
+        now = time.monotonic()
+        self._window.record(failed, slow, now)
+        if not failed and not slow:
+            return
+
+        calls, failures, slow_calls = self._window.totals(now)
+        if calls < self.minimum_calls:
+            return
+
+        if failures / calls >= self.failure_rate_threshold:
+            self._open(f"Доля ошибок {failures}/{calls}")
+        elif slow_calls / calls >= self.slow_call_rate_threshold:
+            self._open(f"Доля медленных вызовов {slow_calls}/{calls}")
+
+    def release(self) -> None:
+        # Вызов прерван не по вине upstream (например, отменен): освобождаем пробный слот без оценки
+        if self._state == "half-open":
+            self._half_open_calls = max(self._half_open_calls - 1, 0)
 
     async def call(self, func: Callable, *args, **kwargs) -> Any:
-        async with self._lock:
-            current_state = self._state
-
-            if self._state == "open":
-                time_since_failure = (datetime.now() - self._last_failure_time
-                                      if self._last_failure_time else timedelta(0))
-
-                if (self._last_failure_time and
-                        time_since_failure > timedelta(seconds=self.recovery_timeout)):
-                    old_state = self._state
-                    self._state = "half-open"
-                    if self.logger is not None:
-                        self._log_state_change(
-                            old_state,
-                            self._state,
-                            f"Восстановление после {time_since_failure.total_seconds()} секунд"
-                        )
-                else:
-                    remaining_time = self.recovery_timeout - time_since_failure.total_seconds()
-                    if self.logger is not None:
-                        self.logger.warning(
-                            f"Circuit breaker включен. Ошибок: {len(self._failures)}/{self.failure_threshold}. "
-                            f"Восстановление через {remaining_time:.1f} секунд"
-                        )
-                    raise Exception(f"Circuit breaker is OPEN (failures: {len(self._failures)})")
+        self.before_call()
 
+        start_time = time.monotonic()
         try:
-            if current_state == "half-open":
-                if self.logger is not None:
-                    self.logger.debug("Circuit breaker в HALF-OPEN состоянии. Проверка состояния")
-
             result = await func(*args, **kwargs)
-
-            async with self._lock:
-                if self._state == "half-open":
-                    old_state = self._state
-                    self._state = "closed"
-                    self._failures.clear()
-                    if self.logger is not None:
-                        self._log_state_change(
-                            old_state, self._state,
-                            "Восстановились. Circuit breaker выключен"
-                        )
-
-            return result
-
-        except self.expected_exceptions as err:
-            await self._record_failure()
+        except self.expected_exceptions:
+            self.record(True, time.monotonic() - start_time)
+            raise
+        except BaseException:
+            self.release()
             raise
 
-    async def _record_failure(self):
-        async with self._lock:
-            self._failures.append(datetime.now())
-            self._last_failure_time = datetime.now()
-            old_state = self._state
-            if self.logger is not None:
-                self.logger.warning(
-                    f"Circuit breaker обнаружил проблему. Количество ошибок: {len(self._failures)}/{self.failure_threshold}"
-                )
-
-            if len(self._failures) >= self.failure_threshold:
-                self._state = "open"
-                if self.logger is not None:
-                    self._log_state_change(old_state, self._state)
+        self.record(False, time.monotonic() - start_time)
+        return result
 
     def reset(self):
         old_state = self._state
-        self._failures.clear()
-        self._last_failure_time = None
+        self._window.clear()
+        self._half_open_calls = 0
         self._state = "closed"
 
         if old_state != "closed":
-            if self.logger is not None:
-                self._log_state_change(old_state, self._state, "Ручное выключение")
+            self._log_state_change(old_state, self._state, "Ручное выключение")
+
+    def _open(self, context: str) -> None:
+        self._opened_at = time.monotonic()
+        self._transition("open", context)
+
+    def _transition(self, new_state: str, context: str) -> None:
+        old_state = self._state
+        self._state = new_state
+        self._log_state_change(old_state, new_state, context)
+
+    def _log_state_change(self, old_state: str, new_state: str, context: str = ""):
+        if self.logger is None:
+            return
+        self.logger.warning(
+            f"Circuit Breaker {self.name} изменил состояние: {old_state} -> {new_state}. "
+            f"Подробности: {context}"
+        )
 
 
 class ExponentialBackoffWithJitter:
@@ -124,9 +211,9 @@ class ExponentialBackoffWithJitter:
         self.max_delay = max_delay
         self.jitter = jitter
 
-    def __call__(self, retry_state) -> float:
+    def __call__(self, attempt_number: int) -> float:
         delay = min(
-            self.base_delay * (2 ** (retry_state.attempt_number - 1)),
+            self.base_delay * (2 ** (attempt_number - 1)),
             self.max_delay
         )
 
@@ -134,12 +221,7 @@ class ExponentialBackoffWithJitter:
         return delay + jitter_value
 
 
-def should_retry_exception(retry_state: RetryCallState) -> bool:
-    if not retry_state.outcome.failed:
-        return False
-
-    exception = retry_state.outcome.exception()
-
+def should_retry_exception(exception: BaseException) -> bool:
     retryable_exceptions = (
         httpx.TimeoutException,
         httpx.ConnectTimeout,
@@ -161,9 +243,222 @@ def should_retry_exception(retry_state: RetryCallState) -> bool:
 
     return False
 
+class KeepaliveAutotuner:
+    """
+    Подбирает max_keepalive_connections по наблюдаемой конкурентности.
+    За каждое окно берется пик одновременных запросов с запасом headroom.
+    Рост применяется сразу, уменьшение — наполовину за окно, чтобы не рвать соединения на провалах нагрузки.
+    """
+
+    def __init__(
+            self,
+            min_keepalive: int,
+            max_keepalive: int,
+            window: float = 60,
+            headroom: float = 1.25,
+    ):
+        self.min_keepalive = min_keepalive
+        self.max_keepalive = max_keepalive
+        self.window = window
+        self.headroom = headroom
+
+        self.in_flight = 0
+        self.peak = 0
+        self.window_started_at = time.monotonic()
+
+    def acquire(self) -> None:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+
+    def release(self, current_limit: int) -> Optional[int]:
+        self.in_flight -= 1
+
+        now = time.monotonic()
+        if now - self.window_started_at < self.window:
+            return None
+
+        target = math.ceil(self.peak * self.headroom)
+        target = min(max(target, self.min_keepalive), self.max_keepalive)
+        if target < current_limit:
+            target = max(target, (current_limit + target) // 2)
+
+        self.peak = self.in_flight
+        self.window_started_at = now
+        return target if target != current_limit else None
+
+
+MAX_CIRCUIT_BREAKER_ROUTES = 256
+
+CIRCUIT_BREAKER_STATE_VALUES = {"closed": 0, "half-open": 1, "open": 2}
+
+
+class HTTPClientMetrics:
+    """Инструменты создаются один раз на процесс и описывают все AsyncHTTPClient с разбивкой по upstream."""
+
+    def __init__(self, meter: Meter):
+        self.active_requests = meter.create_up_down_counter(
+            name=common.HTTP_CLIENT_ACTIVE_REQUESTS_METRIC,
+            description="Number of in-flight outgoing HTTP requests",
+            unit="1"
+        )
+        self.pool_timeout_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_POOL_TIMEOUT_TOTAL_METRIC,
+            description="Total count of outgoing HTTP requests that timed out waiting for a pooled connection",
+            unit="1"
+        )
+        meter.create_observable_gauge(
+            name=common.HTTP_CLIENT_POOL_CONNECTIONS_METRIC,
+            callbacks=[self._observe_connections],
+            description="Number of open pooled connections by state",
+            unit="1"
+        )
+        meter.create_observable_gauge(
+            name=common.HTTP_CLIENT_POOL_KEEPALIVE_LIMIT_METRIC,
+            callbacks=[self._observe_keepalive_limit],
+            description="Current max_keepalive_connections of the pool",
+            unit="1"
+        )
+        self.cache_request_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_CACHE_REQUEST_TOTAL_METRIC,
+            description="Total count of cacheable GET requests by result: hit, miss, revalidated",
+            unit="1"
+        )
+        self.singleflight_request_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_SINGLEFLIGHT_REQUEST_TOTAL_METRIC,
+            description="Total count of coalescable GET requests, shared=true ones were served by another in-flight call",
+            unit="1"
+        )
+        self.hedge_request_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_HEDGE_REQUEST_TOTAL_METRIC,
+            description="Total count of hedged GET requests by the attempt that answered first",
+            unit="1"
+        )
+        self.hedge_latency_saved = meter.create_histogram(
+            name=common.HTTP_CLIENT_HEDGE_LATENCY_SAVED_METRIC,
+            description="How much earlier the hedge answered than the primary request",
+            unit="s"
+        )
+        self.retry_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_RETRY_TOTAL_METRIC,
+            description="Total count of retried outgoing HTTP requests",
+            unit="1"
+        )
+        self.retry_budget_exhausted_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_RETRY_BUDGET_EXHAUSTED_TOTAL_METRIC,
+            description="Total count of retries skipped because the upstream or global retry budget was exhausted",
+            unit="1"
+        )
+        self.deadline_exceeded_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL_METRIC,
+            description="Total count of outgoing HTTP requests failed because the update deadline expired",
+            unit="1"
+        )
+        self.concurrency_rejected_counter = meter.create_counter(
+            name=common.HTTP_CLIENT_CONCURRENCY_REJECTED_TOTAL_METRIC,
+            description="Total count of outgoing HTTP requests rejected by the concurrency limiter",
+            unit="1"
+        )
+        meter.create_observable_gauge(
+            name=common.HTTP_CLIENT_CONCURRENCY_LIMIT_METRIC,
+            callbacks=[self._observe_concurrency_limit],
+            description="Current adaptive limit of in-flight requests per upstream",
+            unit="1"
+        )
+        meter.create_observable_gauge(
+            name=common.HTTP_CLIENT_CONCURRENCY_QUEUE_DEPTH_METRIC,
+            callbacks=[self._observe_concurrency_queue_depth],
+            description="Number of outgoing HTTP requests waiting for a concurrency slot",
+            unit="1"
+        )
+        meter.create_observable_gauge(
+            name=common.HTTP_CLIENT_CIRCUIT_BREAKER_STATE_METRIC,
+            callbacks=[self._observe_circuit_breakers],
+            description="Circuit breaker state per route: 0 closed, 1 half-open, 2 open",
+            unit="1"
+        )
+        meter.create_observable_gauge(
+            name=common.HTTP_CLIENT_CACHE_SIZE_METRIC,
+            callbacks=[self._observe_cache_size],
+            description="Size of cached GET responses",
+            unit="By"
+        )
+
+    @staticmethod
+    def _observe_connections(options: CallbackOptions) -> Iterable[Observation]:
+        for client in list(AsyncHTTPClient._instances.values()):
+            connections = client.pool_connections()
+            idle = sum(1 for connection in connections if connection.is_idle())
+            yield Observation(idle, {
+                common.HTTP_CLIENT_UPSTREAM_KEY: client.base_url,
+                common.HTTP_CLIENT_CONNECTION_STATE_KEY: "idle",
+            })
+            yield Observation(len(connections) - idle, {
+                common.HTTP_CLIENT_UPSTREAM_KEY: client.base_url,
+                common.HTTP_CLIENT_CONNECTION_STATE_KEY: "active",
+            })
+
+    @staticmethod
+    def _observe_keepalive_limit(options: CallbackOptions) -> Iterable[Observation]:
+        for client in list(AsyncHTTPClient._instances.values()):
+            yield Observation(client.max_keepalive_connections, {common.HTTP_CLIENT_UPSTREAM_KEY: client.base_url})
+
+    @staticmethod
+    def _observe_concurrency_limit(options: CallbackOptions) -> Iterable[Observation]:
+        for client in list(AsyncHTTPClient._instances.values()):
+            if client.limiter is not None:
+                yield Observation(int(client.limiter.limit), {common.HTTP_CLIENT_UPSTREAM_KEY: client.base_url})
+
+    @staticmethod
+    def _observe_concurrency_queue_depth(options: CallbackOptions) -> Iterable[Observation]:
+        for client in list(AsyncHTTPClient._instances.values()):
+            if client.limiter is not None:
+                yield Observation(client.limiter.queue_depth, {common.HTTP_CLIENT_UPSTREAM_KEY: client.base_url})
+
+    @staticmethod
+    def _observe_circuit_breakers(options: CallbackOptions) -> Iterable[Observation]:
+        for client in list(AsyncHTTPClient._instances.values()):
+            for route, circuit_breaker in list(client.circuit_breakers.items()):
+                yield Observation(CIRCUIT_BREAKER_STATE_VALUES[circuit_breaker.state], {
+                    common.HTTP_CLIENT_UPSTREAM_KEY: client.base_url,
+                    common.HTTP_CLIENT_ROUTE_KEY: route,
+                })
+
+    @staticmethod
+    def _observe_cache_size(options: CallbackOptions) -> Iterable[Observation]:
+        for client in list(AsyncHTTPClient._instances.values()):
+            if client.response_cache is not None:
+                yield Observation(client.response_cache.size, {common.HTTP_CLIENT_UPSTREAM_KEY: client.base_url})
+
+
+class UpstreamCall:
+    """Замер одного вызова upstream для breaker и лимитера: время до заголовков ответа, а не передачи тела."""
+    __slots__ = ("deadline", "long_running", "started_at", "responded_at", "failed")
+
+    def __init__(self, deadline: Optional[Deadline], long_running: bool):
+        self.deadline = deadline
+        self.long_running = long_running
+        self.started_at = time.monotonic()
+        self.responded_at: Optional[float] = None
+        self.failed = False
+
+    def responded(self, response: httpx.Response) -> None:
+        self.responded_at = time.monotonic()
+        self.failed = response.status_code >= 500
+
+    def duration(self) -> float:
+        return (self.responded_at or time.monotonic()) - self.started_at
+
+    def check_deadline(self, what: str) -> None:
+        # Таймаут httpx ограничивает одно чтение, а не все тело — между чтениями сверяемся с дедлайном сами
+        if self.deadline is not None and self.deadline.remaining(self.long_running) <= 0:
+            raise DeadlineExceededError(f"Дедлайн апдейта истек во время скачивания {what}")
+
+
 class AsyncHTTPClient:
     _instances: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
     _lock = asyncio.Lock()
+    _metrics: Optional[HTTPClientMetrics] = None
+    _global_retry_budget: Optional[RetryBudget] = None
 
     def __new__(
             cls,
@@ -178,14 +473,33 @@ class AsyncHTTPClient:
             timeout: float = 300,
             max_connections: int = 100,
             max_keepalive_connections: int = 20,
+            pool_timeout: float = None,
+            pool_autotune: bool = False,
+            pool_autotune_window: float = 60,
+            response_cache_rules: list[ResponseCacheRule] = None,
+            response_cache_max_bytes: int = 0,
+            singleflight_enabled: bool = True,
+            hedged_routes: list[str] = None,
+            hedge_max_ratio: float = 0,
+            concurrency_limit: int = 0,
+            concurrency_queue_size: int = 100,
+            concurrency_queue_timeout: float = 1.0,
+            long_running_routes: Iterable[str] = None,
             retry_count: int = 0,
             retry_wait_multiplier: float = 0.3,
             retry_wait_min: float = 0.1,
             retry_wait_max: float = 10,
+            retry_budget_ratio: float = 0.1,
             circuit_breaker_enabled: bool = True,
-            circuit_breaker_failure_threshold: int = 5,
+            circuit_breaker_failure_rate: float = 0.5,
+            circuit_breaker_slow_call_rate: float = 0.8,
+            circuit_breaker_slow_call_duration: float = 10,
+            circuit_breaker_slow_call_durations: dict[str, float] = None,
+            circuit_breaker_minimum_calls: int = 10,
+            circuit_breaker_window: float = 30,
             circuit_breaker_recovery_timeout: int = 60,
             logger: interface.IOtelLogger = None,
+            meter: Meter = None,
     ):
         protocol = "https" if use_https else "http"
         base_url = f"{protocol}://{host}:{port}{prefix}"
@@ -210,14 +524,33 @@ class AsyncHTTPClient:
             timeout: float = 300,
             max_connections: int = 100,
             max_keepalive_connections: int = 20,
+            pool_timeout: float = None,
+            pool_autotune: bool = False,
+            pool_autotune_window: float = 60,
+            response_cache_rules: list[ResponseCacheRule] = None,
+            response_cache_max_bytes: int = 0,
+            singleflight_enabled: bool = True,
+            hedged_routes: list[str] = None,
+            hedge_max_ratio: float = 0,
+            concurrency_limit: int = 0,
+            concurrency_queue_size: int = 100,
+            concurrency_queue_timeout: float = 1.0,
+            long_running_routes: Iterable[str] = None,
             retry_count: int = 0,
             retry_wait_multiplier: float = 0.3,
             retry_wait_min: float = 0.1,
             retry_wait_max: float = 10,
+            retry_budget_ratio: float = 0.1,
             circuit_breaker_enabled: bool = True,
-            circuit_breaker_failure_threshold: int = 5,
+            circuit_breaker_failure_rate: float = 0.5,
+            circuit_breaker_slow_call_rate: float = 0.8,
+            circuit_breaker_slow_call_duration: float = 10,
+            circuit_breaker_slow_call_durations: dict[str, float] = None,
+            circuit_breaker_minimum_calls: int = 10,
+            circuit_breaker_window: float = 30,
             circuit_breaker_recovery_timeout: int = 60,
             logger: interface.IOtelLogger = None,
+            meter: Meter = None,
     ):
         if hasattr(self, "_initialized"):
             return
@@ -236,16 +569,23 @@ class AsyncHTTPClient:
         self.session: Optional[httpx.AsyncClient] = None
         self.session_lock = asyncio.Lock()
 
-        self.circuit_breaker: Optional[CircuitBreaker] = None
-        if circuit_breaker_enabled:
-            self._circuit_breaker = CircuitBreaker(
-                failure_threshold=circuit_breaker_failure_threshold,
-                recovery_timeout=circuit_breaker_recovery_timeout
-            )
+        # Отдельный breaker на каждый шаблон маршрута: медленная генерация не закрывает дешевые справочники
+        self.circuit_breaker_enabled = circuit_breaker_enabled
+        self.circuit_breakers: dict[str, CircuitBreaker] = {}
+        self.circuit_breaker_failure_rate = circuit_breaker_failure_rate
+        self.circuit_breaker_slow_call_rate = circuit_breaker_slow_call_rate
+        self.circuit_breaker_slow_call_duration = circuit_breaker_slow_call_duration
+        self.circuit_breaker_slow_call_durations = circuit_breaker_slow_call_durations or {}
+        self.circuit_breaker_minimum_calls = circuit_breaker_minimum_calls
+        self.circuit_breaker_window = circuit_breaker_window
+        self.circuit_breaker_recovery_timeout = circuit_breaker_recovery_timeout
 
         self.timeout = timeout
+        # Маршруты, вызовы которых ограничены увеличенным бюджетом дедлайна апдейта
+        self.long_running_routes = set(long_running_routes or ())
         self.max_connections = max_connections
         self.max_keepalive_connections = max_keepalive_connections
+        self.pool_timeout = pool_timeout if pool_timeout is not None else timeout
         self.retry_count = retry_count
         self.retry_wait_multiplier = retry_wait_multiplier
         self.retry_wait_min = retry_wait_min
@@ -256,6 +596,51 @@ class AsyncHTTPClient:
             max_delay=self.retry_wait_max
         )
 
+        # Ретраи ограничены долей успешного трафика: своей на upstream и общей на процесс,
+        # чтобы лежащий сервис не получал кратно больше запросов, чем обычно
+        self.retry_budget: Optional[RetryBudget] = None
+        if retry_count > 1 and retry_budget_ratio > 0:
+            self.retry_budget = RetryBudget(retry_budget_ratio)
+            if AsyncHTTPClient._global_retry_budget is None:
+                AsyncHTTPClient._global_retry_budget = RetryBudget(retry_budget_ratio, max_tokens=500, min_tokens=50)
+
+        self.autotuner: Optional[KeepaliveAutotuner] = None
+        if pool_autotune:
+            self.autotuner = KeepaliveAutotuner(
+                min_keepalive=min(max_keepalive_connections, max_connections),
+                max_keepalive=max_connections,
+                window=pool_autotune_window,
+            )
+
+        if meter is not None and AsyncHTTPClient._metrics is None:
+            AsyncHTTPClient._metrics = HTTPClientMetrics(meter)
+        self.metrics = AsyncHTTPClient._metrics
+        self.metric_attributes = {common.HTTP_CLIENT_UPSTREAM_KEY: self.base_url}
+
+        self.response_cache: Optional[ResponseCache] = None
+        if response_cache_rules and response_cache_max_bytes > 0:
+            self.response_cache = ResponseCache(response_cache_rules, response_cache_max_bytes)
+
+        self.singleflight: Optional[SingleFlight] = SingleFlight() if singleflight_enabled else None
+
+        # Хеджирование только для явно перечисленных безопасных GET-маршрутов
+        self.hedged_routes = set(hedged_routes or ())
+        self.hedge_budget: Optional[HedgeBudget] = None
+        if self.hedged_routes and hedge_max_ratio > 0:
+            self.hedge_budget = HedgeBudget(hedge_max_ratio)
+        self.route_latencies: dict[str, RouteLatency] = {}
+        self.background_tasks: set[asyncio.Task] = set()
+
+        # Адаптивный лимит одновременных запросов к upstream, 0 — без лимита (только пул соединений)
+        self.limiter: Optional[AIMDLimiter] = None
+        if concurrency_limit > 0:
+            self.limiter = AIMDLimiter(
+                initial_limit=concurrency_limit,
+                max_limit=max_connections,
+                max_queue_size=concurrency_queue_size,
+                queue_timeout=concurrency_queue_timeout,
+            )
+
     async def _get_session(self) -> httpx.AsyncClient:
         if self.session is None or self.session.is_closed:
             async with self.session_lock:
@@ -268,7 +653,7 @@ class AsyncHTTPClient:
             base_url=self.base_url,
             headers=self.default_headers,
             cookies=self.default_cookies,
-            timeout=self.timeout,
+            timeout=httpx.Timeout(self.timeout, pool=self.pool_timeout),
             http2=self.use_http2,
             limits=httpx.Limits(
                 max_connections=self.max_connections,
@@ -277,6 +662,41 @@ class AsyncHTTPClient:
             follow_redirects=True
         )
 
+    def pool_connections(self) -> list:
+        # httpx не отдает состояние пула публично, поэтому смотрим в транспорт httpcore
+        transport = getattr(self.session, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+    def _set_keepalive_limit(self, limit: int) -> None:
+        old_limit = self.max_keepalive_connections
+        self.max_keepalive_connections = limit
+
+        # Лимиты httpx фиксируются при создании клиента, для живого пула меняем его напрямую
+        transport = getattr(self.session, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        if pool is not None and hasattr(pool, "_max_keepalive_connections"):
+            pool._max_keepalive_connections = limit
+
+        if self.logger is not None:
+            self.logger.info(
+                f"Лимит keepalive-соединений {self.base_url} изменен: {old_limit} -> {limit}"
+            )
+
+    def _track_request_start(self) -> None:
+        if self.metrics is not None:
+            self.metrics.active_requests.add(1, attributes=self.metric_attributes)
+        if self.autotuner is not None:
+            self.autotuner.acquire()
+
+    def _track_request_end(self) -> None:
+        if self.metrics is not None:
+            self.metrics.active_requests.add(-1, attributes=self.metric_attributes)
+        if self.autotuner is not None:
+            limit = self.autotuner.release(self.max_keepalive_connections)
+            if limit is not None:
+                self._set_keepalive_limit(limit)
+
     async def close(self):
         if self.session and not self.session.is_closed:
             await self.session.aclose()
@@ -295,142 +715,494 @@ class AsyncHTTPClient:
         for instance in list(cls._instances.values()):
             await instance.close()
 
-    def _create_retry_strategy(self) -> AsyncRetrying:
-        return AsyncRetrying(
-            stop=stop_after_attempt(self.retry_count),
-            wait=self.backoff,
-            retry=should_retry_exception,
-            reraise=True
-        )
-
     async def _execute_request(
             self,
             method: str,
             url: str,
             **kwargs
     ) -> httpx.Response:
+        session = await self._get_session()
+
+        headers = {**self.default_headers, **kwargs.pop('headers', {})}
+        cookies = {**self.default_cookies, **kwargs.pop('cookies', {})}
+
+        if self.use_tracing:
+            propagate.inject(headers)
+
+        async with self._upstream_call(method, url, kwargs) as call:
+            response = await session.request(
+                method,
+                url,
+                headers=headers,
+                cookies=cookies,
+                **kwargs
+            )
+            call.responded(response)
+
+        if response.status_code == 304 and IF_NONE_MATCH_HEADER in headers:
+            # Ответ на условный GET: тело возьмет из записи кеша _cached_get, raise_for_status считает 304 ошибкой
+            return response
+
+        response.raise_for_status()
+        return response
+
+    @asynccontextmanager
+    async def _upstream_call(self, method: str, url: str, kwargs: dict) -> AsyncIterator['UpstreamCall']:
+        """
+        Допуск одного вызова upstream: дедлайн апдейта, circuit breaker, лимитер и метрики.
+        Таймаут в kwargs урезается до остатка дедлайна. Исход вызова оценивается при выходе из блока,
+        поэтому потоковое скачивание держит слот лимитера, пока читает тело.
+        """
         try:
-            session = await self._get_session()
-
-            headers = {**self.default_headers, **kwargs.pop('headers', {})}
-            cookies = {**self.default_cookies, **kwargs.pop('cookies', {})}
-
-            if self.use_tracing:
-                propagate.inject(headers)
-
-            if self._circuit_breaker:
-                response = await self._circuit_breaker.call(
-                    session.request,
-                    method,
-                    url,
-                    headers=headers,
-                    cookies=cookies,
-                    **kwargs
-                )
+            route = route_template(url)
+            deadline = current_deadline()
+            long_running = route in self.long_running_routes
+            if deadline is not None and deadline.remaining(long_running) <= 0:
+                # Пользователь ответа уже не ждет — не занимаем ни соединение, ни слот лимитера
+                self._record_deadline_exceeded(route)
+                raise DeadlineExceededError(f"Дедлайн апдейта истек до запроса {method} {url}")
+
+            circuit_breaker = self._circuit_breaker_for(route)
+            if circuit_breaker is not None:
+                circuit_breaker.before_call()
+
+            if self.limiter is not None:
+                try:
+                    await self.limiter.acquire()
+                except BaseException:
+                    if circuit_breaker is not None:
+                        circuit_breaker.release()
+                    raise
+
+            capped_by_deadline = False
+            if deadline is not None:
+                remaining = max(deadline.remaining(long_running), 0.001)
+                if remaining < self.timeout:
+                    kwargs['timeout'] = httpx.Timeout(remaining, pool=min(self.pool_timeout, remaining))
+                    capped_by_deadline = True
+
+            self._track_request_start()
+            call = UpstreamCall(deadline, long_running)
+            try:
+                yield call
+            except (httpx.TimeoutException, DeadlineExceededError) as err:
+                if isinstance(err, httpx.TimeoutException) and not capped_by_deadline:
+                    self._record_outcome(route, circuit_breaker, True, call.duration())
+                    raise
+                # Таймаут наступил из-за бюджета апдейта, а не из-за upstream — breaker и лимитер его не учитывают
+                if circuit_breaker is not None:
+                    circuit_breaker.release()
+                if self.limiter is not None:
+                    self.limiter.cancel()
+                self._record_deadline_exceeded(route)
+                if isinstance(err, DeadlineExceededError):
+                    raise
+                raise DeadlineExceededError(f"Дедлайн апдейта истек во время запроса {method} {url}") from err
+            except httpx.HTTPError:
+                self._record_outcome(route, circuit_breaker, True, call.duration())
+                raise
+            except BaseException:
+                if circuit_breaker is not None:
+                    circuit_breaker.release()
+                if self.limiter is not None:
+                    self.limiter.cancel()
+                raise
             else:
-                response = await session.request(
-                    method,
-                    url,
-                    headers=headers,
-                    cookies=cookies,
-                    **kwargs
-                )
+                self._record_outcome(route, circuit_breaker, call.failed, call.duration())
+            finally:
+                self._track_request_end()
 
-            response.raise_for_status()
-            return response
+        except httpx.PoolTimeout:
+            if self.metrics is not None:
+                self.metrics.pool_timeout_counter.add(1, attributes=self.metric_attributes)
+            raise
 
-        except Exception as err:
+        except ConcurrencyLimitExceededError:
+            if self.metrics is not None:
+                self.metrics.concurrency_rejected_counter.add(1, attributes=self.metric_attributes)
             raise
 
     async def _request_with_retry(
             self,
             method: str,
             url: str,
+            idempotent: bool = False,
             **kwargs
-    ) -> httpx.Response | None:
-        start_time = datetime.now()
-
-        last_exception = None
-        retry_count = 0
-
-        async for attempt in self._create_retry_strategy():
-            with attempt:
-                retry_count = attempt.retry_state.attempt_number - 1
+    ) -> httpx.Response:
+        # Неидемпотентный запрос повторять нельзя: первая попытка могла дойти до сервиса
+        max_attempts = max(self.retry_count, 1) if idempotent else 1
+        start_time = time.monotonic()
+
+        attempt = 1
+        while True:
+            try:
+                # _execute_request забирает headers и cookies из kwargs, каждой попытке нужна своя копия
+                response = await self._execute_request(method, url, **dict(kwargs))
+            except Exception as err:
+                if attempt >= max_attempts or not should_retry_exception(err):
+                    raise
 
-                if retry_count > 0:
-                    if isinstance(last_exception, httpx.HTTPStatusError):
-                        if last_exception.response.status_code == 500:
-                            return None
+                delay = self.backoff(attempt)
+                deadline = current_deadline()
+                long_running = route_template(url) in self.long_running_routes
+                if deadline is not None and deadline.remaining(long_running) <= delay:
+                    # Следующая попытка все равно не уложится в бюджет апдейта
+                    raise
+                if not self._try_acquire_retry(url):
+                    raise
 
-                    wait_time = self.backoff(attempt.retry_state)
+                if self.logger is not None:
                     self.logger.warning(
-                        f"Попытка #{retry_count} для {method} {url}"
-                        f"после {wait_time:.2f}с ожидания. "
-                        f"Последняя ошибка: {last_exception.__class__.__name__}: {str(last_exception)}"
+                        f"Запрос {method} {url} неуспешен "
+                        f"(попытка {attempt}/{max_attempts}) "
+                        f"за {time.monotonic() - start_time:.2f}с. Следующая попытка через {delay:.2f}с. "
+                        f"Ошибка: {err.__class__.__name__}: {str(err)}"
                     )
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self._on_request_success()
+            if attempt > 1 and self.logger is not None:
+                self.logger.info(
+                    f"Запрос {method} {url} выполнен успешно "
+                    f"после {attempt - 1} повторов в течение {time.monotonic() - start_time:.2f}с "
+                    f"(status: {response.status_code})"
+                )
+            return install_json_decoder(response)
+
+    def _try_acquire_retry(self, url: str) -> bool:
+        attributes = {
+            **self.metric_attributes,
+            common.HTTP_CLIENT_ROUTE_KEY: route_template(url),
+        }
+
+        exhausted = None
+        if self.retry_budget is not None:
+            if not self.retry_budget.try_acquire():
+                exhausted = "upstream"
+            elif not AsyncHTTPClient._global_retry_budget.try_acquire():
+                self.retry_budget.refund()
+                exhausted = "global"
+
+        if exhausted is not None:
+            if self.metrics is not None:
+                self.metrics.retry_budget_exhausted_counter.add(1, attributes={
+                    **attributes,
+                    common.RETRY_BUDGET_KEY: exhausted,
+                })
+            if self.logger is not None:
+                self.logger.warning(f"Бюджет ретраев ({exhausted}) исчерпан, запрос к {url} не повторяем")
+            return False
 
-                try:
-                    response = await self._execute_request(method, url, **kwargs)
-
-                    elapsed = (datetime.now() - start_time).total_seconds()
-                    if retry_count > 0:
-                        self.logger.info(
-                            f"Запрос {method} {url} выполнен успешно "
-                            f"после {retry_count} попыток в течение {elapsed:.2f}с "
-                            f"(status: {response.status_code})"
-                        )
-
-                    return response
-
-                except Exception as err:
-                    last_exception = err
-                    elapsed = (datetime.now() - start_time).total_seconds()
-
-                    if retry_count < self.retry_count - 1:  # Есть еще попытки
-                        next_delay = self.backoff(attempt.retry_state)
-                        self.logger.warning(
-                            f"Запрос {method} {url} неуспешен "
-                            f"(попытка {retry_count + 1}/{self.retry_count}) "
-                            f"за {elapsed:.2f}с. Следующая попытка через {next_delay:.2f}с. "
-                            f"Ошибка: {err.__class__.__name__}: {str(err)}"
-                        )
-                    else:
-                        raise err
+        if self.metrics is not None:
+            self.metrics.retry_counter.add(1, attributes=attributes)
+        return True
 
-                    raise
-        return None
+    def _record_deadline_exceeded(self, route: str) -> None:
+        if self.metrics is not None:
+            self.metrics.deadline_exceeded_counter.add(1, attributes={
+                **self.metric_attributes,
+                common.HTTP_CLIENT_ROUTE_KEY: route,
+            })
+
+    def _on_request_success(self) -> None:
+        if self.retry_budget is not None:
+            self.retry_budget.on_success()
+            AsyncHTTPClient._global_retry_budget.on_success()
 
     async def get(self, url: str, **kwargs) -> httpx.Response:
-        return await self._request_with_retry('GET', url, **kwargs)
+        key = self._singleflight_key(url, kwargs)
+        if key is None:
+            return await self._get(url, **kwargs)
+
+        response, shared = await self.singleflight.do(key, lambda: self._get(url, **kwargs))
+        if self.metrics is not None:
+            self.metrics.singleflight_request_counter.add(1, attributes={
+                **self.metric_attributes,
+                common.HTTP_CLIENT_ROUTE_KEY: route_template(url),
+                common.SINGLEFLIGHT_SHARED_KEY: shared,
+            })
+        return response
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        if self.response_cache is not None:
+            response = await self._cached_get(url, **kwargs)
+        else:
+            response = await self._fetch(url, **kwargs)
+
+        if response is not None and self.singleflight is not None:
+            share_decoded_json(response)
+        return response
+
+    def _singleflight_key(self, url: str, kwargs: dict) -> Optional[tuple]:
+        # Объединяем только запросы, полностью описанные url, params, headers и cookies
+        if self.singleflight is None or not set(kwargs) <= {'params', 'headers', 'cookies'}:
+            return None
+        try:
+            key = (
+                url,
+                *(tuple(sorted((kwargs.get(name) or {}).items())) for name in ('params', 'headers', 'cookies'))
+            )
+            hash(key)
+            return key
+        except (TypeError, AttributeError):
+            # Несортируемые или нехешируемые значения — такой запрос выполняем отдельно
+            return None
 
-    async def post(self, url: str, **kwargs) -> httpx.Response:
-        return await self._request_with_retry('POST', url, **kwargs)
+    async def post(
+            self,
+            url: str,
+            idempotent: bool = False,
+            idempotency_key: str = None,
+            **kwargs
+    ) -> httpx.Response:
+        return await self._mutate('POST', url, idempotent, idempotency_key, **kwargs)
 
-    async def put(self, url: str, **kwargs) -> httpx.Response:
-        return await self._request_with_retry('PUT', url, **kwargs)
+    async def put(
+            self,
+            url: str,
+            idempotent: bool = False,
+            idempotency_key: str = None,
+            **kwargs
+    ) -> httpx.Response:
+        return await self._mutate('PUT', url, idempotent, idempotency_key, **kwargs)
 
-    async def patch(self, url: str, **kwargs) -> httpx.Response:
-        return await self._request_with_retry('PATCH', url, **kwargs)
+    async def patch(
+            self,
+            url: str,
+            idempotent: bool = False,
+            idempotency_key: str = None,
+            **kwargs
+    ) -> httpx.Response:
+        return await self._mutate('PATCH', url, idempotent, idempotency_key, **kwargs)
 
-    async def delete(self, url: str, **kwargs) -> httpx.Response:
-        return await self._request_with_retry('DELETE', url, **kwargs)
+    async def delete(
+            self,
+            url: str,
+            idempotent: bool = False,
+            idempotency_key: str = None,
+            **kwargs
+    ) -> httpx.Response:
+        return await self._mutate('DELETE', url, idempotent, idempotency_key, **kwargs)
+
+    async def _mutate(
+            self,
+            method: str,
+            url: str,
+            idempotent: bool,
+            idempotency_key: Optional[str],
+            **kwargs
+    ) -> httpx.Response:
+        if idempotency_key is not None:
+            # С ключом идемпотентности сервис применит повтор не больше одного раза
+            kwargs['headers'] = {**kwargs.get('headers', {}), IDEMPOTENCY_KEY_HEADER: idempotency_key}
+            idempotent = True
+
+        try:
+            return await self._request_with_retry(method, url, idempotent, **kwargs)
+        finally:
+            # Даже неуспешная мутация могла частично примениться на стороне сервиса
+            if self.response_cache is not None:
+                self.response_cache.invalidate(url)
+
+    async def upload(
+            self,
+            method: str,
+            url: str,
+            data: dict = None,
+            files: dict = None,
+            **kwargs
+    ) -> httpx.Response:
+        body = StreamingMultipart(data, files)
+        kwargs['headers'] = {**kwargs.get('headers', {}), "Content-Type": body.content_type}
+
+        # Тело читается из итераторов один раз, поэтому загрузку не повторяем и не объединяем
+        if method == 'GET':
+            return await self._request_with_retry(method, url, False, content=body, **kwargs)
+        return await self._mutate(method, url, False, None, content=body, **kwargs)
+
+    async def _cached_get(self, url: str, **kwargs) -> httpx.Response:
+        rule = self.response_cache.rule_for(url)
+        # Ответы, зависящие от заголовков и cookies вызывающего (авторизация), не кешируем
+        if rule is None or kwargs.get('headers') or kwargs.get('cookies'):
+            return await self._fetch(url, **kwargs)
+
+        params = kwargs.get('params')
+        key = (url, tuple(sorted(params.items())) if params else ())
+        entry = self.response_cache.get(key)
+        if entry is not None and entry.is_fresh:
+            self._record_cache_result(url, "hit")
+            return install_json_decoder(entry.to_response(self.base_url + url))
+
+        generation = self.response_cache.generation
+        if entry is not None:
+            # Запись протухла, но есть ETag: сервис ответит 304 без тела, если ресурс не менялся
+            response = await self._fetch(url, **{**kwargs, 'headers': {IF_NONE_MATCH_HEADER: entry.etag}})
+            if response is not None and response.status_code == 304:
+                if generation == self.response_cache.generation:
+                    self.response_cache.refresh(entry)
+                self._record_cache_result(url, "revalidated")
+                return install_json_decoder(entry.to_response(self.base_url + url))
+        else:
+            response = await self._fetch(url, **kwargs)
+
+        self._record_cache_result(url, "miss")
+        if response is not None and response.status_code == 200 and generation == self.response_cache.generation:
+            self.response_cache.set(key, rule, url.split("?", 1)[0], response)
+        return response
+
+    async def _fetch(self, url: str, **kwargs) -> httpx.Response:
+        route = route_template(url)
+        if self.hedge_budget is None or route not in self.hedged_routes:
+            return await self._request_with_retry('GET', url, True, **kwargs)
+
+        self.hedge_budget.on_request()
+        latency = self.route_latencies.setdefault(route, RouteLatency())
+        delay = latency.value()
+
+        primary = asyncio.create_task(self._timed_get(latency, url, **kwargs))
+        tasks = {primary}
+        try:
+            if delay is None:
+                return await asyncio.shield(primary)
+
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self.hedge_budget.try_acquire():
+                return await asyncio.shield(primary)
+
+            # Ответа нет дольше p95 маршрута — отправляем дубль и берем того, кто ответит первым
+            hedge = asyncio.create_task(self._timed_get(latency, url, **kwargs))
+            tasks.add(hedge)
+            return await self._first_successful(route, primary, hedge)
+        finally:
+            for task in tasks:
+                if not task.done() and task not in self.background_tasks:
+                    task.cancel()
+
+    async def _first_successful(
+            self,
+            route: str,
+            primary: asyncio.Task,
+            hedge: asyncio.Task,
+    ) -> httpx.Response:
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in done if task.exception() is None), None)
+            if winner is None:
+                continue
+
+            won_at = time.monotonic()
+            for loser in pending:
+                # Проигравшего не отменяем: разрыв запроса посреди ответа стоит соединения,
+                # а время его завершения дает честную оценку выигрыша
+                self._finish_in_background(loser, route, winner is hedge, won_at)
+            pending.clear()
+
+            if self.metrics is not None:
+                self.metrics.hedge_request_counter.add(1, attributes={
+                    **self.metric_attributes,
+                    common.HTTP_CLIENT_ROUTE_KEY: route,
+                    common.HEDGE_WINNER_KEY: "hedge" if winner is hedge else "primary",
+                })
+            return winner.result()
+
+        # Обе попытки неуспешны — отдаем ошибку основного запроса
+        return primary.result()
+
+    def _finish_in_background(self, task: asyncio.Task, route: str, hedge_won: bool, won_at: float) -> None:
+        self.background_tasks.add(task)
+
+        def on_done(finished: asyncio.Task) -> None:
+            self.background_tasks.discard(finished)
+            if finished.cancelled() or finished.exception() is not None:
+                return
+            if hedge_won and self.metrics is not None:
+                self.metrics.hedge_latency_saved.record(time.monotonic() - won_at, attributes={
+                    **self.metric_attributes,
+                    common.HTTP_CLIENT_ROUTE_KEY: route,
+                })
+
+        task.add_done_callback(on_done)
+
+    async def _timed_get(self, latency: RouteLatency, url: str, **kwargs) -> httpx.Response:
+        start_time = time.monotonic()
+        response = await self._request_with_retry('GET', url, True, **kwargs)
+        latency.record(time.monotonic() - start_time)
+        return response
+
+    def _record_cache_result(self, url: str, result: str) -> None:
+        if self.metrics is not None:
+            self.metrics.cache_request_counter.add(1, attributes={
+                **self.metric_attributes,
+                common.HTTP_CLIENT_ROUTE_KEY: route_template(url),
+                common.CACHE_RESULT_KEY: result,
+            })
 
     async def stream_get(
             self,
             url: str,
             chunk_size: int = 8192,
+            on_response: Optional[Callable[[httpx.Response], None]] = None,
             **kwargs
     ) -> AsyncIterator[bytes]:
         session = await self._get_session()
 
+        headers = dict(kwargs.pop('headers', {}))
+        if self.use_tracing:
+            propagate.inject(headers)
+
+        # Скачивание идет через те же breaker, лимитер и дедлайн, что и обычные запросы:
+        # зависшая загрузка не держит соединение дольше бюджета апдейта
+        async with self._upstream_call('GET', url, kwargs) as call:
+            async with session.stream('GET', url, headers=headers, **kwargs) as response:
+                call.responded(response)
+                if response.is_error:
+                    await response.aread()
+                else:
+                    if on_response is not None:
+                        on_response(response)
+                    # Дедлайн сверяем на каждом чтении из сети, а не на готовом чанке: медленный поток
+                    # может копить chunk_size дольше всего бюджета апдейта
+                    buffer = bytearray()
+                    async for data in response.aiter_bytes():
+                        call.check_deadline(url)
+                        buffer += data
+                        while len(buffer) >= chunk_size:
+                            yield bytes(buffer[:chunk_size])
+                            del buffer[:chunk_size]
+                    if buffer:
+                        yield bytes(buffer)
+
+        response.raise_for_status()
+
+    async def spool_get(
+            self,
+            url: str,
+            max_memory_size: int = 8 * 1024 * 1024,
+            chunk_size: int = 64 * 1024,
+            **kwargs
+    ) -> tuple[IO[bytes], httpx.Headers]:
+        # Тело до max_memory_size держим в памяти, больше — SpooledTemporaryFile сам переносит на диск
+        spool = tempfile.SpooledTemporaryFile(max_size=max_memory_size)
+        response_headers = httpx.Headers()
+
+        def on_response(response: httpx.Response) -> None:
+            response_headers.update(response.headers)
+
         try:
-            async with session.stream('GET', url, **kwargs) as response:
-                response.raise_for_status()
-                async for chunk in response.aiter_bytes(chunk_size):
-                    yield chunk
-        except Exception as err:
+            # aclosing: при ошибке записи поток закрывается сразу, а не когда сборщик доберется до генератора
+            async with aclosing(self.stream_get(url, chunk_size, on_response, **kwargs)) as chunks:
+                async for chunk in chunks:
+                    spool.write(chunk)
+        except BaseException:
+            spool.close()
             raise
 
+        spool.seek(0)
+        return spool, response_headers
+
     async def download_file(
             self,
             url: str,
@@ -440,18 +1212,19 @@ class AsyncHTTPClient:
     ) -> None:
         import aiofiles
 
-        session = await self._get_session()
         file_path = Path(file_path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
+        total = 0
 
-        try:
-            async with session.stream('GET', url) as response:
-                response.raise_for_status()
-                total = int(response.headers.get('content-length', 0))
+        def on_response(response: httpx.Response) -> None:
+            nonlocal total
+            total = int(response.headers.get('content-length', 0))
 
+        try:
+            async with aclosing(self.stream_get(url, chunk_size, on_response)) as chunks:
                 async with aiofiles.open(file_path, 'wb') as file:
                     downloaded = 0
-                    async for chunk in response.aiter_bytes(chunk_size):
+                    async for chunk in chunks:
                         await file.write(chunk)
                         downloaded += len(chunk)
 
@@ -463,10 +1236,59 @@ class AsyncHTTPClient:
                 file_path.unlink()
             raise
 
+    def _record_outcome(
+            self,
+            route: str,
+            circuit_breaker: Optional[CircuitBreaker],
+            failed: bool,
+            duration: float,
+    ) -> None:
+        if circuit_breaker is not None:
+            circuit_breaker.record(failed, duration)
+        if self.limiter is not None:
+            self.limiter.release(route, duration, failed)
+
+    def _circuit_breaker_for(self, route: str) -> Optional[CircuitBreaker]:
+        if not self.circuit_breaker_enabled:
+            return None
+
+        circuit_breaker = self.circuit_breakers.get(route)
+        if circuit_breaker is not None:
+            return circuit_breaker
+
+        if len(self.circuit_breakers) >= MAX_CIRCUIT_BREAKER_ROUTES:
+            # Нечисловые параметры в пути могут плодить маршруты — остаток делит один общий breaker
+            route = "*"
+            circuit_breaker = self.circuit_breakers.get(route)
+            if circuit_breaker is not None:
+                return circuit_breaker
+
+        circuit_breaker = CircuitBreaker(
+            failure_rate_threshold=self.circuit_breaker_failure_rate,
+            slow_call_rate_threshold=self.circuit_breaker_slow_call_rate,
+            slow_call_duration=self.circuit_breaker_slow_call_durations.get(
+                route, self.circuit_breaker_slow_call_duration
+            ),
+            minimum_calls=self.circuit_breaker_minimum_calls,
+            window=self.circuit_breaker_window,
+            recovery_timeout=self.circuit_breaker_recovery_timeout,
+            logger=self.logger,
+            name=f"{self.base_url}{route}",
+        )
+        self.circuit_breakers[route] = circuit_breaker
+        return circuit_breaker
+
     def reset_circuit_breaker(self):
-        if self._circuit_breaker:
-            self._circuit_breaker.reset()
+        for circuit_breaker in self.circuit_breakers.values():
+            circuit_breaker.reset()
 
     @property
     def circuit_breaker_state(self) -> str | None:
-        return self._circuit_breaker.state if self._circuit_breaker else None
+        # Худшее состояние среди маршрутов
+        if not self.circuit_breaker_enabled:
+            return None
+        states = {circuit_breaker.state for circuit_breaker in self.circuit_breakers.values()}
+        for state in ("open", "half-open"):
+            if state in states:
+                return state
+        return "closed"
@@ -0,0 +1,64 @@
+import json
+from dataclasses import fields
+from typing import Any, Callable, Iterable, TypeVar
+
+import httpx
+
+# Самый быстрый доступный декодер: orjson, затем ujson из requirements, в крайнем случае stdlib
+try:
+    import orjson
+
+    CODEC_NAME = "orjson"
+    _loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:
+    try:
+        import ujson
+
+        CODEC_NAME = "ujson"
+        _loads = ujson.loads
+    except ImportError:
+        CODEC_NAME = "json"
+        _loads = json.loads
+
+T = TypeVar("T")
+
+_model_fields: dict[type, frozenset[str]] = {}
+
+
+def loads(data: bytes | str) -> Any:
+    try:
+        return _loads(data)
+    except (ValueError, OverflowError):
+        # ujson не читает числа за пределами int64, а ошибку формата лучше получить от stdlib
+        return json.loads(data)
+
+
+def install_json_decoder(response: httpx.Response) -> httpx.Response:
+    """Подменяет response.json() на декодирование сырых байт тела быстрым декодером."""
+    decode = response.json
+
+    def decode_json(**kwargs) -> Any:
+        if kwargs:
+            return decode(**kwargs)
+        return loads(response.content)
+
+    response.json = decode_json
+    return response
+
+
+def build_model(cls: type[T], data: dict) -> T:
+    try:
+        return cls(**data)
+    except TypeError:
+        # Сервис добавил поле, о котором модель еще не знает, — лишние ключи отбрасываем
+        known = _model_fields.get(cls)
+        if known is None:
+            known = _model_fields[cls] = frozenset(field.name for field in fields(cls))
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+def build_models(cls: type[T], items: Iterable[dict]) -> list[T]:
+    try:
+        return [cls(**item) for item in items]
+    except TypeError:
+        return [build_model(cls, item) for item in items]
@@ -0,0 +1,40 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class DeadlineExceededError(Exception):
+    pass
+
+
+class Deadline:
+    """Бюджет времени на обработку одного апдейта: обычный для всех вызовов и отдельный, больший, для долгих маршрутов."""
+    __slots__ = ("started_at", "budget", "long_budget")
+
+    def __init__(self, budget: float, long_budget: Optional[float] = None):
+        self.started_at = time.monotonic()
+        self.budget = budget
+        self.long_budget = long_budget if long_budget is not None else budget
+
+    def remaining(self, long_running: bool = False) -> float:
+        budget = self.long_budget if long_running else self.budget
+        return self.started_at + budget - time.monotonic()
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget: float, long_budget: Optional[float] = None) -> Iterator[Deadline]:
+    # Задачи, созданные внутри scope, копируют контекст и наследуют тот же дедлайн
+    deadline = Deadline(budget, long_budget)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -0,0 +1,127 @@
+import copy
+import functools
+import inspect
+from typing import Any, Hashable, Optional
+
+from opentelemetry.metrics import Meter
+
+from internal import common
+from pkg.cache.cache import LRUCache
+
+_MISSING = object()
+
+
+class EntityCache:
+    """
+    Кеш декодированных сущностей Loom с TTL на тип сущности.
+    В отличие от ResponseCache хранит готовые модели, поэтому попадание не стоит ни HTTP, ни декодирования.
+    Сбрасывается мутациями того же клиента через декоратор invalidates.
+    Не потокобезопасен — рассчитан на один event loop.
+    """
+
+    def __init__(self, ttls: dict[str, float], max_size: int = 10000, meter: Optional[Meter] = None):
+        self.ttls = ttls
+        self.entries = LRUCache(max_size, None)
+        # Эпоха входит в ключ: сброс всех записей типа — это просто новая эпоха, старые вытеснит LRU
+        self.epochs: dict[str, int] = {}
+        # Увеличивается при любом сбросе типа, чтобы не сохранить ответ, полученный до мутации
+        self.generations: dict[str, int] = {}
+
+        self.hit_counter = None
+        self.miss_counter = None
+        if meter is not None:
+            self.hit_counter = meter.create_counter(
+                name=common.HTTP_CLIENT_ENTITY_CACHE_HIT_TOTAL_METRIC,
+                description="Total count of decoded entity cache hits",
+                unit="1"
+            )
+            self.miss_counter = meter.create_counter(
+                name=common.HTTP_CLIENT_ENTITY_CACHE_MISS_TOTAL_METRIC,
+                description="Total count of decoded entity cache misses",
+                unit="1"
+            )
+
+    def get(self, entity: str, key: Hashable) -> Any:
+        value = self.entries.get(self._key(entity, key), _MISSING)
+        counter = self.miss_counter if value is _MISSING else self.hit_counter
+        if counter is not None:
+            counter.add(1, {common.ENTITY_CACHE_ENTITY_KEY: entity})
+
+        if value is _MISSING:
+            return _MISSING
+        # Вызывающий код может менять модель, а кеш должен отдавать то же, что вернул бы сервис
+        return copy.deepcopy(value)
+
+    def set(self, entity: str, key: Hashable, value: Any, generation: int) -> None:
+        if generation != self.generation(entity):
+            return
+        self.entries.set(self._key(entity, key), copy.deepcopy(value), self.ttls[entity])
+
+    def generation(self, entity: str) -> int:
+        return self.generations.get(entity, 0)
+
+    def invalidate(self, entity: str, key: Hashable = None) -> None:
+        self.generations[entity] = self.generation(entity) + 1
+        if key is None:
+            self.epochs[entity] = self.epochs.get(entity, 0) + 1
+        else:
+            self.entries.delete(self._key(entity, key))
+
+    def _key(self, entity: str, key: Hashable) -> tuple:
+        return entity, self.epochs.get(entity, 0), key
+
+
+def cached(entity: str):
+    """Кеширует результат метода клиента по его единственному аргументу-идентификатору в self.entity_cache."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            cache: Optional[EntityCache] = self.entity_cache
+            if cache is None:
+                return await method(self, *args, **kwargs)
+
+            key = args[0] if args else next(iter(kwargs.values()))
+            value = cache.get(entity, key)
+            if value is not _MISSING:
+                return value
+
+            generation = cache.generation(entity)
+            value = await method(self, *args, **kwargs)
+            cache.set(entity, key, value, generation)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*targets: str | tuple[str, str]):
+    """
+    Сбрасывает записи после мутации, в том числе неудачной — она могла дойти до сервиса.
+    Цель — либо (entity, имя аргумента с идентификатором), либо entity целиком, когда ключ неизвестен.
+    """
+
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                cache: Optional[EntityCache] = self.entity_cache
+                if cache is not None:
+                    arguments = signature.bind(self, *args, **kwargs).arguments
+                    for target in targets:
+                        if isinstance(target, tuple):
+                            entity, argument = target
+                            cache.invalidate(entity, arguments[argument])
+                        else:
+                            cache.invalidate(target)
+
+        # Какие записи сбрасывает мутация — для проверок, что каждый сброс действительно срабатывает
+        wrapper.invalidated_entities = targets
+        return wrapper
+
+    return decorator
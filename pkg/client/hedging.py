@@ -0,0 +1,58 @@
+from collections import deque
+from typing import Optional
+
+
+class RouteLatency:
+    """Квантиль латентности маршрута по последним sample_size вызовам, пересчитывается раз в refresh_every замеров."""
+
+    def __init__(
+            self,
+            quantile: float = 0.95,
+            sample_size: int = 256,
+            min_samples: int = 20,
+            refresh_every: int = 16,
+    ):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.refresh_every = refresh_every
+
+        self._samples: deque[float] = deque(maxlen=sample_size)
+        self._since_refresh = 0
+        self._value: Optional[float] = None
+
+    def record(self, duration: float) -> None:
+        self._samples.append(duration)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh_every:
+            self._refresh()
+
+    def value(self) -> Optional[float]:
+        # Пока замеров мало, квантиль ненадежен — не хеджируем
+        if self._value is None and len(self._samples) >= self.min_samples:
+            self._refresh()
+        return self._value
+
+    def _refresh(self) -> None:
+        self._since_refresh = 0
+        if len(self._samples) < self.min_samples:
+            return
+        samples = sorted(self._samples)
+        self._value = samples[min(int(len(samples) * self.quantile), len(samples) - 1)]
+
+
+class HedgeBudget:
+    """Токен-бакет: каждый запрос добавляет max_ratio токена, хедж тратит целый — хеджей не больше max_ratio трафика."""
+
+    def __init__(self, max_ratio: float, burst: float = 10):
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self._tokens = 0.0
+
+    def on_request(self) -> None:
+        self._tokens = min(self._tokens + self.max_ratio, self.burst)
+
+    def try_acquire(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
@@ -9,7 +9,15 @@ class LoomAccountClient(interface.ILoomAccountClient):
             self,
             tel: interface.ITelemetry,
             host: str,
-            port: int
+            port: int,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            pool_autotune: bool = False,
+            concurrency_limit: int = 0,
+            concurrency_queue_size: int = 100,
+            concurrency_queue_timeout: float = 1.0,
+            retry_count: int = 3,
+            retry_budget_ratio: float = 0.1,
     ):
         logger = tel.logger()
         self.client = AsyncHTTPClient(
@@ -17,6 +25,16 @@ class LoomAccountClient(interface.ILoomAccountClient):
             port,
             prefix="/api/account",
             use_tracing=True,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            pool_autotune=pool_autotune,
+            concurrency_limit=concurrency_limit,
+            concurrency_queue_size=concurrency_queue_size,
+            concurrency_queue_timeout=concurrency_queue_timeout,
+            retry_count=retry_count,
+            retry_budget_ratio=retry_budget_ratio,
+            logger=logger,
+            meter=tel.meter(),
         )
         self.tracer = tel.tracer()
 
@@ -33,7 +51,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                     "login": login,
                     "password": password
                 }
-                response = await self.client.post("/register", json=body)
+                response = await self.client.post("/register", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -61,7 +79,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                     "login": login,
                     "password": password
                 }
-                response = await self.client.post("/register/tg", json=body)
+                response = await self.client.post("/register/tg", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -93,7 +111,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                     "login": login,
                     "password": password
                 }
-                response = await self.client.post("/login", json=body)
+                response = await self.client.post("/login", idempotent=True, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -154,7 +172,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                     "google_two_fa_key": google_two_fa_key,
                     "google_two_fa_code": google_two_fa_code
                 }
-                await self.client.post("/two-fa/set", json=body, cookies=cookies)
+                await self.client.post("/two-fa/set", idempotent=False, json=body, cookies=cookies)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -182,7 +200,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                 body = {
                     "google_two_fa_code": google_two_fa_code
                 }
-                await self.client.delete("/two-fa", json=body, cookies=cookies)
+                await self.client.delete("/two-fa", idempotent=True, json=body, cookies=cookies)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -211,7 +229,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                     "account_id": account_id,
                     "google_two_fa_code": google_two_fa_code
                 }
-                response = await self.client.post("/two-fa/verify", json=body, cookies=cookies)
+                response = await self.client.post("/two-fa/verify", idempotent=False, json=body, cookies=cookies)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -242,7 +260,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                     "account_id": account_id,
                     "new_password": new_password
                 }
-                await self.client.post("/password/recovery", json=body, cookies=cookies)
+                await self.client.post("/password/recovery", idempotent=False, json=body, cookies=cookies)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -273,7 +291,7 @@ class LoomAccountClient(interface.ILoomAccountClient):
                     "new_password": new_password,
                     "old_password": old_password
                 }
-                await self.client.put("/password", json=body, cookies=cookies)
+                await self.client.put("/password", idempotent=True, json=body, cookies=cookies)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
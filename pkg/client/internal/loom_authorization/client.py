@@ -10,7 +10,15 @@ class LoomAuthorizationClient(interface.ILoomAuthorizationClient):
             self,
             tel: interface.ITelemetry,
             host: str,
-            port: int
+            port: int,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            pool_autotune: bool = False,
+            concurrency_limit: int = 0,
+            concurrency_queue_size: int = 100,
+            concurrency_queue_timeout: float = 1.0,
+            retry_count: int = 3,
+            retry_budget_ratio: float = 0.1,
     ):
         logger = tel.logger()
         self.client = AsyncHTTPClient(
@@ -18,6 +26,16 @@ class LoomAuthorizationClient(interface.ILoomAuthorizationClient):
             port,
             prefix="/api/authorization",
             use_tracing=True,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            pool_autotune=pool_autotune,
+            concurrency_limit=concurrency_limit,
+            concurrency_queue_size=concurrency_queue_size,
+            concurrency_queue_timeout=concurrency_queue_timeout,
+            retry_count=retry_count,
+            retry_budget_ratio=retry_budget_ratio,
+            logger=logger,
+            meter=tel.meter(),
         )
         self.tracer = tel.tracer()
 
@@ -33,7 +51,7 @@ class LoomAuthorizationClient(interface.ILoomAuthorizationClient):
                 body = {
                     "account_id": account_id
                 }
-                response = await self.client.post("/tg", json=body)
+                response = await self.client.post("/tg", idempotent=True, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -1,11 +1,47 @@
-import io
 from datetime import datetime
+from typing import IO, AsyncIterable
 
 from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import model
 from internal import interface
+from pkg.client import codec
 from pkg.client.client import AsyncHTTPClient
+from pkg.client.response_cache import ResponseCacheRule
+from pkg.client.entity_cache import EntityCache, cached, invalidates
+
+# Справочные ответы, которые запрашиваются на каждой отрисовке и редко меняются
+response_cache_rules = [
+    ResponseCacheRule("/publication/category/{id}", ttl=300, invalidated_by=("/publication/category",)),
+    ResponseCacheRule("/publication/organization/{id}/categories", ttl=300, invalidated_by=("/publication/category",)),
+    ResponseCacheRule("/social-network/organization/{id}", ttl=60, invalidated_by=("/social-network",)),
+]
+
+# Рубрики и соцсети правятся почти только из бота, поэтому живут дольше ответов в ResponseCache
+entity_cache_ttls = {
+    "category": 300,
+    "categories": 300,
+    "social_networks": 120,
+}
+
+# Генерация штатно идет десятки секунд — медленным считаем только то, что дольше этих порогов
+slow_call_durations = {
+    "/publication/text/generate": 120,
+    "/publication/text/regenerate": 120,
+    "/publication/image/generate": 180,
+    "/publication/create": 60,
+    "/video-cut/vizard/generate": 120,
+}
+
+# Безопасные GET с тяжелым хвостом латентности, для которых разрешен дубль запроса
+hedged_routes = ["/publication/category/{id}"]
+
+
+def filename_from_headers(headers, default: str) -> str:
+    content_disposition = headers.get("Content-Disposition", "")
+    if "filename=" in content_disposition:
+        return content_disposition.split("filename=")[-1].strip('"')
+    return default
 
 
 class LoomContentClient(interface.ILoomContentClient):
@@ -13,16 +49,49 @@ class LoomContentClient(interface.ILoomContentClient):
             self,
             tel: interface.ITelemetry,
             host: str,
-            port: int
+            port: int,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            pool_autotune: bool = False,
+            concurrency_limit: int = 0,
+            concurrency_queue_size: int = 100,
+            concurrency_queue_timeout: float = 1.0,
+            retry_count: int = 3,
+            retry_budget_ratio: float = 0.1,
+            response_cache_max_bytes: int = 0,
+            entity_cache_max_size: int = 0,
+            hedge_max_ratio: float = 0,
+            download_max_memory_size: int = 8 * 1024 * 1024,
     ):
         self.client = AsyncHTTPClient(
             host,
             port,
             prefix="/api/content",
             use_tracing=True,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            pool_autotune=pool_autotune,
+            concurrency_limit=concurrency_limit,
+            concurrency_queue_size=concurrency_queue_size,
+            concurrency_queue_timeout=concurrency_queue_timeout,
+            retry_count=retry_count,
+            retry_budget_ratio=retry_budget_ratio,
+            response_cache_rules=response_cache_rules,
+            response_cache_max_bytes=response_cache_max_bytes,
+            hedged_routes=hedged_routes,
+            hedge_max_ratio=hedge_max_ratio,
+            circuit_breaker_slow_call_durations=slow_call_durations,
+            long_running_routes=slow_call_durations.keys(),
+            logger=tel.logger(),
+            meter=tel.meter(),
         )
         self.tracer = tel.tracer()
+        self.entity_cache = None
+        if entity_cache_max_size > 0:
+            self.entity_cache = EntityCache(entity_cache_ttls, entity_cache_max_size, tel.meter())
+        self.download_max_memory_size = download_max_memory_size
 
+    @cached("social_networks")
     async def get_social_networks_by_organization(self, organization_id: int) -> dict:
         with self.tracer.start_as_current_span(
                 "LoomContentClient.get_social_networks_by_organization",
@@ -42,6 +111,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("social_networks", "organization_id"))
     async def create_telegram(self, organization_id: int, telegram_channel_username: str, autoselect: bool):
         with self.tracer.start_as_current_span(
                 "LoomContentClient.create_telegram",
@@ -56,7 +126,7 @@ class LoomContentClient(interface.ILoomContentClient):
                     "tg_channel_username": telegram_channel_username,
                     "autoselect": autoselect,
                 }
-                await self.client.post(f"/social-network/telegram", json=body)
+                await self.client.post(f"/social-network/telegram", idempotent=False, json=body)
                 span.set_status(Status(StatusCode.OK))
 
             except Exception as e:
@@ -81,6 +151,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("social_networks", "organization_id"))
     async def update_telegram(
             self,
             organization_id: int,
@@ -100,7 +171,7 @@ class LoomContentClient(interface.ILoomContentClient):
                     "tg_channel_username": telegram_channel_username,
                     "autoselect": autoselect,
                 }
-                await self.client.put(f"/social-network/telegram", json=body)
+                await self.client.put(f"/social-network/telegram", idempotent=True, json=body)
                 span.set_status(Status(StatusCode.OK))
 
             except Exception as e:
@@ -108,6 +179,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("social_networks", "organization_id"))
     async def delete_telegram(self, organization_id: int):
         with self.tracer.start_as_current_span(
                 "LoomContentClient.delete_telegram",
@@ -117,7 +189,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/social-network/telegram/{organization_id}")
+                await self.client.delete(f"/social-network/telegram/{organization_id}", idempotent=True)
                 span.set_status(Status(StatusCode.OK))
 
             except Exception as e:
@@ -140,7 +212,7 @@ class LoomContentClient(interface.ILoomContentClient):
                     "category_id": category_id,
                     "text_reference": text_reference,
                 }
-                response = await self.client.post("/publication/text/generate", json=body)
+                response = await self.client.post("/publication/text/generate", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -167,7 +239,7 @@ class LoomContentClient(interface.ILoomContentClient):
                     "publication_text": publication_text,
                     "prompt": prompt,
                 }
-                response = await self.client.post("/publication/text/regenerate", json=body)
+                response = await self.client.post("/publication/text/regenerate", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -184,7 +256,7 @@ class LoomContentClient(interface.ILoomContentClient):
             publication_text: str,
             text_reference: str,
             prompt: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> list[str]:
         with self.tracer.start_as_current_span(
@@ -213,9 +285,9 @@ class LoomContentClient(interface.ILoomContentClient):
 
                 # Отправляем запрос
                 if files:
-                    response = await self.client.post("/publication/image/generate", data=data, files=files)
+                    response = await self.client.upload("POST", "/publication/image/generate", data=data, files=files)
                 else:
-                    response = await self.client.post("/publication/image/generate", data=data)
+                    response = await self.client.post("/publication/image/generate", idempotent=False, data=data)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -235,7 +307,7 @@ class LoomContentClient(interface.ILoomContentClient):
             text: str,
             moderation_status: str,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> dict:
         with self.tracer.start_as_current_span(
@@ -269,9 +341,9 @@ class LoomContentClient(interface.ILoomContentClient):
 
                 # Отправляем запрос
                 if files:
-                    response = await self.client.post("/publication/create", data=data, files=files)
+                    response = await self.client.upload("POST", "/publication/create", data=data, files=files)
                 else:
-                    response = await self.client.post("/publication/create", data=data)
+                    response = await self.client.post("/publication/create", idempotent=False, data=data)
 
                 json_response = response.json()
 
@@ -291,7 +363,7 @@ class LoomContentClient(interface.ILoomContentClient):
             text: str = None,
             time_for_publication: datetime = None,
             image_url: str = None,
-            image_content: bytes = None,
+            image_content: bytes | AsyncIterable[bytes] = None,
             image_filename: str = None,
     ) -> None:
         with self.tracer.start_as_current_span(
@@ -332,9 +404,9 @@ class LoomContentClient(interface.ILoomContentClient):
 
                 # Отправляем запрос
                 if files:
-                    response = await self.client.put(f"/publication/{publication_id}", data=data, files=files)
+                    response = await self.client.upload("PUT", f"/publication/{publication_id}", data=data, files=files)
                 elif data:  # Отправляем только если есть данные
-                    response = await self.client.put(f"/publication/{publication_id}", data=data)
+                    response = await self.client.put(f"/publication/{publication_id}", idempotent=True, data=data)
                 else:
                     # Если нет данных для обновления, просто возвращаем успех
                     span.set_status(Status(StatusCode.OK))
@@ -361,7 +433,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/publication/{publication_id}")
+                await self.client.delete(f"/publication/{publication_id}", idempotent=True)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -381,7 +453,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/publication/{publication_id}/image")
+                await self.client.delete(f"/publication/{publication_id}/image", idempotent=True)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -401,7 +473,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.post(f"/publication/{publication_id}/moderation/send")
+                await self.client.post(f"/publication/{publication_id}/moderation/send", idempotent=False)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -434,7 +506,7 @@ class LoomContentClient(interface.ILoomContentClient):
                         moderation_status),
                     "moderation_comment": moderation_comment
                 }
-                response = await self.client.post("/publication/moderate", json=body)
+                response = await self.client.post("/publication/moderate", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -458,7 +530,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return model.Publication(**json_response)
+                return codec.build_model(model.Publication, json_response)
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -477,7 +549,45 @@ class LoomContentClient(interface.ILoomContentClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return [model.Publication(**pub) for pub in json_response]
+                return codec.build_models(model.Publication, json_response)
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
+
+    async def get_publications_page(
+            self,
+            organization_id: int,
+            moderation_status: str = None,
+            creator_id: int = None,
+            moderator_id: int = None,
+            cursor: int = None,
+            limit: int = 20,
+    ) -> model.ContentPage:
+        with self.tracer.start_as_current_span(
+                "LoomContentClient.get_publications_page",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "organization_id": organization_id,
+                    "moderation_status": moderation_status or "",
+                    "limit": limit,
+                }
+        ) as span:
+            try:
+                page = await self._get_page(
+                    f"/publication/organization/{organization_id}/publications",
+                    model.Publication,
+                    {
+                        "moderation_status": moderation_status,
+                        "creator_id": creator_id,
+                        "moderator_id": moderator_id,
+                    },
+                    cursor,
+                    limit,
+                )
+
+                span.set_status(Status(StatusCode.OK))
+                return page
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -486,7 +596,7 @@ class LoomContentClient(interface.ILoomContentClient):
     async def download_publication_image(
             self,
             publication_id: int
-    ) -> tuple[io.BytesIO, str]:
+    ) -> tuple[IO[bytes], str]:
         with self.tracer.start_as_current_span(
                 "LoomContentClient.download_publication_image",
                 kind=SpanKind.CLIENT,
@@ -495,16 +605,12 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                response = await self.client.get(f"/publication/{publication_id}/image/download")
-
-                # Extract filename from Content-Disposition header or use default
-                filename = "image.jpg"
-                if "Content-Disposition" in response.headers:
-                    content_disposition = response.headers["Content-Disposition"]
-                    if "filename=" in content_disposition:
-                        filename = content_disposition.split("filename=")[-1].strip('"')
-
-                image_data = io.BytesIO(response.content)
+                # Файл не читаем целиком в память: сверх download_max_memory_size он уходит во временный файл
+                image_data, headers = await self.client.spool_get(
+                    f"/publication/{publication_id}/image/download",
+                    max_memory_size=self.download_max_memory_size,
+                )
+                filename = filename_from_headers(headers, "image.jpg")
 
                 span.set_status(Status(StatusCode.OK))
                 return image_data, filename
@@ -514,6 +620,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 raise
 
     # РУБРИКИ
+    @invalidates(("categories", "organization_id"))
     async def create_category(
             self,
             organization_id: int,
@@ -533,7 +640,7 @@ class LoomContentClient(interface.ILoomContentClient):
                     "prompt_for_image_style": prompt_for_image_style,
                     "prompt_for_text_style": prompt_for_text_style
                 }
-                response = await self.client.post("/publication/category", json=body)
+                response = await self.client.post("/publication/category", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -543,6 +650,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @cached("category")
     async def get_category_by_id(self, category_id: int) -> model.Category:
         with self.tracer.start_as_current_span(
                 "LoomContentClient.get_category_by_id",
@@ -556,12 +664,13 @@ class LoomContentClient(interface.ILoomContentClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return model.Category(**json_response)
+                return codec.build_model(model.Category, json_response)
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @cached("categories")
     async def get_categories_by_organization(self, organization_id: int) -> list[model.Category]:
         with self.tracer.start_as_current_span(
                 "LoomContentClient.get_categories_by_organization",
@@ -575,12 +684,13 @@ class LoomContentClient(interface.ILoomContentClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return [model.Category(**cat) for cat in json_response]
+                return codec.build_models(model.Category, json_response)
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("category", "category_id"), "categories")
     async def update_category(
             self,
             category_id: int,
@@ -601,7 +711,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 if prompt_for_text_style is not None:
                     body["prompt_for_text_style"] = prompt_for_text_style
 
-                await self.client.put(f"/publication/category/{category_id}", json=body)
+                await self.client.put(f"/publication/category/{category_id}", idempotent=True, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -609,6 +719,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("category", "category_id"), "categories")
     async def delete_category(self, category_id: int) -> None:
         with self.tracer.start_as_current_span(
                 "LoomContentClient.delete_category",
@@ -618,7 +729,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/publication/category/{category_id}")
+                await self.client.delete(f"/publication/category/{category_id}", idempotent=True)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -650,7 +761,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 if tg_channels is not None:
                     body["tg_channels"] = tg_channels
 
-                response = await self.client.post("/publication/autoposting", json=body)
+                response = await self.client.post("/publication/autoposting", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -673,7 +784,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return [model.Autoposting(**autoposting) for autoposting in json_response]
+                return codec.build_models(model.Autoposting, json_response)
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -702,7 +813,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 if tg_channels is not None:
                     body["tg_channels"] = tg_channels
 
-                await self.client.put(f"/publication/autoposting/{autoposting_id}", json=body)
+                await self.client.put(f"/publication/autoposting/{autoposting_id}", idempotent=True, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -719,7 +830,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/publication/autoposting/{autoposting_id}")
+                await self.client.delete(f"/publication/autoposting/{autoposting_id}", idempotent=True)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -749,7 +860,7 @@ class LoomContentClient(interface.ILoomContentClient):
                     "youtube_video_reference": youtube_video_reference
                 }
 
-                await self.client.post("/video-cut/vizard/generate", json=body)
+                await self.client.post("/video-cut/vizard/generate", idempotent=False, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -786,7 +897,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 if youtube_source is not None:
                     body["youtube_source"] = youtube_source
 
-                await self.client.put(f"/video-cut", json=body)
+                await self.client.put(f"/video-cut", idempotent=True, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -803,7 +914,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/video-cut/{video_cut_id}")
+                await self.client.delete(f"/video-cut/{video_cut_id}", idempotent=True)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -823,7 +934,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                await self.client.post(f"/video-cut/{video_cut_id}/moderation/send")
+                await self.client.post(f"/video-cut/{video_cut_id}/moderation/send", idempotent=False)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -845,7 +956,7 @@ class LoomContentClient(interface.ILoomContentClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return model.VideoCut(**json_response)
+                return codec.build_model(model.VideoCut, json_response)
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -864,7 +975,47 @@ class LoomContentClient(interface.ILoomContentClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return [model.VideoCut(**cut) for cut in json_response]
+                return codec.build_models(model.VideoCut, json_response)
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                raise
+
+    async def get_video_cuts_page(
+            self,
+            organization_id: int,
+            moderation_status: str = None,
+            creator_id: int = None,
+            moderator_id: int = None,
+            with_video: bool = False,
+            cursor: int = None,
+            limit: int = 20,
+    ) -> model.ContentPage:
+        with self.tracer.start_as_current_span(
+                "LoomContentClient.get_video_cuts_page",
+                kind=SpanKind.CLIENT,
+                attributes={
+                    "organization_id": organization_id,
+                    "moderation_status": moderation_status or "",
+                    "limit": limit,
+                }
+        ) as span:
+            try:
+                page = await self._get_page(
+                    f"/organization/{organization_id}/video-cuts",
+                    model.VideoCut,
+                    {
+                        "moderation_status": moderation_status,
+                        "creator_id": creator_id,
+                        "moderator_id": moderator_id,
+                        "has_video": True if with_video else None,
+                    },
+                    cursor,
+                    limit,
+                )
+
+                span.set_status(Status(StatusCode.OK))
+                return page
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -895,7 +1046,7 @@ class LoomContentClient(interface.ILoomContentClient):
                         moderation_status),
                     "moderation_comment": moderation_comment
                 }
-                await self.client.post(f"/video-cut/moderate", json=body)
+                await self.client.post(f"/video-cut/moderate", idempotent=False, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -906,7 +1057,7 @@ class LoomContentClient(interface.ILoomContentClient):
     async def download_video_cut(
             self,
             video_cut_id: int
-    ) -> tuple[io.BytesIO, str]:
+    ) -> tuple[IO[bytes], str]:
         with self.tracer.start_as_current_span(
                 "LoomContentClient.download_video_cut",
                 kind=SpanKind.CLIENT,
@@ -915,16 +1066,12 @@ class LoomContentClient(interface.ILoomContentClient):
                 }
         ) as span:
             try:
-                response = await self.client.get(f"/video-cut/{video_cut_id}/download")
-
-                # Extract filename from Content-Disposition header or use default
-                filename = "video.mp4"
-                if "Content-Disposition" in response.headers:
-                    content_disposition = response.headers["Content-Disposition"]
-                    if "filename=" in content_disposition:
-                        filename = content_disposition.split("filename=")[-1].strip('"')
-
-                video_data = io.BytesIO(response.content)
+                # Файл не читаем целиком в память: сверх download_max_memory_size он уходит во временный файл
+                video_data, headers = await self.client.spool_get(
+                    f"/video-cut/{video_cut_id}/download",
+                    max_memory_size=self.download_max_memory_size,
+                )
+                filename = filename_from_headers(headers, "video.mp4")
 
                 span.set_status(Status(StatusCode.OK))
                 return video_data, filename
@@ -936,7 +1083,7 @@ class LoomContentClient(interface.ILoomContentClient):
     async def transcribe_audio(
             self,
             organization_id: int,
-            audio_content: bytes = None,
+            audio_content: bytes | AsyncIterable[bytes] = None,
             audio_filename: str = None,
     ) -> str:
         with self.tracer.start_as_current_span(
@@ -953,7 +1100,7 @@ class LoomContentClient(interface.ILoomContentClient):
                         "audio/mp4"
                     )
                 }
-                response = await self.client.get("/publication/audio/transcribe", data=data, files=files)
+                response = await self.client.upload("GET", "/publication/audio/transcribe", data=data, files=files)
 
                 json_response = response.json()
 
@@ -964,3 +1111,34 @@ class LoomContentClient(interface.ILoomContentClient):
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
+
+    async def _get_page(
+            self,
+            url: str,
+            model_cls: type,
+            filters: dict,
+            cursor: int | None,
+            limit: int,
+    ) -> model.ContentPage:
+        # Keyset-пагинация по убыванию id: сервис отдает элементы с id < cursor от новых к старым,
+        # limit=0 — только total_count
+        filters = {name: value for name, value in filters.items() if value is not None}
+        params = {name: str(value).lower() if isinstance(value, bool) else value for name, value in filters.items()}
+        params["limit"] = limit
+        if cursor is not None:
+            params["cursor"] = cursor
+
+        response = await self.client.get(url, params=params)
+        json_response = response.json()
+
+        if isinstance(json_response, list):
+            # Сервис еще не умеет фильтровать и вернул всю историю — режем страницу на своей стороне
+            # и отдаем историю вызывающему, чтобы остальные страницы и счетчики не скачивали ее заново
+            return model.ContentPage.paginate(codec.build_models(model_cls, json_response), cursor, limit, **filters)
+
+        return model.ContentPage(
+            items=codec.build_models(model_cls, json_response["items"]),
+            next_cursor=json_response.get("next_cursor"),
+            total_count=json_response["total_count"],
+            oldest_created_at=json_response.get("oldest_created_at"),
+        )
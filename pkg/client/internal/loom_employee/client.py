@@ -2,7 +2,25 @@ from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import model
 from internal import interface
+from pkg.client import codec
 from pkg.client.client import AsyncHTTPClient
+from pkg.client.response_cache import ResponseCacheRule
+from pkg.client.entity_cache import EntityCache, cached, invalidates
+
+# Права и роли меняются только через этот же сервис, поэтому любая мутация сбрасывает кеш целиком
+response_cache_rules = [
+    ResponseCacheRule("/account/{id}", ttl=30, invalidated_by=("/",)),
+    ResponseCacheRule("/organization/{id}/employees", ttl=30, invalidated_by=("/",)),
+]
+
+# TTL декодированных сущностей; права и роли меняются через этот же клиент и сбрасываются его мутациями
+entity_cache_ttls = {
+    "employee": 60,
+    "employees": 60,
+}
+
+# Безопасные GET с тяжелым хвостом латентности, для которых разрешен дубль запроса
+hedged_routes = ["/account/{id}"]
 
 
 class LoomEmployeeClient(interface.ILoomEmployeeClient):
@@ -10,7 +28,18 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
             self,
             tel: interface.ITelemetry,
             host: str,
-            port: int
+            port: int,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            pool_autotune: bool = False,
+            concurrency_limit: int = 0,
+            concurrency_queue_size: int = 100,
+            concurrency_queue_timeout: float = 1.0,
+            retry_count: int = 3,
+            retry_budget_ratio: float = 0.1,
+            response_cache_max_bytes: int = 0,
+            entity_cache_max_size: int = 0,
+            hedge_max_ratio: float = 0,
     ):
         logger = tel.logger()
         self.client = AsyncHTTPClient(
@@ -18,9 +47,27 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
             port,
             prefix="/api/employee",
             use_tracing=True,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            pool_autotune=pool_autotune,
+            concurrency_limit=concurrency_limit,
+            concurrency_queue_size=concurrency_queue_size,
+            concurrency_queue_timeout=concurrency_queue_timeout,
+            retry_count=retry_count,
+            retry_budget_ratio=retry_budget_ratio,
+            response_cache_rules=response_cache_rules,
+            response_cache_max_bytes=response_cache_max_bytes,
+            hedged_routes=hedged_routes,
+            hedge_max_ratio=hedge_max_ratio,
+            logger=logger,
+            meter=tel.meter(),
         )
         self.tracer = tel.tracer()
+        self.entity_cache = None
+        if entity_cache_max_size > 0:
+            self.entity_cache = EntityCache(entity_cache_ttls, entity_cache_max_size, tel.meter())
 
+    @invalidates(("employee", "account_id"), ("employees", "organization_id"))
     async def create_employee(
             self,
             organization_id: int,
@@ -48,7 +95,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                     "name": name,
                     "role": role.value if hasattr(role, 'value') else str(role)
                 }
-                response = await self.client.post("/create", json=body)
+                response = await self.client.post("/create", idempotent=False, json=body)
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
@@ -58,6 +105,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @cached("employee")
     async def get_employee_by_account_id(self, account_id: int) -> model.Employee | None:
         with self.tracer.start_as_current_span(
                 "EmployeeClient.get_employee_by_account_id",
@@ -72,7 +120,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
 
                 span.set_status(Status(StatusCode.OK))
                 if json_response:
-                    return model.Employee(**json_response[0])
+                    return codec.build_model(model.Employee, json_response[0])
                 else:
                     return None
             except Exception as e:
@@ -80,6 +128,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @cached("employees")
     async def get_employees_by_organization(self, organization_id: int) -> list[model.Employee]:
         with self.tracer.start_as_current_span(
                 "EmployeeClient.get_employees_by_organization",
@@ -93,12 +142,13 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return [model.Employee(**emp) for emp in json_response["employees"]]
+                return codec.build_models(model.Employee, json_response["employees"])
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("employee", "account_id"), "employees")
     async def update_employee_permissions(
             self,
             account_id: int,
@@ -131,7 +181,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 if sign_up_social_net_permission is not None:
                     body["sign_up_social_net_permission"] = sign_up_social_net_permission
 
-                await self.client.put(f"/permissions", json=body)
+                await self.client.put(f"/permissions", idempotent=True, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -139,6 +189,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("employee", "account_id"), "employees")
     async def update_employee_role(
             self,
             account_id: int,
@@ -156,7 +207,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 body = {
                     "role": role.value if hasattr(role, 'value') else str(role)
                 }
-                await self.client.put(f"/{account_id}/role", json=body)
+                await self.client.put(f"/{account_id}/role", idempotent=True, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -164,6 +215,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("employee", "account_id"), "employees")
     async def delete_employee(self, account_id: int) -> None:
         with self.tracer.start_as_current_span(
                 "EmployeeClient.delete_employee",
@@ -173,7 +225,7 @@ class LoomEmployeeClient(interface.ILoomEmployeeClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/{account_id}")
+                await self.client.delete(f"/{account_id}", idempotent=True)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
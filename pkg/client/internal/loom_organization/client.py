@@ -2,7 +2,20 @@ from opentelemetry.trace import Status, StatusCode, SpanKind
 
 from internal import model
 from internal import interface
+from pkg.client import codec
 from pkg.client.client import AsyncHTTPClient
+from pkg.client.response_cache import ResponseCacheRule
+from pkg.client.entity_cache import EntityCache, cached, invalidates
+
+# Баланс списывается и другими сервисами, поэтому TTL короткий, дальше — условный GET
+response_cache_rules = [
+    ResponseCacheRule("/{id}", ttl=15, invalidated_by=("/",)),
+]
+
+# Баланс меняют и другие сервисы, поэтому организация живет в кеше недолго
+entity_cache_ttls = {
+    "organization": 15,
+}
 
 
 class LoomOrganizationClient(interface.ILoomOrganizationClient):
@@ -10,7 +23,17 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
             self,
             tel: interface.ITelemetry,
             host: str,
-            port: int
+            port: int,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            pool_autotune: bool = False,
+            concurrency_limit: int = 0,
+            concurrency_queue_size: int = 100,
+            concurrency_queue_timeout: float = 1.0,
+            retry_count: int = 3,
+            retry_budget_ratio: float = 0.1,
+            response_cache_max_bytes: int = 0,
+            entity_cache_max_size: int = 0,
     ):
         logger = tel.logger()
         self.client = AsyncHTTPClient(
@@ -18,9 +41,25 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
             port,
             prefix="/api/organization",
             use_tracing=True,
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            pool_autotune=pool_autotune,
+            concurrency_limit=concurrency_limit,
+            concurrency_queue_size=concurrency_queue_size,
+            concurrency_queue_timeout=concurrency_queue_timeout,
+            retry_count=retry_count,
+            retry_budget_ratio=retry_budget_ratio,
+            response_cache_rules=response_cache_rules,
+            response_cache_max_bytes=response_cache_max_bytes,
+            logger=logger,
+            meter=tel.meter(),
         )
         self.tracer = tel.tracer()
+        self.entity_cache = None
+        if entity_cache_max_size > 0:
+            self.entity_cache = EntityCache(entity_cache_ttls, entity_cache_max_size, tel.meter())
 
+    @cached("organization")
     async def get_organization_by_id(self, organization_id: int) -> model.Organization:
         with self.tracer.start_as_current_span(
                 "OrganizationClient.get_organization_by_id",
@@ -34,7 +73,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return model.Organization(**json_response)
+                return codec.build_model(model.Organization, json_response)
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -50,12 +89,13 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                 json_response = response.json()
 
                 span.set_status(Status(StatusCode.OK))
-                return [model.Organization(**org) for org in json_response["organizations"]]
+                return codec.build_models(model.Organization, json_response["organizations"])
             except Exception as e:
                 span.record_exception(e)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("organization", "organization_id"))
     async def update_organization(
             self,
             organization_id: int,
@@ -82,7 +122,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                 if publication_text_end_sample is not None:
                     body["publication_text_end_sample"] = publication_text_end_sample
 
-                await self.client.put(f"/{organization_id}", json=body)
+                await self.client.put(f"/{organization_id}", idempotent=True, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -90,6 +130,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("organization", "organization_id"))
     async def delete_organization(self, organization_id: int) -> None:
         with self.tracer.start_as_current_span(
                 "OrganizationClient.delete_organization",
@@ -99,7 +140,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                 }
         ) as span:
             try:
-                await self.client.delete(f"/{organization_id}")
+                await self.client.delete(f"/{organization_id}", idempotent=True)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -107,6 +148,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("organization", "organization_id"))
     async def top_up_balance(self, organization_id: int, amount_rub: int) -> None:
         with self.tracer.start_as_current_span(
                 "OrganizationClient.top_up_balance",
@@ -121,7 +163,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                     "organization_id": organization_id,
                     "amount_rub": amount_rub
                 }
-                await self.client.post("/balance/top-up", json=body)
+                await self.client.post("/balance/top-up", idempotent=False, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
@@ -129,6 +171,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                 span.set_status(Status(StatusCode.ERROR, str(e)))
                 raise
 
+    @invalidates(("organization", "organization_id"))
     async def debit_balance(self, organization_id: int, amount_rub: int) -> None:
         with self.tracer.start_as_current_span(
                 "OrganizationClient.debit_balance",
@@ -143,7 +186,7 @@ class LoomOrganizationClient(interface.ILoomOrganizationClient):
                     "organization_id": organization_id,
                     "amount_rub": amount_rub
                 }
-                await self.client.post("/balance/debit", json=body)
+                await self.client.post("/balance/debit", idempotent=False, json=body)
 
                 span.set_status(Status(StatusCode.OK))
             except Exception as e:
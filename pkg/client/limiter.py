@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import deque
+
+
+class ConcurrencyLimitExceededError(Exception):
+    pass
+
+
+class AIMDLimiter:
+    """
+    Адаптивный лимит одновременных запросов к одному upstream.
+    Быстрые успешные ответы при загруженном лимите увеличивают его на 1 за каждые limit ответов (additive increase),
+    ошибка или ответ медленнее tolerance x обычной латентности маршрута — умножает на backoff_ratio
+    (multiplicative decrease), не чаще раза в decrease_interval.
+    Сверх лимита ждут не больше max_queue_size вызовов и не дольше queue_timeout, остальные сразу отклоняются.
+    """
+
+    def __init__(
+            self,
+            initial_limit: int = 20,
+            min_limit: int = 2,
+            max_limit: int = 100,
+            backoff_ratio: float = 0.9,
+            tolerance: float = 2.0,
+            max_queue_size: int = 100,
+            queue_timeout: float = 1.0,
+            decrease_interval: float = 1.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.backoff_ratio = backoff_ratio
+        self.tolerance = tolerance
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self.decrease_interval = decrease_interval
+
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease_at = 0.0
+        # Шаблон маршрута -> сглаженная латентность: у генерации и справочников разный масштаб
+        self._baselines: dict[str, float] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        if len(self._waiters) >= self.max_queue_size:
+            raise ConcurrencyLimitExceededError(
+                f"Concurrency limit {int(self.limit)} reached, queue is full ({self.max_queue_size})"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as err:
+            if waiter.done() and not waiter.cancelled():
+                # Слот выдан одновременно с таймаутом или отменой — возвращаем его
+                self._release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+            if isinstance(err, asyncio.TimeoutError):
+                raise ConcurrencyLimitExceededError(
+                    f"Concurrency limit {int(self.limit)} reached, waited {self.queue_timeout}s"
+                ) from None
+            raise
+
+    def release(self, route: str, duration: float, failed: bool) -> None:
+        utilized = self.in_flight >= int(self.limit) / 2
+        self._release_slot()
+
+        baseline = self._baselines.get(route)
+        slow = baseline is not None and duration > baseline * self.tolerance
+        if not failed:
+            # Медленные ответы в базовую линию не попадают, иначе она поползет вверх вслед за деградацией
+            if baseline is None:
+                self._baselines[route] = duration
+            elif not slow:
+                self._baselines[route] = baseline * 0.9 + duration * 0.1
+
+        if failed or slow:
+            now = time.monotonic()
+            if now - self._last_decrease_at >= self.decrease_interval:
+                self._last_decrease_at = now
+                self.limit = max(self.limit * self.backoff_ratio, self.min_limit)
+        elif utilized:
+            self.limit = min(self.limit + 1 / max(int(self.limit), 1), self.max_limit)
+            self._wake()
+
+    def cancel(self) -> None:
+        # Вызов прерван до ответа: освобождаем слот без оценки upstream
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
@@ -0,0 +1,53 @@
+import uuid
+from typing import AsyncIterable, AsyncIterator
+
+
+def encode_field(value) -> bytes:
+    # Как в httpx: bool передаем в нижнем регистре, None — пустой строкой
+    if isinstance(value, bool):
+        return b"true" if value else b"false"
+    if value is None:
+        return b""
+    return str(value).encode()
+
+
+class StreamingMultipart:
+    """
+    Тело multipart/form-data, которое отдается в httpx чанками по мере чтения источников.
+    Файл может быть bytes или асинхронным итератором — во втором случае он не собирается в памяти целиком.
+    Итератор читается один раз, поэтому такое тело нельзя отправить повторно.
+    """
+
+    def __init__(
+            self,
+            data: dict[str, str] = None,
+            files: dict[str, tuple[str, bytes | AsyncIterable[bytes], str]] = None,
+    ):
+        self.data = data or {}
+        self.files = files or {}
+        self.boundary = uuid.uuid4().hex
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for name, value in self.data.items():
+            yield self._part_header(f'name="{name}"') + encode_field(value) + b"\r\n"
+
+        for name, (filename, content, content_type) in self.files.items():
+            yield self._part_header(f'name="{name}"; filename="{filename}"', content_type)
+            if isinstance(content, (bytes, bytearray)):
+                yield bytes(content)
+            else:
+                async for chunk in content:
+                    yield chunk
+            yield b"\r\n"
+
+        yield f"--{self.boundary}--\r\n".encode()
+
+    def _part_header(self, disposition: str, content_type: str = None) -> bytes:
+        header = f"--{self.boundary}\r\nContent-Disposition: form-data; {disposition}\r\n"
+        if content_type is not None:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode()
@@ -0,0 +1,130 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Hashable
+
+import httpx
+
+from pkg.client.route import route_template
+
+# Примерная стоимость служебных полей записи сверх тела и заголовков
+ENTRY_OVERHEAD_BYTES = 256
+
+
+@dataclass(frozen=True)
+class ResponseCacheRule:
+    # Шаблон пути GET-запроса, числовые сегменты записываются как {id}
+    route: str
+    ttl: float
+    # Префиксы путей мутаций, после которых сбрасываются все записи правила
+    invalidated_by: tuple[str, ...] = ()
+
+
+@dataclass
+class CachedResponse:
+    rule: ResponseCacheRule
+    path: str
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes
+    etag: Optional[str]
+    expires_at: float
+    size: int
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+    def to_response(self, url: str) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=httpx.Request("GET", url),
+        )
+
+
+class ResponseCache:
+    """
+    LRU-кеш GET-ответов, ограниченный суммарным размером в байтах.
+    Протухшие записи с ETag не удаляются сразу — по ним делается условный GET.
+    Не потокобезопасен — рассчитан на один event loop.
+    """
+
+    def __init__(self, rules: list[ResponseCacheRule], max_bytes: int):
+        self.rules = {rule.route: rule for rule in rules}
+        self.max_bytes = max_bytes
+        self.size = 0
+        # Увеличивается при каждой инвалидации, чтобы не сохранить ответ, полученный до мутации
+        self.generation = 0
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+
+    def rule_for(self, path: str) -> Optional[ResponseCacheRule]:
+        return self.rules.get(route_template(path))
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if not entry.is_fresh and entry.etag is None:
+            self.delete(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(
+            self,
+            key: Hashable,
+            rule: ResponseCacheRule,
+            path: str,
+            response: httpx.Response,
+    ) -> None:
+        headers = list(response.headers.multi_items())
+        content = response.content
+        size = len(content) + sum(len(name) + len(value) for name, value in headers) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        self.delete(key)
+        self._entries[key] = CachedResponse(
+            rule=rule,
+            path=path,
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            etag=response.headers.get("etag"),
+            expires_at=time.monotonic() + rule.ttl,
+            size=size,
+        )
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def refresh(self, entry: CachedResponse) -> None:
+        entry.expires_at = time.monotonic() + entry.rule.ttl
+
+    def delete(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def invalidate(self, path: str) -> None:
+        """Сбрасывает записи, затронутые мутацией по path: тот же ресурс, его потомки и правила с invalidated_by."""
+        self.generation += 1
+        path = path.split("?", 1)[0]
+
+        stale_keys = [
+            key for key, entry in self._entries.items()
+            if entry.path.startswith(path)
+               or path.startswith(entry.path)
+               or any(path.startswith(prefix) for prefix in entry.rule.invalidated_by)
+        ]
+        for key in stale_keys:
+            self.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
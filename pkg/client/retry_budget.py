@@ -0,0 +1,22 @@
+class RetryBudget:
+    """
+    Токен-бакет ретраев: каждый успешный запрос добавляет ratio токена, ретрай тратит целый.
+    Стартовый запас min_tokens позволяет ретраить, пока успешного трафика еще не было.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 100, min_tokens: float = 10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min(min_tokens, max_tokens)
+
+    def on_success(self) -> None:
+        self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def try_acquire(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def refund(self) -> None:
+        self._tokens = min(self._tokens + 1, self.max_tokens)
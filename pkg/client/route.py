@@ -0,0 +1,15 @@
+import re
+
+ID_SEGMENT_PATTERN = re.compile(r"^\d+$")
+
+
+def route_template(path: str) -> str:
+    """
+    Шаблон маршрута для группировки запросов: числовые сегменты заменяются на {id},
+    query-string отбрасывается. '/publication/category/15?x=1' -> '/publication/category/{id}'
+    """
+    path = path.split("?", 1)[0]
+    return "/".join(
+        "{id}" if ID_SEGMENT_PATTERN.match(segment) else segment
+        for segment in path.split("/")
+    )
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+import httpx
+
+from pkg.client.deadline import DeadlineExceededError
+
+
+class LeaderCancelled(Exception):
+    """
+    Вызов-лидер отменен или уперся в дедлайн своего апдейта: ожидающие выполняют запрос сами
+    под своим дедлайном, а не получают чужую отмену или чужой бюджет.
+    """
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные вызовы с одинаковым ключом: upstream вызывается один раз,
+    остальные получают тот же результат или ту же ошибку upstream. Завершенные вызовы не кешируются.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Возвращает результат и признак того, что он получен чужим вызовом."""
+        future = self._calls.get(key)
+        if future is not None:
+            try:
+                # shield: отмена ожидающего не должна отменять общий вызов
+                return await asyncio.shield(future), True
+            except LeaderCancelled:
+                # Повторяем под своим дедлайном; оставшиеся ожидающие объединятся с первым из нас
+                return await self.do(key, func)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except (asyncio.CancelledError, DeadlineExceededError):
+            # Таймаут лидера ограничен его собственным дедлайном — у ожидающих из других апдейтов бюджет свой
+            future.set_exception(LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            # Помечаем исключение полученным, иначе при отсутствии ожидающих asyncio залогирует его
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+def share_decoded_json(response: httpx.Response) -> httpx.Response:
+    """
+    Декодирует JSON общего ответа один раз на всех получателей.
+    Результат общий, поэтому вызывающие не должны его изменять — Loom-клиенты только читают его в модели.
+    """
+    decode = response.json
+    decoded = []
+
+    def json(**kwargs) -> Any:
+        if kwargs:
+            return decode(**kwargs)
+        if not decoded:
+            decoded.append(decode())
+        return decoded[0]
+
+    response.json = json
+    return response
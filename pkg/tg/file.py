@@ -0,0 +1,21 @@
+from typing import AsyncIterator
+
+from aiogram import Bot
+
+
+async def stream_telegram_file(bot: Bot, file_id: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Отдает файл из Telegram чанками прямо из ответа Bot API, не собирая его в BytesIO."""
+    file = await bot.get_file(file_id)
+
+    if bot.session.api.is_local:
+        # Локальный Bot API отдает путь на диске, а не URL — читаем штатным способом
+        file_data = await bot.download_file(file.file_path, chunk_size=chunk_size)
+        yield file_data.read()
+        return
+
+    async for chunk in bot.session.stream_content(
+            url=bot.session.api.file_url(bot.token, file.file_path),
+            chunk_size=chunk_size,
+            raise_for_status=True,
+    ):
+        yield chunk
@@ -0,0 +1,108 @@
+"""
+Бенчмарк декодирования ответов Loom: stdlib json и dataclass со словарем против codec и моделей на слотах.
+
+Собирает JSON списка публикаций (по умолчанию 10k, как полная выгрузка организации) и декодирует его
+двумя путями:
+    до     — json.loads и dataclass без slots (так клиенты строили модели до pkg/client/codec.py);
+    после  — codec.loads (orjson / ujson / json) и codec.build_models в model.Publication на слотах.
+Время — медиана process_time по --runs прогонам, память — пик tracemalloc одного прогона
+вместе с живым списком моделей.
+
+Запуск из корня репозитория:
+    python -m scripts.bench_codec --items 10000 --runs 50
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+from internal import model
+from pkg.client import codec
+
+MIB = 1024 * 1024
+
+# Та же публикация без slots: у каждого экземпляра свой __dict__
+DictPublication = make_dataclass("DictPublication", [(field.name, field.type) for field in fields(model.Publication)])
+
+
+def publications_json(items: int) -> bytes:
+    return json.dumps([
+        {
+            "id": publication_id,
+            "organization_id": 1,
+            "category_id": publication_id % 20 + 1,
+            "creator_id": publication_id % 50 + 1,
+            "moderator_id": publication_id % 7 + 1 if publication_id % 3 else None,
+            "vk_source": bool(publication_id % 2),
+            "tg_source": True,
+            "text_reference": f"Тема публикации {publication_id}",
+            "text": f"Текст публикации {publication_id}. " * 20,
+            "image_fid": f"fid-{publication_id}" if publication_id % 4 else None,
+            "image_name": f"image-{publication_id}.png" if publication_id % 4 else None,
+            "openai_rub_cost": publication_id % 30,
+            "moderation_status": ("moderation", "approved", "rejected", "draft")[publication_id % 4],
+            "moderation_comment": None,
+            "publication_at": None,
+            "created_at": "2026-01-15T10:00:00",
+        }
+        for publication_id in range(1, items + 1)
+    ], ensure_ascii=False).encode()
+
+
+def decode_before(body: bytes) -> list:
+    return [DictPublication(**item) for item in json.loads(body)]
+
+
+def decode_after(body: bytes) -> list:
+    return codec.build_models(model.Publication, codec.loads(body))
+
+
+def measure(decode, body: bytes, runs: int) -> tuple[float, float, float, float]:
+    durations = []
+    for _ in range(runs):
+        # Мусор предыдущего прогона не должен достаться следующему
+        gc.collect()
+        started_at = time.process_time()
+        decode(body)
+        durations.append((time.process_time() - started_at) * 1000)
+
+    tracemalloc.start()
+    try:
+        publications = decode(body)
+        _, peak = tracemalloc.get_traced_memory()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del publications
+
+    quantiles = statistics.quantiles(durations, n=20)
+    return statistics.median(durations), quantiles[-1], peak / MIB, retained / MIB
+
+
+def run(items: int, runs: int) -> None:
+    body = publications_json(items)
+    assert [p.to_dict() for p in decode_after(body)] == [
+        {field.name: getattr(p, field.name) for field in fields(DictPublication)} for p in decode_before(body)
+    ]
+
+    print(f"{items} публикаций, тело {len(body) / MIB:.1f} МиБ, декодер codec: {codec.CODEC_NAME}, {runs} прогонов\n")
+    print(f"{'путь':<8} {'медиана, мс':>12} {'p95, мс':>9} {'пик, МиБ':>10} {'модели, МиБ':>12}")
+    for name, decode in (("до", decode_before), ("после", decode_after)):
+        median, p95, peak, retained = measure(decode, body, runs)
+        print(f"{name:<8} {median:>12.1f} {p95:>9.1f} {peak:>10.1f} {retained:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время и память декодирования выгрузки публикаций")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    run(args.items, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Бенчмарк геттеров на GetterGraph против последовательных вызовов upstream.
+
+Поднимает в памяти медленную подмену loom-employee, loom-organization и loom-content
+(каждый запрос отвечает через --latency мс) и рендерит настоящие геттеры с настоящими
+Loom-клиентами поверх нее. Режим «последовательно» пропускает запросы к подмене по одному —
+так работали геттеры до графа, когда каждый вызов ждал предыдущий. Режим «граф» снимает
+ограничение, и время рендера равно самой длинной цепочке зависимостей.
+
+Запуск из корня репозитория:
+    python -m scripts.bench_getter_graph --latency 50 --renders 20
+"""
+import argparse
+import asyncio
+import contextlib
+import re
+import statistics
+import time
+from dataclasses import fields
+from types import SimpleNamespace
+from typing import get_origin
+
+import httpx
+from opentelemetry import metrics, trace
+
+from internal import interface, model
+from internal.dialog.change_employee.getter import ChangeEmployeeGetter
+from internal.dialog.graph import DialogNodes
+from internal.dialog.moderation_publication.getter import ModerationPublicationGetter
+from internal.dialog.personal_profile.getter import PersonalProfileGetter
+from pkg.client.internal.loom_content.client import LoomContentClient
+from pkg.client.internal.loom_employee.client import LoomEmployeeClient
+from pkg.client.internal.loom_organization.client import LoomOrganizationClient
+
+ORGANIZATION_ID = 1
+ACCOUNT_ID = 10
+MODERATOR_ID = 11
+CATEGORY_ID = 5
+
+
+class _Logger(interface.IOtelLogger):
+    def debug(self, message: str, fields: dict = None) -> None: pass
+
+    def info(self, message: str, fields: dict = None) -> None: pass
+
+    def warning(self, message: str, fields: dict = None) -> None: pass
+
+    def error(self, message: str, fields: dict = None) -> None: pass
+
+
+class _Telemetry(interface.ITelemetry):
+    """Без зарегистрированных провайдеров OpenTelemetry API отдает no-op трейсер и метр."""
+
+    def tracer(self) -> trace.Tracer:
+        return trace.get_tracer("bench_getter_graph")
+
+    def meter(self) -> metrics.Meter:
+        return metrics.get_meter("bench_getter_graph")
+
+    def logger(self) -> interface.IOtelLogger:
+        return _Logger()
+
+
+def _payload(cls: type, **values) -> dict:
+    # Полный JSON модели: codec не достраивает недостающие поля
+    empty = {int: 0, str: "", bool: False, list: [], dict: {}}
+    payload = {field.name: empty.get(get_origin(field.type) or field.type) for field in fields(cls)}
+    payload.update(values)
+    return payload
+
+
+class StandInLoom:
+    """Медленная подмена Loom только для GET, которые делают геттеры; serial пропускает запросы по одному."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.serial = False
+        self.lock = asyncio.Lock()
+        self.requests = 0
+
+        self.employees = {
+            account_id: _payload(
+                model.Employee,
+                id=account_id,
+                organization_id=ORGANIZATION_ID,
+                account_id=account_id,
+                name=f"Сотрудник {account_id}",
+                role="moderator",
+                created_at="2026-01-15T10:00:00",
+            )
+            for account_id in (ACCOUNT_ID, MODERATOR_ID)
+        }
+        self.organization = _payload(model.Organization, id=ORGANIZATION_ID, name="Лум", rub_balance="1000")
+        self.category = _payload(model.Category, id=CATEGORY_ID, organization_id=ORGANIZATION_ID, name="Новости")
+        self.publications = [
+            _payload(
+                model.Publication,
+                id=publication_id,
+                organization_id=ORGANIZATION_ID,
+                creator_id=ACCOUNT_ID,
+                moderator_id=MODERATOR_ID,
+                category_id=CATEGORY_ID,
+                moderation_status=("moderation", "approved", "rejected", "draft")[publication_id % 4],
+                created_at="2026-01-15T10:00:00",
+            )
+            for publication_id in range(1, 41)
+        ]
+
+    async def delay(self) -> None:
+        self.requests += 1
+        lock = self.lock if self.serial else contextlib.nullcontext()
+        async with lock:
+            await asyncio.sleep(self.latency)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        await self.delay()
+        path = request.url.path
+        if match := re.fullmatch(r"/api/employee/account/(\d+)", path):
+            return httpx.Response(200, json=[self.employees[int(match[1])]])
+        if re.fullmatch(r"/api/employee/organization/\d+/employees", path):
+            return httpx.Response(200, json={"employees": list(self.employees.values())})
+        if re.fullmatch(r"/api/organization/\d+", path):
+            return httpx.Response(200, json=self.organization)
+        if re.fullmatch(r"/api/content/social-network/organization/\d+", path):
+            return httpx.Response(200, json={"data": {"telegram": [], "vkontakte": []}})
+        if re.fullmatch(r"/api/content/publication/organization/\d+/publications", path):
+            # Сервис без фильтров: вся история, страницу и счетчики клиент считает сам
+            return httpx.Response(200, json=self.publications)
+        if re.fullmatch(r"/api/content/publication/category/\d+", path):
+            return httpx.Response(200, json=self.category)
+        return httpx.Response(404)
+
+
+class _StateRepo:
+    def __init__(self, service: StandInLoom):
+        self.service = service
+
+    async def state_by_account_id(self, account_id: int) -> list[model.UserState]:
+        await self.service.delay()
+        return [_state(account_id)]
+
+
+def _state(account_id: int = ACCOUNT_ID) -> model.UserState:
+    return model.UserState(
+        id=1,
+        tg_chat_id=500,
+        account_id=account_id,
+        organization_id=ORGANIZATION_ID,
+        access_token="",
+        refresh_token="",
+        tg_username="anna",
+        can_show_alerts=True,
+        show_error_recovery=False,
+        created_at=None,
+    )
+
+
+def _dialog_manager() -> SimpleNamespace:
+    # Каждый рендер — отдельный апдейт: состояние уже в middleware_data, общие узлы не закешированы
+    state = _state()
+    return SimpleNamespace(
+        event=SimpleNamespace(message=SimpleNamespace(chat=SimpleNamespace(id=state.tg_chat_id))),
+        middleware_data={"user_state": state},
+        dialog_data={"selected_account_id": MODERATOR_ID},
+    )
+
+
+async def measure(service: StandInLoom, render, renders: int, serial: bool) -> tuple[float, int]:
+    service.serial = serial
+    await render(_dialog_manager())
+
+    durations = []
+    requests = service.requests
+    for _ in range(renders):
+        started_at = time.perf_counter()
+        await render(_dialog_manager())
+        durations.append((time.perf_counter() - started_at) * 1000)
+    return statistics.median(durations), (service.requests - requests) // renders
+
+
+async def run(latency: float, renders: int) -> None:
+    tel = _Telemetry()
+    service = StandInLoom(latency / 1000)
+
+    employee_client = LoomEmployeeClient(tel, "bench-loom-employee", 80, retry_count=0)
+    organization_client = LoomOrganizationClient(tel, "bench-loom-organization", 80, retry_count=0)
+    content_client = LoomContentClient(tel, "bench-loom-content", 80, retry_count=0)
+    clients = (employee_client, organization_client, content_client)
+    for client in clients:
+        client.client.session = httpx.AsyncClient(base_url=client.client.base_url, transport=httpx.MockTransport(service))
+
+    state_repo = _StateRepo(service)
+    nodes = DialogNodes(state_repo, employee_client, organization_client, content_client)
+    moderation = ModerationPublicationGetter(tel, state_repo, employee_client, content_client, nodes, "loom.local")
+    profile = PersonalProfileGetter(tel, state_repo, employee_client, organization_client, content_client, nodes)
+    change_employee = ChangeEmployeeGetter(tel, state_repo, employee_client, organization_client, content_client, nodes)
+
+    getters = [
+        ("moderation_publication.get_moderation_list_data", moderation.get_moderation_list_data),
+        ("personal_profile.get_personal_profile_data", profile.get_personal_profile_data),
+        ("change_employee.get_employee_list_data", change_employee.get_employee_list_data),
+        ("change_employee.get_employee_detail_data", change_employee.get_employee_detail_data),
+    ]
+    try:
+        print(f"Подмена Loom отвечает через {latency:.0f} мс, медиана из {renders} рендеров, мс\n")
+        print(f"{'геттер':<50} {'запросов':>9} {'последовательно':>16} {'граф':>8} {'ускорение':>10}")
+        for name, render in getters:
+            sequential, requests = await measure(service, render, renders, serial=True)
+            concurrent, _ = await measure(service, render, renders, serial=False)
+            print(
+                f"{name:<50} {requests:>9} {sequential:>16.1f} {concurrent:>8.1f} "
+                f"{sequential / concurrent:>9.2f}x"
+            )
+    finally:
+        for client in clients:
+            await client.client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время рендера геттеров на GetterGraph против последовательных вызовов")
+    parser.add_argument("--latency", type=float, default=50, help="задержка ответа подмены Loom, мс")
+    parser.add_argument("--renders", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.latency, args.renders))
+
+
+if __name__ == "__main__":
+    main()
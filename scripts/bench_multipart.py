@@ -0,0 +1,114 @@
+"""
+Бенчмарк памяти загрузки файла из Telegram в Loom: чтение в память против потокового multipart.
+
+Источник имитирует stream_telegram_file — отдает --size МиБ чанками по --chunk КиБ.
+Путь «в память» повторяет загрузку до StreamingMultipart: файл собирается в bytes и уходит
+через files= httpx. Потоковый путь отправляет тот же источник через AsyncHTTPClient.upload.
+Подмена Loom — транспорт httpx, который дочитывает тело запроса чанками и ничего не хранит
+(httpx.MockTransport сначала читает тело целиком), поэтому пик tracemalloc — это память самого клиента.
+
+Запуск из корня репозитория:
+    python -m scripts.bench_multipart --size 20 --chunk 64
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import AsyncIterator
+
+import httpx
+
+from internal import interface
+from pkg.client.client import AsyncHTTPClient
+
+MIB = 1024 * 1024
+
+
+class _Logger(interface.IOtelLogger):
+    def debug(self, message: str, fields: dict = None) -> None: pass
+
+    def info(self, message: str, fields: dict = None) -> None: pass
+
+    def warning(self, message: str, fields: dict = None) -> None: pass
+
+    def error(self, message: str, fields: dict = None) -> None: pass
+
+
+async def telegram_file(size: int, chunk_size: int) -> AsyncIterator[bytes]:
+    # Каждый чанк — новый объект, как из ответа Bot API
+    for offset in range(0, size, chunk_size):
+        yield bytes(min(chunk_size, size - offset))
+
+
+class StandInLoom(httpx.AsyncBaseTransport):
+    def __init__(self):
+        self.received = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.received = 0
+        async for chunk in request.stream:
+            self.received += len(chunk)
+        return httpx.Response(200, json={"text": ""})
+
+
+async def upload_in_memory(client: AsyncHTTPClient, size: int, chunk_size: int) -> None:
+    audio_content = b"".join([chunk async for chunk in telegram_file(size, chunk_size)])
+    response = await client.session.request(
+        "GET", "/publication/audio/transcribe",
+        data={"organization_id": "1"},
+        files={"audio_file": ("voice.mp4", audio_content, "audio/mp4")},
+    )
+    response.raise_for_status()
+
+
+async def upload_streaming(client: AsyncHTTPClient, size: int, chunk_size: int) -> None:
+    await client.upload(
+        "GET", "/publication/audio/transcribe",
+        data={"organization_id": 1},
+        files={"audio_file": ("voice.mp4", telegram_file(size, chunk_size), "audio/mp4")},
+    )
+
+
+async def measure(client: AsyncHTTPClient, upload, size: int, chunk_size: int) -> tuple[float, float]:
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    try:
+        await upload(client, size, chunk_size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / MIB, (time.perf_counter() - started_at) * 1000
+
+
+async def run(size_mib: int, chunk_kib: int) -> None:
+    size, chunk_size = size_mib * MIB, chunk_kib * 1024
+    service = StandInLoom()
+    client = AsyncHTTPClient(
+        "bench-loom-content", 80, prefix="/api/content", retry_count=0, circuit_breaker_enabled=False, logger=_Logger(),
+    )
+    client.session = httpx.AsyncClient(base_url=client.base_url, transport=service)
+
+    try:
+        # Прогрев: импорт и первые аллокации httpx не должны попасть в замер
+        await upload_streaming(client, chunk_size, chunk_size)
+
+        print(f"Файл {size_mib} МиБ чанками по {chunk_kib} КиБ\n")
+        print(f"{'путь':<12} {'пик памяти, МиБ':>16} {'время, мс':>10} {'получено, МиБ':>14}")
+        for name, upload in (("в память", upload_in_memory), ("потоково", upload_streaming)):
+            peak, duration = await measure(client, upload, size, chunk_size)
+            print(f"{name:<12} {peak:>16.2f} {duration:>10.1f} {service.received / MIB:>14.2f}")
+    finally:
+        await client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пик памяти загрузки файла: чтение в память против StreamingMultipart")
+    parser.add_argument("--size", type=int, default=20, help="размер файла, МиБ")
+    parser.add_argument("--chunk", type=int, default=64, help="размер чанка, КиБ")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.size, args.chunk))
+
+
+if __name__ == "__main__":
+    main()
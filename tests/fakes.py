@@ -0,0 +1,36 @@
+from opentelemetry import metrics, trace
+
+from internal import interface
+
+
+class RecordingLogger(interface.IOtelLogger):
+    def __init__(self):
+        self.records: list[tuple[str, str, dict]] = []
+
+    def debug(self, message: str, fields: dict = None) -> None:
+        self.records.append(("debug", message, fields or {}))
+
+    def info(self, message: str, fields: dict = None) -> None:
+        self.records.append(("info", message, fields or {}))
+
+    def warning(self, message: str, fields: dict = None) -> None:
+        self.records.append(("warning", message, fields or {}))
+
+    def error(self, message: str, fields: dict = None) -> None:
+        self.records.append(("error", message, fields or {}))
+
+
+class NoopTelemetry(interface.ITelemetry):
+    """Телеметрия без экспорта: no-op провайдеры OpenTelemetry API и логгер в память."""
+
+    def __init__(self):
+        self._logger = RecordingLogger()
+
+    def tracer(self) -> trace.Tracer:
+        return trace.get_tracer("tests")
+
+    def meter(self) -> metrics.Meter:
+        return metrics.get_meter("tests")
+
+    def logger(self) -> RecordingLogger:
+        return self._logger
@@ -0,0 +1,115 @@
+import asyncio
+import decimal
+import importlib
+import json
+import sys
+from dataclasses import dataclass, fields
+
+import httpx
+import pytest
+
+from internal import model
+from pkg.client import codec
+from pkg.client.client import AsyncHTTPClient
+from tests.fakes import RecordingLogger
+
+
+@pytest.fixture
+def reload_codec(monkeypatch):
+    """Перезагружает codec без указанных декодеров; после теста возвращает исходный выбор."""
+
+    def reload(*unavailable: str):
+        for name in unavailable:
+            # None в sys.modules заставляет import бросить ImportError
+            monkeypatch.setitem(sys.modules, name, None)
+        return importlib.reload(codec)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(codec)
+
+
+def test_decoder_falls_back_from_orjson_to_ujson_to_stdlib(reload_codec):
+    assert reload_codec("orjson").CODEC_NAME == "ujson"
+    assert codec.loads(b'{"id": 1, "text": "\xd0\xbf\xd0\xbe\xd1\x81\xd1\x82"}') == {"id": 1, "text": "пост"}
+
+    assert reload_codec("orjson", "ujson").CODEC_NAME == "json"
+    assert codec.loads(b'{"id": 1}') == {"id": 1}
+
+
+def test_ujson_decode_error_is_reported_by_stdlib(reload_codec):
+    reload_codec("orjson")
+
+    with pytest.raises(json.JSONDecodeError) as err:
+        codec.loads(b'{"id": 1,')
+    assert err.value.pos == 9
+
+
+def test_payload_rejected_by_fast_decoder_is_decoded_by_stdlib(monkeypatch):
+    def int64_only(data):
+        raise OverflowError("int too big to convert")
+
+    monkeypatch.setattr(codec, "_loads", int64_only)
+
+    assert codec.loads(b'{"id": 18446744073709551616}') == {"id": 18446744073709551616}
+
+
+def test_installed_decoder_reads_raw_body_bytes(monkeypatch):
+    decoded: list = []
+    monkeypatch.setattr(codec, "_loads", lambda data: decoded.append(data) or json.loads(data))
+    response = codec.install_json_decoder(httpx.Response(200, json={"price": 1.5}))
+
+    assert response.json() == {"price": 1.5}
+    assert decoded == [response.content]
+
+    # Аргументы json.loads быстрый декодер не понимает — такие вызовы идут в httpx
+    assert response.json(parse_float=decimal.Decimal) == {"price": decimal.Decimal("1.5")}
+    assert len(decoded) == 1
+
+
+def test_client_responses_use_fast_decoder(monkeypatch):
+    decoded: list = []
+    monkeypatch.setattr(codec, "_loads", lambda data: decoded.append(data) or json.loads(data))
+
+    client = AsyncHTTPClient("codec-install", 80, circuit_breaker_enabled=False, logger=RecordingLogger())
+    client.session = httpx.AsyncClient(
+        base_url=client.base_url,
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[{"id": 1}])),
+    )
+
+    async def scenario():
+        try:
+            return (await client.get("/publication/1")).json()
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) == [{"id": 1}]
+    assert len(decoded) == 1
+
+
+def _publication(**values) -> dict:
+    return {**{field.name: None for field in fields(model.Publication)}, **values}
+
+
+def test_build_models_drops_keys_unknown_to_model():
+    publications = codec.build_models(
+        model.Publication,
+        [_publication(id=1), _publication(id=2, archived=True, views_count=10)],
+    )
+
+    assert [publication.id for publication in publications] == [1, 2]
+    assert not hasattr(publications[1], "archived")
+    # Модели на слотах: лишний атрибут некуда положить
+    assert not hasattr(publications[1], "__dict__")
+
+
+def test_build_model_still_requires_known_fields():
+    @dataclass(slots=True)
+    class Item:
+        id: int
+        name: str
+
+    assert codec.build_model(Item, {"id": 1, "name": "a", "extra": True}) == Item(1, "a")
+    with pytest.raises(TypeError):
+        codec.build_model(Item, {"id": 1, "extra": True})
+    assert codec.build_models(Item, []) == []
@@ -0,0 +1,206 @@
+import asyncio
+from functools import partial
+
+import httpx
+
+from internal.dialog.pagination import ContentListing, load_page_window
+from pkg.client.internal.loom_content.client import LoomContentClient
+from tests.fakes import NoopTelemetry
+
+FILTERS = ("moderation_status", "creator_id", "moderator_id")
+
+
+def _publication(publication_id: int, moderation_status: str, creator_id: int, moderator_id: int | None) -> dict:
+    return {
+        "id": publication_id,
+        "organization_id": 1,
+        "category_id": 1,
+        "creator_id": creator_id,
+        "moderator_id": moderator_id,
+        "vk_source": None,
+        "tg_source": None,
+        "text_reference": "",
+        "text": f"Публикация {publication_id}",
+        "image_fid": None,
+        "image_name": None,
+        "openai_rub_cost": 0,
+        "moderation_status": moderation_status,
+        "moderation_comment": None,
+        "publication_at": None,
+        "created_at": f"2026-10-0{publication_id}T10:00:00",
+    }
+
+
+# Сервис отдает историю от новых к старым
+HISTORY = [
+    _publication(9, "draft", creator_id=10, moderator_id=None),
+    _publication(8, "approved", creator_id=10, moderator_id=21),
+    _publication(7, "approved", creator_id=10, moderator_id=20),
+    _publication(5, "rejected", creator_id=11, moderator_id=20),
+    _publication(4, "draft", creator_id=11, moderator_id=None),
+    _publication(3, "approved", creator_id=11, moderator_id=20),
+    _publication(2, "draft", creator_id=10, moderator_id=None),
+]
+
+
+class StandInContentService:
+    """Подмена loom-content: отдает историю публикаций либо списком (текущий API), либо keyset-страницами."""
+
+    def __init__(self, keyset: bool):
+        self.keyset = keyset
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if not self.keyset:
+            return httpx.Response(200, json=HISTORY)
+
+        params = request.url.params
+        matched = sorted(
+            (
+                item for item in HISTORY
+                if all(str(item[name]) == params[name] for name in FILTERS if name in params)
+            ),
+            key=lambda item: item["id"],
+            reverse=True,
+        )
+        total_count = len(matched)
+        oldest_created_at = matched[-1]["created_at"] if matched else None
+        if "cursor" in params:
+            matched = [item for item in matched if item["id"] < int(params["cursor"])]
+
+        limit = int(params["limit"])
+        page = matched[:limit]
+        next_cursor = page[-1]["id"] if page and len(matched) > limit else None
+        return httpx.Response(200, json={
+            "items": page,
+            "next_cursor": next_cursor,
+            "total_count": total_count,
+            "oldest_created_at": oldest_created_at,
+        })
+
+
+def _client(host: str, service: StandInContentService) -> LoomContentClient:
+    client = LoomContentClient(NoopTelemetry(), host, 80)
+    client.client.session = httpx.AsyncClient(
+        base_url=client.client.base_url,
+        transport=httpx.MockTransport(service),
+    )
+    return client
+
+
+async def _profile_counts(listing: ContentListing) -> list[int]:
+    # Тот же набор счетчиков, что у профиля и карточки сотрудника, параллельно
+    return list(await asyncio.gather(
+        listing.count(creator_id=10),
+        listing.count(moderation_status="approved", creator_id=10),
+        listing.count(moderation_status="approved", moderator_id=20),
+        listing.count(moderation_status="rejected", moderator_id=20),
+    ))
+
+
+def _run(host: str, service: StandInContentService, scenario):
+    async def run():
+        client = _client(host, service)
+        try:
+            return await scenario(ContentListing(partial(client.get_publications_page, 1)))
+        finally:
+            await client.client.session.aclose()
+
+    return asyncio.run(run())
+
+
+def test_counts_from_plain_list_download_history_once():
+    service = StandInContentService(keyset=False)
+
+    counts = _run("content-list-counts", service, _profile_counts)
+
+    assert counts == [4, 2, 2, 1]
+    assert len(service.requests) == 1
+
+
+def test_counts_from_keyset_pages_are_count_only_requests():
+    service = StandInContentService(keyset=True)
+
+    counts = _run("content-keyset-counts", service, _profile_counts)
+
+    assert counts == [4, 2, 2, 1]
+    assert len(service.requests) == 4
+    assert all(request.url.params["limit"] == "0" for request in service.requests)
+
+
+def test_all_drafts_from_plain_list_is_one_request():
+    service = StandInContentService(keyset=False)
+
+    drafts = _run(
+        "content-list-drafts",
+        service,
+        lambda listing: listing.all(page_size=2, moderation_status="draft"),
+    )
+
+    assert [draft.id for draft in drafts] == [9, 4, 2]
+    assert len(service.requests) == 1
+
+
+def test_all_drafts_from_keyset_pages_follows_cursors():
+    service = StandInContentService(keyset=True)
+
+    drafts = _run(
+        "content-keyset-drafts",
+        service,
+        lambda listing: listing.all(page_size=2, moderation_status="draft"),
+    )
+
+    assert [draft.id for draft in drafts] == [9, 4, 2]
+    assert [request.url.params.get("cursor") for request in service.requests] == [None, "4"]
+    assert all(request.url.params["moderation_status"] == "draft" for request in service.requests)
+
+
+def test_page_window_is_the_same_for_both_response_shapes():
+    async def second_approved(listing: ContentListing):
+        dialog_data = {"current_index": 1}
+        window = await load_page_window(
+            dialog_data,
+            "moderation_page",
+            listing.pager(moderation_status="approved"),
+            page_size=2,
+        )
+        return window.current.id, window.total_count, dialog_data["moderation_page"]["cursors"]
+
+    legacy = _run("content-list-window", StandInContentService(keyset=False), second_approved)
+    keyset = _run("content-keyset-window", StandInContentService(keyset=True), second_approved)
+
+    assert legacy == keyset == (7, 3, [None, 7])
+
+
+def _carousel(listing: ContentListing, page_size: int, **filters):
+    # Листаем карусель вперед до конца, как кнопка «следующая», каждый шаг — новая отрисовка
+    async def walk() -> tuple[list[int], set]:
+        dialog_data = {"current_index": 0}
+        shown, periods = [], set()
+        while True:
+            window = await load_page_window(dialog_data, "moderation_page", listing.pager(**filters), page_size)
+            shown.append(window.current.id)
+            periods.add(window.oldest_created_at)
+            if window.index + 1 >= window.total_count:
+                return shown, periods
+            dialog_data["current_index"] = window.index + 1
+
+    return walk()
+
+
+def test_carousel_keeps_newest_first_order_of_pre_page_getters():
+    # До страниц геттер фильтровал выгрузку истории и показывал ее в порядке сервиса
+    before = [item["id"] for item in HISTORY if item["moderation_status"] == "approved"]
+    oldest = min(item["created_at"] for item in HISTORY if item["moderation_status"] == "approved")
+
+    for keyset in (False, True):
+        shown, periods = _run(
+            f"content-carousel-{keyset}",
+            StandInContentService(keyset=keyset),
+            lambda listing: _carousel(listing, page_size=2, moderation_status="approved"),
+        )
+
+        assert shown == before == [8, 7, 3]
+        # Период с первой же страницы считается от самого старого элемента выборки
+        assert periods == {oldest}
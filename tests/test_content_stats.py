@@ -0,0 +1,235 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from internal import model
+from internal.controller.http.webhook.handler import TelegramWebhookController
+from internal.controller.http.webhook.model import NotifyVizardVideoCutGenerated
+from internal.service.content_stats.service import ContentStatsService
+from tests.fakes import NoopTelemetry
+
+ORGANIZATION_ID = 1
+AUTHOR_ID = 10
+OTHER_AUTHOR_ID = 11
+
+
+def _content(moderation_status: str, creator_id: int) -> SimpleNamespace:
+    return SimpleNamespace(moderation_status=moderation_status, creator_id=creator_id)
+
+
+class _ContentService:
+    """Полные выгрузки контента организации; gate позволяет задержать выгрузку, чтобы мутация пришла во время нее."""
+
+    def __init__(self):
+        self.publications = [_content("draft", AUTHOR_ID), _content("moderation", OTHER_AUTHOR_ID)]
+        self.video_cuts = [_content("draft", AUTHOR_ID)]
+        self.loads = 0
+        self.gate: asyncio.Event | None = None
+        self.fail = False
+
+    async def get_publications_by_organization(self, organization_id: int) -> list:
+        self.loads += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("content service unavailable")
+        return list(self.publications)
+
+    async def get_video_cuts_by_organization(self, organization_id: int) -> list:
+        return list(self.video_cuts)
+
+
+def _service(content: _ContentService, reconcile_interval: float = 600) -> ContentStatsService:
+    return ContentStatsService(NoopTelemetry(), content, reconcile_interval=reconcile_interval)
+
+
+async def _settle(service: ContentStatsService) -> None:
+    # Дожидаемся фоновой сверки, запущенной чтением
+    while service._seeding:
+        await asyncio.gather(*service._seeding.values(), return_exceptions=True)
+
+
+def test_concurrent_first_reads_share_one_seed():
+    content = _ContentService()
+    service = _service(content)
+
+    async def scenario():
+        content.gate = asyncio.Event()
+        reads = [asyncio.create_task(service.get_stats(ORGANIZATION_ID)) for _ in range(5)]
+        await asyncio.sleep(0)
+        content.gate.set()
+        return await asyncio.gather(*reads)
+
+    results = asyncio.run(scenario())
+
+    assert content.loads == 1
+    assert all(stats is results[0] for stats in results)
+    stats = results[0]
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "draft") == 1
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "moderation") == 1
+    assert stats.count(model.VIDEO_CUT_CONTENT_TYPE, "draft") == 1
+    assert stats.count(moderation_status="draft", creator_id=AUTHOR_ID) == 2
+    assert stats.count(creator_id=OTHER_AUTHOR_ID) == 1
+
+
+def test_mutations_move_counters_without_reload():
+    content = _ContentService()
+    service = _service(content)
+
+    async def scenario():
+        await service.get_stats(ORGANIZATION_ID)
+        service.record_created(ORGANIZATION_ID, model.PUBLICATION_CONTENT_TYPE, AUTHOR_ID, "draft")
+        service.record_status_changed(
+            ORGANIZATION_ID, model.PUBLICATION_CONTENT_TYPE, AUTHOR_ID, "draft", "moderation",
+        )
+        service.record_deleted(ORGANIZATION_ID, model.VIDEO_CUT_CONTENT_TYPE, AUTHOR_ID, "draft")
+        service.record_created(ORGANIZATION_ID, model.VIDEO_CUT_CONTENT_TYPE, AUTHOR_ID, "draft", count=3)
+        return await service.get_stats(ORGANIZATION_ID)
+
+    stats = asyncio.run(scenario())
+
+    assert content.loads == 1
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "draft") == 1
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "moderation") == 2
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "moderation", AUTHOR_ID) == 1
+    assert stats.count(model.VIDEO_CUT_CONTENT_TYPE, "draft") == 3
+    assert not service.organizations.get(ORGANIZATION_ID).dirty
+
+
+def test_mutation_during_seed_marks_organization_dirty():
+    content = _ContentService()
+    service = _service(content)
+
+    async def scenario():
+        content.gate = asyncio.Event()
+        first = asyncio.create_task(service.get_stats(ORGANIZATION_ID))
+        await asyncio.sleep(0)
+
+        # Публикация создана, пока выгрузка в пути: сервис ее уже отдает, а счетчики еще нет
+        content.publications.append(_content("draft", AUTHOR_ID))
+        service.record_created(ORGANIZATION_ID, model.PUBLICATION_CONTENT_TYPE, AUTHOR_ID, "draft")
+        content.gate.set()
+        await first
+        assert service.organizations.get(ORGANIZATION_ID).dirty
+
+        # Следующее чтение отдает текущие счетчики и сверяет их в фоне
+        await service.get_stats(ORGANIZATION_ID)
+        await _settle(service)
+        return await service.get_stats(ORGANIZATION_ID)
+
+    stats = asyncio.run(scenario())
+
+    assert content.loads == 2
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "draft") == 2
+    assert not service.organizations.get(ORGANIZATION_ID).dirty
+
+
+def test_unknown_creator_keeps_organization_counters_and_marks_dirty():
+    content = _ContentService()
+    service = _service(content)
+
+    async def scenario():
+        await service.get_stats(ORGANIZATION_ID)
+        service.record_created(ORGANIZATION_ID, model.PUBLICATION_CONTENT_TYPE, None, "draft")
+        return await service.get_stats(ORGANIZATION_ID)
+
+    stats = asyncio.run(scenario())
+
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "draft") == 2
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "draft", AUTHOR_ID) == 1
+    # Чтение уже запустило сверку
+    assert content.loads == 2
+
+
+def test_stale_counters_are_served_and_reconciled_in_background():
+    content = _ContentService()
+    service = _service(content, reconcile_interval=60)
+
+    async def scenario():
+        await service.get_stats(ORGANIZATION_ID)
+        # Контент из веб-интерфейса: бот о нем не знает
+        content.publications.append(_content("approved", OTHER_AUTHOR_ID))
+        service.organizations.get(ORGANIZATION_ID).seeded_at = time.monotonic() - 61
+
+        stale = await service.get_stats(ORGANIZATION_ID)
+        assert stale.count(model.PUBLICATION_CONTENT_TYPE, "approved") == 0
+
+        await _settle(service)
+        return await service.get_stats(ORGANIZATION_ID)
+
+    stats = asyncio.run(scenario())
+
+    assert content.loads == 2
+    assert stats.count(model.PUBLICATION_CONTENT_TYPE, "approved") == 1
+
+
+def test_failed_reconcile_keeps_previous_counters():
+    content = _ContentService()
+    service = _service(content, reconcile_interval=60)
+
+    async def scenario():
+        before = await service.get_stats(ORGANIZATION_ID)
+        service.organizations.get(ORGANIZATION_ID).seeded_at = time.monotonic() - 61
+        content.fail = True
+
+        await service.get_stats(ORGANIZATION_ID)
+        await _settle(service)
+        after = await service.get_stats(ORGANIZATION_ID)
+        return before, after
+
+    before, after = asyncio.run(scenario())
+
+    assert after is before
+    # Повтор отложен на интервал, а не на каждое чтение
+    assert content.loads == 2
+    assert service.logger.records[-1][0] == "error"
+
+
+class _StateService:
+    def __init__(self, state: SimpleNamespace):
+        self.state = state
+        self.alerts: list[dict] = []
+
+    async def state_by_account_id(self, account_id: int) -> list:
+        return [self.state]
+
+    async def create_vizard_video_cut_alert(self, **alert) -> int:
+        self.alerts.append(alert)
+        return len(self.alerts)
+
+
+def test_vizard_webhook_counts_generated_video_cuts_as_drafts():
+    content = _ContentService()
+    service = _service(content)
+    state = SimpleNamespace(
+        id=1, tg_chat_id=42, account_id=AUTHOR_ID, organization_id=ORGANIZATION_ID, can_show_alerts=False,
+    )
+    controller = TelegramWebhookController(
+        NoopTelemetry(),
+        dp=None,
+        bot=None,
+        state_service=_StateService(state),
+        file_cache_service=None,
+        content_stats_service=service,
+        dialog_bg_factory=None,
+        domain="",
+        prefix="",
+        interserver_secret_key="secret",
+    )
+
+    async def scenario():
+        await service.get_stats(ORGANIZATION_ID)
+        response = await controller.notify_vizard_video_cut_generated(NotifyVizardVideoCutGenerated(
+            account_id=AUTHOR_ID,
+            youtube_video_reference="https://youtu.be/video",
+            video_count=3,
+            interserver_secret_key="secret",
+        ))
+        assert response.status_code == 200
+        return await service.get_stats(ORGANIZATION_ID)
+
+    stats = asyncio.run(scenario())
+
+    assert content.loads == 1
+    assert stats.count(model.VIDEO_CUT_CONTENT_TYPE, "draft") == 4
+    assert stats.count(model.VIDEO_CUT_CONTENT_TYPE, "draft", AUTHOR_ID) == 4
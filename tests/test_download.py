@@ -0,0 +1,161 @@
+import asyncio
+import tempfile
+
+import httpx
+import pytest
+
+from pkg.client import client as client_module
+from pkg.client.client import AsyncHTTPClient, CircuitBreakerOpenError
+from pkg.client.deadline import DeadlineExceededError, deadline_scope
+from tests.fakes import RecordingLogger
+
+VIDEO = bytes(range(256)) * 16
+
+
+class _Body(httpx.AsyncByteStream):
+    """Тело ответа чанками: с паузой между ними и, по желанию, обрывом соединения после первого чанка."""
+
+    def __init__(self, chunks: list[bytes], delay: float = 0, broken: bool = False):
+        self.chunks = chunks
+        self.delay = delay
+        self.broken = broken
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield chunk
+            if self.broken:
+                raise httpx.ReadError("connection reset by peer")
+
+
+class _Spools:
+    """Запоминает временные файлы, которые создает spool_get."""
+
+    def __init__(self):
+        # client.py обращается к tempfile.SpooledTemporaryFile модуля — подмена видна и здесь, класс берем заранее
+        self.spooled_file = tempfile.SpooledTemporaryFile
+        self.created: list[tempfile.SpooledTemporaryFile] = []
+
+    def __call__(self, max_size: int) -> tempfile.SpooledTemporaryFile:
+        spool = self.spooled_file(max_size=max_size)
+        self.created.append(spool)
+        return spool
+
+
+def _client(host: str, handler, **kwargs) -> AsyncHTTPClient:
+    client = AsyncHTTPClient(host, 80, concurrency_limit=4, logger=RecordingLogger(), **kwargs)
+    client.session = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.fixture
+def spools(monkeypatch) -> _Spools:
+    spools = _Spools()
+    monkeypatch.setattr(client_module.tempfile, "SpooledTemporaryFile", spools)
+    return spools
+
+
+def test_body_larger_than_memory_limit_rolls_over_to_disk(spools):
+    in_flight: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        in_flight.append(client.limiter.in_flight)
+        return httpx.Response(
+            200,
+            headers={"Content-Disposition": 'attachment; filename="cut.mp4"'},
+            stream=_Body([VIDEO[:1024], VIDEO[1024:]]),
+        )
+
+    client = _client("download-rollover", handler)
+
+    async def scenario():
+        try:
+            large, headers = await client.spool_get("/video-cut/1/download", max_memory_size=2048, chunk_size=512)
+            small, _ = await client.spool_get("/video-cut/2/download", max_memory_size=len(VIDEO) * 2)
+            return large, headers, small
+        finally:
+            await client.close()
+
+    large, headers, small = asyncio.run(scenario())
+
+    assert large._rolled
+    assert large.read() == VIDEO
+    assert headers["Content-Disposition"] == 'attachment; filename="cut.mp4"'
+    assert not small._rolled
+    assert small.read() == VIDEO
+    # Скачивание занимает слот лимитера и отдает его после тела
+    assert in_flight == [1, 1]
+    assert client.limiter.in_flight == 0
+
+
+def test_spool_is_closed_when_download_breaks(spools):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, stream=_Body([VIDEO[:1024], VIDEO[1024:]], broken=True))
+
+    client = _client("download-broken", handler, circuit_breaker_minimum_calls=1)
+
+    async def scenario():
+        try:
+            with pytest.raises(httpx.ReadError):
+                await client.spool_get("/video-cut/1/download", max_memory_size=512)
+            # Обрыв посчитан как сбой upstream: breaker маршрута открыт, следующая загрузка не уходит в сеть
+            with pytest.raises(CircuitBreakerOpenError):
+                await client.spool_get("/video-cut/1/download")
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+    spool, rejected = spools.created
+    assert spool.closed
+    assert rejected.closed
+    assert client.limiter.in_flight == 0
+
+
+def test_error_status_closes_spool_and_raises(spools):
+    client = _client("download-404", lambda request: httpx.Response(404, json={"detail": "not found"}))
+
+    async def scenario():
+        try:
+            with pytest.raises(httpx.HTTPStatusError) as err:
+                await client.spool_get("/video-cut/404/download")
+            return err.value.response
+        finally:
+            await client.close()
+
+    response = asyncio.run(scenario())
+
+    assert response.json() == {"detail": "not found"}
+    assert spools.created[0].closed
+    assert client.limiter.in_flight == 0
+
+
+def test_trickling_download_is_cut_at_update_deadline(spools):
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        # Upstream отдает по чанку в 50 мс — ни одно чтение не упирается в таймаут httpx
+        return httpx.Response(200, stream=_Body([VIDEO[:256]] * 40, delay=0.05))
+
+    client = _client("download-deadline", handler, circuit_breaker_minimum_calls=1)
+
+    async def scenario():
+        try:
+            with deadline_scope(0.3):
+                started_at = asyncio.get_running_loop().time()
+                with pytest.raises(DeadlineExceededError):
+                    await client.spool_get("/video-cut/1/download")
+                elapsed = asyncio.get_running_loop().time() - started_at
+            # Дедлайн — не сбой upstream: breaker маршрута остается закрытым
+            await client.spool_get("/video-cut/2/download", chunk_size=len(VIDEO))
+            return elapsed
+        finally:
+            await client.close()
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < 1
+    assert requests[0].extensions["timeout"]["read"] <= 0.3
+    assert spools.created[0].closed
+    assert client.limiter.in_flight == 0
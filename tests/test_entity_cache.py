@@ -0,0 +1,355 @@
+import asyncio
+import json
+import re
+from dataclasses import fields
+from types import SimpleNamespace
+from typing import get_origin
+
+import httpx
+import pytest
+
+from internal import model
+from internal.dialog.graph import DialogNodes
+from internal.dialog.personal_profile.getter import PersonalProfileGetter
+from pkg.client.internal.loom_content.client import LoomContentClient
+from pkg.client.internal.loom_employee.client import LoomEmployeeClient
+from pkg.client.internal.loom_organization.client import LoomOrganizationClient
+from tests.fakes import NoopTelemetry
+
+ORGANIZATION_ID = 1
+ACCOUNT_ID = 10
+CATEGORY_ID = 5
+
+
+def _payload(cls: type, **values) -> dict:
+    # Полный JSON модели: сервис отдает все поля, а codec не достраивает недостающие
+    empty = {int: 0, str: "", bool: False, list: [], dict: {}}
+    payload = {}
+    for field in fields(cls):
+        field_type = get_origin(field.type) or field.type
+        payload[field.name] = empty.get(field_type, None)
+    payload.update(values)
+    return payload
+
+
+class StandInLoom:
+    """Подмена loom-employee, loom-organization и loom-content с общим состоянием в памяти."""
+
+    def __init__(self):
+        self.employees = {
+            account_id: _payload(
+                model.Employee,
+                id=account_id,
+                organization_id=ORGANIZATION_ID,
+                account_id=account_id,
+                required_moderation=True,
+                name=f"Сотрудник {account_id}",
+                role="employee",
+                created_at="2026-01-15T10:00:00",
+            )
+            for account_id in (ACCOUNT_ID, 11)
+        }
+        self.organizations = {
+            ORGANIZATION_ID: _payload(model.Organization, id=ORGANIZATION_ID, name="Лум", rub_balance="1000"),
+        }
+        self.categories = {
+            CATEGORY_ID: _payload(model.Category, id=CATEGORY_ID, organization_id=ORGANIZATION_ID, name="Новости"),
+        }
+        self.telegram: dict | None = None
+        self.publications = [
+            _payload(
+                model.Publication,
+                id=publication_id,
+                organization_id=ORGANIZATION_ID,
+                creator_id=ACCOUNT_ID,
+                moderator_id=11,
+                moderation_status=status,
+            )
+            for publication_id, status in ((1, "approved"), (2, "rejected"), (3, "draft"))
+        ]
+        self.gets = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            self.gets += 1
+        body = json.loads(request.content) if request.content else {}
+        service, path = re.match(r"/api/(\w+)(/.*)", request.url.path).groups()
+        return getattr(self, service)(request.method, path, body)
+
+    def employee(self, method: str, path: str, body: dict) -> httpx.Response:
+        if method == "GET" and (match := re.fullmatch(r"/account/(\d+)", path)):
+            employee = self.employees.get(int(match[1]))
+            return httpx.Response(200, json=[employee] if employee else [])
+        if method == "GET" and (match := re.fullmatch(r"/organization/(\d+)/employees", path)):
+            employees = [item for item in self.employees.values() if item["organization_id"] == int(match[1])]
+            return httpx.Response(200, json={"employees": employees})
+        if method == "POST" and path == "/create":
+            self.employees[body["account_id"]] = _payload(
+                model.Employee,
+                id=body["account_id"],
+                organization_id=body["organization_id"],
+                account_id=body["account_id"],
+                invited_from_account_id=body["invited_from_account_id"],
+                name=body["name"],
+                role=body["role"],
+            )
+            return httpx.Response(200, json={"employee_id": body["account_id"]})
+        if method == "PUT" and path == "/permissions":
+            self.employees[body.pop("account_id")].update(body)
+            return httpx.Response(200, json={})
+        if method == "PUT" and (match := re.fullmatch(r"/(\d+)/role", path)):
+            self.employees[int(match[1])]["role"] = body["role"]
+            return httpx.Response(200, json={})
+        if method == "DELETE" and (match := re.fullmatch(r"/(\d+)", path)):
+            self.employees.pop(int(match[1]))
+            return httpx.Response(200, json={})
+        return httpx.Response(404)
+
+    def organization(self, method: str, path: str, body: dict) -> httpx.Response:
+        if method in ("GET", "PUT", "DELETE") and (match := re.fullmatch(r"/(\d+)", path)):
+            organization_id = int(match[1])
+            if organization_id not in self.organizations:
+                return httpx.Response(404)
+            if method == "PUT":
+                self.organizations[organization_id].update(body)
+            if method == "DELETE":
+                self.organizations.pop(organization_id)
+            return httpx.Response(200, json=self.organizations.get(organization_id, {}))
+        if method == "POST" and path in ("/balance/top-up", "/balance/debit"):
+            organization = self.organizations[body["organization_id"]]
+            sign = 1 if path.endswith("top-up") else -1
+            organization["rub_balance"] = str(int(organization["rub_balance"]) + sign * body["amount_rub"])
+            return httpx.Response(200, json={})
+        return httpx.Response(404)
+
+    def content(self, method: str, path: str, body: dict) -> httpx.Response:
+        if method == "GET" and re.fullmatch(r"/social-network/organization/\d+", path):
+            return httpx.Response(200, json={"data": {"telegram": [self.telegram] if self.telegram else []}})
+        if method in ("POST", "PUT") and path == "/social-network/telegram":
+            self.telegram = {**(self.telegram or {}), **{key: value for key, value in body.items() if value is not None}}
+            return httpx.Response(200, json={})
+        if method == "DELETE" and re.fullmatch(r"/social-network/telegram/\d+", path):
+            self.telegram = None
+            return httpx.Response(200, json={})
+        if method == "GET" and re.fullmatch(r"/publication/organization/\d+/publications", path):
+            return httpx.Response(200, json=self.publications)
+        if method == "GET" and re.fullmatch(r"/publication/organization/\d+/categories", path):
+            return httpx.Response(200, json=list(self.categories.values()))
+        if method == "POST" and path == "/publication/category":
+            category_id = max(self.categories, default=0) + 1
+            self.categories[category_id] = _payload(
+                model.Category,
+                id=category_id,
+                organization_id=body["organization_id"],
+                prompt_for_image_style=body["prompt_for_image_style"],
+            )
+            return httpx.Response(200, json={"category_id": category_id})
+        if match := re.fullmatch(r"/publication/category/(\d+)", path):
+            category_id = int(match[1])
+            if category_id not in self.categories:
+                return httpx.Response(404)
+            if method == "PUT":
+                self.categories[category_id].update(body)
+            if method == "DELETE":
+                self.categories.pop(category_id)
+            return httpx.Response(200, json=self.categories.get(category_id, {}))
+        return httpx.Response(404)
+
+
+class Clients:
+    def __init__(self, service: StandInLoom, entity_cache_max_size: int):
+        tel = NoopTelemetry()
+        self.employee = LoomEmployeeClient(tel, "loom-employee", 80, entity_cache_max_size=entity_cache_max_size)
+        self.organization = LoomOrganizationClient(
+            tel, "loom-organization", 80, entity_cache_max_size=entity_cache_max_size,
+        )
+        self.content = LoomContentClient(tel, "loom-content", 80, entity_cache_max_size=entity_cache_max_size)
+        for client in (self.employee, self.organization, self.content):
+            client.client.session = httpx.AsyncClient(
+                base_url=client.client.base_url,
+                transport=httpx.MockTransport(service),
+            )
+
+    async def close(self) -> None:
+        for client in (self.employee, self.organization, self.content):
+            await client.client.session.aclose()
+
+
+async def _read(call) -> object:
+    # Удаленная сущность — тоже результат, который кеш не должен подменять старым значением
+    try:
+        return await call
+    except httpx.HTTPStatusError as err:
+        return ("HTTP", err.response.status_code)
+
+
+def _dialog_manager() -> SimpleNamespace:
+    state = model.UserState(
+        id=1,
+        tg_chat_id=500,
+        account_id=ACCOUNT_ID,
+        organization_id=ORGANIZATION_ID,
+        access_token="",
+        refresh_token="",
+        tg_username="anna",
+        can_show_alerts=True,
+        show_error_recovery=False,
+        created_at=None,
+    )
+    return SimpleNamespace(
+        event=SimpleNamespace(message=SimpleNamespace(chat=SimpleNamespace(id=state.tg_chat_id))),
+        middleware_data={"user_state": state},
+        dialog_data={},
+    )
+
+
+async def _getter_sequence(entity_cache_max_size: int) -> tuple[list, int]:
+    service = StandInLoom()
+    clients = Clients(service, entity_cache_max_size)
+    nodes = DialogNodes(None, clients.employee, clients.organization, clients.content)
+    getter = PersonalProfileGetter(
+        NoopTelemetry(), None, clients.employee, clients.organization, clients.content, nodes,
+    )
+
+    async def render() -> dict:
+        return await getter.get_personal_profile_data(_dialog_manager())
+
+    async def snapshot() -> tuple:
+        return (
+            await render(),
+            await _read(clients.organization.get_organization_by_id(ORGANIZATION_ID)),
+            await _read(clients.employee.get_employees_by_organization(ORGANIZATION_ID)),
+            await _read(clients.content.get_social_networks_by_organization(ORGANIZATION_ID)),
+            await _read(clients.content.get_category_by_id(CATEGORY_ID)),
+            await _read(clients.content.get_categories_by_organization(ORGANIZATION_ID)),
+        )
+
+    try:
+        results = [await snapshot(), await snapshot()]
+
+        await clients.employee.update_employee_permissions(ACCOUNT_ID, required_moderation=False)
+        results.append(await snapshot())
+        await clients.employee.update_employee_role(ACCOUNT_ID, "admin")
+        results.append(await snapshot())
+        await clients.organization.update_organization(ORGANIZATION_ID, name="Лум Медиа")
+        await clients.organization.top_up_balance(ORGANIZATION_ID, 500)
+        results.append(await snapshot())
+        await clients.content.create_telegram(ORGANIZATION_ID, "loom_channel", autoselect=True)
+        await clients.content.update_category(CATEGORY_ID, prompt_for_image_style="акварель")
+        results.append(await snapshot())
+        await clients.content.create_category(ORGANIZATION_ID, "графика", "коротко")
+        await clients.employee.delete_employee(11)
+        results.append(await snapshot())
+        return results, service.gets
+    finally:
+        await clients.close()
+
+
+def test_getter_sequence_is_the_same_with_and_without_entity_cache():
+    uncached, uncached_gets = asyncio.run(_getter_sequence(entity_cache_max_size=0))
+    cached, cached_gets = asyncio.run(_getter_sequence(entity_cache_max_size=1000))
+
+    assert cached == uncached
+    # Кеш действительно работал: повторные отрисовки обошлись без части запросов
+    assert cached_gets < uncached_gets
+
+
+# (клиент, мутация, аргументы мутации, чтения, которые она должна освежить)
+INVALIDATION_CASES = [
+    ("employee", "create_employee", (ORGANIZATION_ID, ACCOUNT_ID, 12, "Новый", "employee"), [
+        ("get_employee_by_account_id", 12),
+        ("get_employees_by_organization", ORGANIZATION_ID),
+    ]),
+    ("employee", "update_employee_permissions", (ACCOUNT_ID, False), [
+        ("get_employee_by_account_id", ACCOUNT_ID),
+        ("get_employees_by_organization", ORGANIZATION_ID),
+    ]),
+    ("employee", "update_employee_role", (ACCOUNT_ID, "moderator"), [
+        ("get_employee_by_account_id", ACCOUNT_ID),
+        ("get_employees_by_organization", ORGANIZATION_ID),
+    ]),
+    ("employee", "delete_employee", (ACCOUNT_ID,), [
+        ("get_employee_by_account_id", ACCOUNT_ID),
+        ("get_employees_by_organization", ORGANIZATION_ID),
+    ]),
+    ("organization", "update_organization", (ORGANIZATION_ID, "Лум Медиа"), [
+        ("get_organization_by_id", ORGANIZATION_ID),
+    ]),
+    ("organization", "delete_organization", (ORGANIZATION_ID,), [
+        ("get_organization_by_id", ORGANIZATION_ID),
+    ]),
+    ("organization", "top_up_balance", (ORGANIZATION_ID, 500), [
+        ("get_organization_by_id", ORGANIZATION_ID),
+    ]),
+    ("organization", "debit_balance", (ORGANIZATION_ID, 300), [
+        ("get_organization_by_id", ORGANIZATION_ID),
+    ]),
+    ("content", "create_telegram", (ORGANIZATION_ID, "loom_channel", True), [
+        ("get_social_networks_by_organization", ORGANIZATION_ID),
+    ]),
+    ("content", "update_telegram", (ORGANIZATION_ID, "loom_news", False), [
+        ("get_social_networks_by_organization", ORGANIZATION_ID),
+    ]),
+    ("content", "delete_telegram", (ORGANIZATION_ID,), [
+        ("get_social_networks_by_organization", ORGANIZATION_ID),
+    ]),
+    ("content", "create_category", (ORGANIZATION_ID, "графика", "коротко"), [
+        ("get_categories_by_organization", ORGANIZATION_ID),
+    ]),
+    ("content", "update_category", (CATEGORY_ID, "акварель"), [
+        ("get_category_by_id", CATEGORY_ID),
+        ("get_categories_by_organization", ORGANIZATION_ID),
+    ]),
+    ("content", "delete_category", (CATEGORY_ID,), [
+        ("get_category_by_id", CATEGORY_ID),
+        ("get_categories_by_organization", ORGANIZATION_ID),
+    ]),
+]
+
+
+def test_cases_cover_every_invalidating_mutation():
+    clients_by_name = {
+        "employee": LoomEmployeeClient,
+        "organization": LoomOrganizationClient,
+        "content": LoomContentClient,
+    }
+    declared = {
+        (name, attribute)
+        for name, cls in clients_by_name.items()
+        for attribute, value in vars(cls).items()
+        if hasattr(value, "invalidated_entities")
+    }
+    assert declared == {(client, mutation) for client, mutation, _, _ in INVALIDATION_CASES}
+
+
+@pytest.mark.parametrize(
+    "client_name, mutation, args, reads",
+    INVALIDATION_CASES,
+    ids=[mutation for _, mutation, _, _ in INVALIDATION_CASES],
+)
+def test_mutation_evicts_cached_entries(client_name, mutation, args, reads):
+    async def scenario():
+        service = StandInLoom()
+        if mutation == "update_telegram":
+            service.telegram = {"organization_id": ORGANIZATION_ID, "tg_channel_username": "loom_channel"}
+        cached = Clients(service, entity_cache_max_size=1000)
+        uncached = Clients(service, entity_cache_max_size=0)
+        try:
+            client = getattr(cached, client_name)
+            for reader, key in reads:
+                before = await _read(getattr(client, reader)(key))
+                gets = service.gets
+                assert await _read(getattr(client, reader)(key)) == before
+                assert service.gets == gets, f"{reader} не попал в кеш"
+
+            await getattr(client, mutation)(*args)
+
+            for reader, key in reads:
+                after = await _read(getattr(client, reader)(key))
+                fresh = await _read(getattr(getattr(uncached, client_name), reader)(key))
+                assert after == fresh, f"{mutation} не сбросил {reader}({key})"
+        finally:
+            await cached.close()
+            await uncached.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,182 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from internal import model
+from internal.dialog.graph import SHARED_SCOPE_KEY, DialogNodes, GetterGraph, Node
+
+TG_CHAT_ID = 500
+
+
+def _state() -> model.UserState:
+    return model.UserState(
+        id=1,
+        tg_chat_id=TG_CHAT_ID,
+        account_id=10,
+        organization_id=1,
+        access_token="",
+        refresh_token="",
+        tg_username="anna",
+        can_show_alerts=True,
+        show_error_recovery=False,
+        created_at=None,
+    )
+
+
+def _dialog_manager() -> SimpleNamespace:
+    # Новый dialog_manager — новый апдейт: своя middleware_data и свой кеш общих узлов
+    return SimpleNamespace(
+        event=SimpleNamespace(message=SimpleNamespace(chat=SimpleNamespace(id=TG_CHAT_ID))),
+        middleware_data={"user_state": _state()},
+        dialog_data={},
+    )
+
+
+class _Upstream:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def get_employee_by_account_id(self, account_id: int):
+        self.calls.append("employee")
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(account_id=account_id, organization_id=1)
+
+    async def get_organization_by_id(self, organization_id: int):
+        self.calls.append("organization")
+        return SimpleNamespace(id=organization_id)
+
+    async def get_social_networks_by_organization(self, organization_id: int):
+        self.calls.append("social_networks")
+        return {}
+
+
+def test_nodes_start_when_dependencies_finish_and_independent_nodes_overlap():
+    events: list[str] = []
+
+    def step(name: str, delay: float):
+        async def run(**_):
+            events.append(f"{name}:start")
+            await asyncio.sleep(delay)
+            events.append(f"{name}:end")
+            return name
+        return run
+
+    first = step("first", 0.02)
+    second = step("second", 0.01)
+    third = step("third", 0.0)
+    independent = step("independent", 0.01)
+
+    graph = GetterGraph(
+        Node("first", lambda: first()),
+        Node("second", lambda first: second()),
+        Node("third", lambda first, second: third()),
+        Node("independent", lambda: independent()),
+    )
+
+    fetched = asyncio.run(graph.resolve(_dialog_manager(), "third", "independent"))
+
+    assert fetched == {"third": "third", "independent": "independent"}
+    assert events.index("first:end") < events.index("second:start")
+    assert events.index("second:end") < events.index("third:start")
+    # Независимый узел не ждет цепочку
+    assert events.index("independent:start") < events.index("first:end")
+
+
+def test_node_may_return_plain_value():
+    graph = GetterGraph(
+        Node("window", lambda: None),
+        Node("creator", lambda window: window and asyncio.sleep(0, "creator")),
+    )
+
+    assert asyncio.run(graph.resolve(_dialog_manager(), "creator")) == {"creator": None}
+
+
+def test_unknown_dependency_is_rejected_at_build_time():
+    with pytest.raises(ValueError, match="неизвестных"):
+        GetterGraph(Node("creator", lambda window: window))
+
+
+def test_cycle_is_rejected_at_build_time():
+    with pytest.raises(ValueError, match="цикл"):
+        GetterGraph(
+            Node("a", lambda c: c),
+            Node("b", lambda a: a),
+            Node("c", lambda b: b),
+        )
+
+
+def test_shared_nodes_are_resolved_once_per_update_across_getters():
+    upstream = _Upstream()
+    nodes = DialogNodes(None, upstream, upstream, upstream)
+    moderation = GetterGraph(*nodes.all(), Node("window", lambda current_employee: current_employee.account_id))
+    profile = GetterGraph(*nodes.all(), Node("publications", lambda state: state.organization_id))
+
+    async def scenario():
+        dialog_manager = _dialog_manager()
+        # Два геттера одного окна рендерятся одновременно в рамках одного апдейта
+        first, second = await asyncio.gather(
+            moderation.resolve(dialog_manager, "window", "current_employee"),
+            profile.resolve(dialog_manager, "publications", "current_employee", "organization"),
+        )
+        assert first["current_employee"] is second["current_employee"]
+        await profile.resolve(dialog_manager, "current_employee")
+        assert upstream.calls.count("employee") == 1
+
+        # Следующий апдейт запрашивает данные заново
+        await profile.resolve(_dialog_manager(), "current_employee")
+
+    asyncio.run(scenario())
+
+    assert upstream.calls.count("employee") == 2
+    assert upstream.calls.count("organization") == 1
+    assert "social_networks" not in upstream.calls
+
+
+def test_state_node_uses_prefetched_state():
+    nodes = DialogNodes(None, _Upstream(), _Upstream(), _Upstream())
+    dialog_manager = _dialog_manager()
+
+    fetched = asyncio.run(GetterGraph(*nodes.all()).resolve(dialog_manager, "state"))
+
+    assert fetched["state"] is dialog_manager.middleware_data["user_state"]
+
+
+def test_first_error_cancels_local_nodes_but_not_shared_ones():
+    cancelled: list[str] = []
+    finished: list[str] = []
+
+    async def slow(name: str):
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        finished.append(name)
+        return name
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    shared = Node("shared", lambda: slow("shared"), shared=True)
+    graph = GetterGraph(
+        shared,
+        Node("local", lambda: slow("local")),
+        Node("failing", lambda: fail()),
+        Node("after_failing", lambda failing: slow("after_failing")),
+    )
+
+    async def scenario():
+        dialog_manager = _dialog_manager()
+        with pytest.raises(RuntimeError, match="upstream failed"):
+            await graph.resolve(dialog_manager, "shared", "local", "after_failing")
+
+        # Общий узел может ждать другой геттер того же апдейта — он дорабатывает
+        shared_future = dialog_manager.middleware_data[SHARED_SCOPE_KEY][shared]
+        assert await shared_future == "shared"
+
+    asyncio.run(scenario())
+
+    assert cancelled == ["local"]
+    assert finished == ["shared"]
@@ -0,0 +1,181 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from pkg.client.client import AsyncHTTPClient
+from pkg.client.multipart import StreamingMultipart
+from pkg.tg.file import stream_telegram_file
+from tests.fakes import RecordingLogger
+
+
+class _Source:
+    """Асинхронный источник файла, который считает, сколько раз его начали и дочитали."""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = chunks
+        self.started = 0
+        self.pulled = 0
+
+    async def __aiter__(self):
+        self.started += 1
+        for chunk in self.chunks:
+            self.pulled += 1
+            yield chunk
+
+
+class _Upstream:
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+        self.requests: list[tuple[httpx.Request, bytes]] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request, await request.aread()))
+        return httpx.Response(self.status_code, json={"text": "ok"})
+
+
+def _client(host: str, upstream: _Upstream) -> AsyncHTTPClient:
+    client = AsyncHTTPClient(host, 80, retry_count=3, circuit_breaker_enabled=False, logger=RecordingLogger())
+    client.session = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(upstream))
+    return client
+
+
+def test_body_has_field_and_file_parts_between_boundaries():
+    source = _Source(b"voice-", b"chunk")
+    body = StreamingMultipart(
+        {"organization_id": 1, "draft": True, "note": None},
+        {
+            "audio_file": ("voice.mp4", source, "audio/mp4"),
+            "image_file": ("cover.jpg", b"\xff\xd8jpeg", "image/jpeg"),
+        },
+    )
+
+    async def drain() -> list[bytes]:
+        return [chunk async for chunk in body]
+
+    chunks = asyncio.run(drain())
+
+    boundary = body.boundary
+    assert body.content_type == f"multipart/form-data; boundary={boundary}"
+    assert b"".join(chunks) == (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="organization_id"\r\n\r\n'
+        "1\r\n"
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="draft"\r\n\r\n'
+        "true\r\n"
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "\r\n"
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="audio_file"; filename="voice.mp4"\r\n'
+        "Content-Type: audio/mp4\r\n\r\n"
+        "voice-chunk\r\n"
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="image_file"; filename="cover.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + b"\xff\xd8jpeg\r\n" + f"--{boundary}--\r\n".encode()
+    # Чанки источника уходят в тело как есть, без склейки в памяти
+    assert b"voice-" in chunks and b"chunk" in chunks
+
+
+def test_every_body_gets_its_own_boundary():
+    assert StreamingMultipart().boundary != StreamingMultipart().boundary
+
+
+def test_upload_streams_body_through_httpx():
+    upstream = _Upstream()
+    client = _client("multipart-upload", upstream)
+    source = _Source(b"a" * 10, b"b" * 10)
+
+    async def scenario():
+        try:
+            response = await client.upload(
+                "POST", "/publication/audio/transcribe",
+                data={"organization_id": 1},
+                files={"audio_file": ("voice.mp4", source, "audio/mp4")},
+            )
+            assert response.json() == {"text": "ok"}
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+    (request, content), = upstream.requests
+    content_type = request.headers["Content-Type"]
+    assert content_type.startswith("multipart/form-data; boundary=")
+    # Длина тела заранее неизвестна — httpx отправляет его чанками
+    assert request.headers["Transfer-Encoding"] == "chunked"
+    assert "Content-Length" not in request.headers
+
+    boundary = content_type.split("boundary=")[1]
+    assert content.startswith(f"--{boundary}\r\n".encode())
+    assert content.endswith(f"--{boundary}--\r\n".encode())
+    assert b"a" * 10 + b"b" * 10 + b"\r\n" in content
+
+
+def test_failed_upload_is_not_retried_and_reads_source_once():
+    upstream = _Upstream(status_code=503)
+    client = _client("multipart-no-retry", upstream)
+    source = _Source(b"voice")
+
+    async def scenario():
+        try:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.upload(
+                    "POST", "/publication/audio/transcribe",
+                    files={"audio_file": ("voice.mp4", source, "audio/mp4")},
+                )
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+    # Повтор отправил бы пустой файл: итератор уже исчерпан
+    assert len(upstream.requests) == 1
+    assert source.started == 1
+    assert source.pulled == 1
+
+
+class _BotSession:
+    def __init__(self, is_local: bool):
+        self.api = SimpleNamespace(is_local=is_local, file_url=lambda token, path: f"https://files/{token}/{path}")
+        self.streamed: list[tuple[str, int]] = []
+
+    async def stream_content(self, url: str, chunk_size: int, raise_for_status: bool):
+        self.streamed.append((url, chunk_size))
+        for chunk in (b"first", b"second"):
+            yield chunk
+
+
+class _Bot:
+    def __init__(self, is_local: bool = False):
+        self.token = "token"
+        self.session = _BotSession(is_local)
+
+    async def get_file(self, file_id: str):
+        return SimpleNamespace(file_path=f"voice/{file_id}.oga")
+
+    async def download_file(self, file_path: str, chunk_size: int):
+        return SimpleNamespace(read=lambda: b"local-file")
+
+
+def test_telegram_file_is_streamed_from_bot_api_in_chunks():
+    bot = _Bot()
+
+    async def drain() -> list[bytes]:
+        return [chunk async for chunk in stream_telegram_file(bot, "file-1", chunk_size=1024)]
+
+    assert asyncio.run(drain()) == [b"first", b"second"]
+    assert bot.session.streamed == [("https://files/token/voice/file-1.oga", 1024)]
+
+
+def test_local_bot_api_file_is_read_from_disk():
+    bot = _Bot(is_local=True)
+
+    async def drain() -> list[bytes]:
+        return [chunk async for chunk in stream_telegram_file(bot, "file-1")]
+
+    assert asyncio.run(drain()) == [b"local-file"]
+    assert bot.session.streamed == []
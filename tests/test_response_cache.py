@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import httpx
+
+from pkg.client.client import AsyncHTTPClient
+from pkg.client.response_cache import ResponseCacheRule
+from tests.fakes import RecordingLogger
+
+
+def _client(host: str, handler) -> AsyncHTTPClient:
+    client = AsyncHTTPClient(
+        host,
+        80,
+        response_cache_rules=[ResponseCacheRule(route="/employee/{id}", ttl=60)],
+        response_cache_max_bytes=1024 * 1024,
+        circuit_breaker_enabled=False,
+        logger=RecordingLogger(),
+    )
+    client.session = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_stale_entry_is_revalidated_by_304():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json={"id": 1, "name": "Анна"}, headers={"ETag": '"v1"'})
+
+    async def scenario():
+        client = _client("revalidate-304", handler)
+        try:
+            first = await client.get("/employee/1")
+            assert first.json() == {"id": 1, "name": "Анна"}
+
+            entry = client.response_cache.get(("/employee/1", ()))
+            entry.expires_at = time.monotonic() - 1
+
+            second = await client.get("/employee/1")
+            assert second.status_code == 200
+            assert second.json() == {"id": 1, "name": "Анна"}
+            assert entry.is_fresh
+            assert entry.expires_at > time.monotonic() + 30
+
+            # Обновленная запись снова отдается без запроса
+            await client.get("/employee/1")
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+    assert len(requests) == 2
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == '"v1"'
+
+
+def test_304_without_conditional_request_is_an_error():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(304)
+
+    async def scenario():
+        client = _client("unexpected-304", handler)
+        try:
+            await client.get("/employee/1")
+        finally:
+            await client.close()
+
+    try:
+        asyncio.run(scenario())
+    except httpx.HTTPStatusError as err:
+        assert err.response.status_code == 304
+    else:
+        raise AssertionError("304 без If-None-Match должен остаться ошибкой")
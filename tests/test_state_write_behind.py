@@ -0,0 +1,107 @@
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+from internal.repo.state import query
+from internal.repo.state.repo import StateRepo
+from tests.fakes import NoopTelemetry
+
+STATE_ID = 7
+TG_CHAT_ID = 1_000_000_007
+
+
+def _row() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=STATE_ID,
+        tg_chat_id=TG_CHAT_ID,
+        account_id=1,
+        organization_id=1,
+        access_token="",
+        refresh_token="",
+        tg_username="user",
+        can_show_alerts=True,
+        show_error_recovery=False,
+        created_at=datetime.datetime(2026, 1, 1),
+    )
+
+
+class _DB:
+    """Записывает каждый round trip; отвечает только на запросы, которые нужны отложенной записи."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+
+    async def select(self, sql: str, params: dict) -> list:
+        self.calls.append(("select", sql))
+        if sql == query.tg_chat_id_by_state_id:
+            return [(TG_CHAT_ID,)]
+        return [_row()]
+
+    async def read_only_select(self, sql: str, params: dict) -> list:
+        self.calls.append(("read_only_select", sql))
+        return [_row()]
+
+    async def execute_returning(self, sql: str, params: dict) -> list:
+        self.calls.append(("execute_returning", sql))
+        return [SimpleNamespace(id=state_id, tg_chat_id=TG_CHAT_ID) for state_id in params["state_ids"]]
+
+
+class _Redis:
+    def __init__(self):
+        self.deleted: list[str] = []
+
+    async def get(self, key: str, default=None):
+        return default
+
+    async def set(self, key: str, value, ttl: int = None) -> bool:
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        self.deleted.extend(keys)
+        return len(keys)
+
+
+def _repo(db: _DB, redis: _Redis) -> StateRepo:
+    return StateRepo(NoopTelemetry(), db, redis, write_behind_interval=60)
+
+
+def test_buffered_flag_write_for_unknown_chat_makes_no_round_trip():
+    db, redis = _DB(), _Redis()
+    repo = _repo(db, redis)
+
+    async def scenario():
+        await repo.change_user_state(STATE_ID, can_show_alerts=False)
+        assert db.calls == []
+        assert redis.deleted == []
+
+        repo.flush_task.cancel()
+        await repo.flush_pending_writes()
+
+    asyncio.run(scenario())
+
+    assert db.calls == [("execute_returning", query.flush_state_flags)]
+    # Чат пришел из RETURNING сброса: кеш других инстансов очищен, чтение идет с основного инстанса
+    assert redis.deleted == [f"user_state:{TG_CHAT_ID}"]
+    assert TG_CHAT_ID in repo.recent_state_writes
+
+
+def test_buffered_flag_write_takes_chat_from_update_scope():
+    db, redis = _DB(), _Redis()
+    repo = _repo(db, redis)
+
+    async def scenario():
+        with repo.update_scope():
+            state = (await repo.state_by_id(TG_CHAT_ID))[0]
+            # Индекс state_id -> чат вытеснен, но состояние апдейта все еще в scope
+            repo.state_chat_ids.delete(STATE_ID)
+            reads = len(db.calls)
+
+            await repo.change_user_state(STATE_ID, show_error_recovery=True)
+
+            assert len(db.calls) == reads
+            assert state.show_error_recovery is True
+        repo.flush_task.cancel()
+
+    asyncio.run(scenario())
+
+    assert redis.deleted == [f"user_state:{TG_CHAT_ID}"]
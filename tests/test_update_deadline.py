@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import datetime
+
+import httpx
+from aiogram import Bot, Dispatcher
+from aiogram.types import Chat, Message, Update, User
+
+from internal.app.tg.app import include_tg_state_middleware
+from internal.controller.tg.middleware.middleware import TgMiddleware
+from pkg.client.client import AsyncHTTPClient
+from pkg.client.deadline import DeadlineExceededError, current_deadline
+from tests.fakes import NoopTelemetry, RecordingLogger
+
+
+class _StateService:
+    def __init__(self):
+        self.requested_chat_ids: list[int] = []
+
+    def update_scope(self):
+        return contextlib.nullcontext()
+
+    async def state_by_id(self, tg_chat_id: int) -> list:
+        self.requested_chat_ids.append(tg_chat_id)
+        return []
+
+
+def _message_update(chat_id: int) -> Update:
+    return Update(
+        update_id=1,
+        message=Message(
+            message_id=1,
+            date=datetime.datetime.now(datetime.timezone.utc),
+            chat=Chat(id=chat_id, type="private"),
+            from_user=User(id=chat_id, is_bot=False, first_name="Тест"),
+            text="привет",
+        ),
+    )
+
+
+def test_update_handler_runs_inside_deadline_scope():
+    state_service = _StateService()
+    bot = Bot("123456:TEST-token")
+    dp = Dispatcher()
+    include_tg_state_middleware(dp, TgMiddleware(
+        NoopTelemetry(),
+        state_service,
+        bot,
+        dialog_bg_factory=None,
+        update_deadline=30,
+        generation_deadline=240,
+    ))
+
+    seen = []
+
+    @dp.message()
+    async def handler(message: Message):
+        deadline = current_deadline()
+        seen.append((deadline.remaining(), deadline.remaining(long_running=True)))
+
+    async def scenario():
+        try:
+            await dp.feed_update(bot, _message_update(42))
+        finally:
+            await bot.session.close()
+
+    asyncio.run(scenario())
+
+    assert len(seen) == 1
+    remaining, long_remaining = seen[0]
+    assert 0 < remaining <= 30
+    assert 30 < long_remaining <= 240
+    assert state_service.requested_chat_ids == [42]
+    # Бюджет живет только в рамках апдейта
+    assert current_deadline() is None
+
+
+def test_shared_get_is_rerun_under_follower_deadline():
+    # Апдейт A почти исчерпал бюджет, апдейт B пришел позже и присоединился к тому же GET
+    upstream_delay = 0.4
+    requested_timeouts: list[float] = []
+
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        # Как настоящий транспорт: read-таймаут запроса обрывает медленный ответ
+        timeout = request.extensions["timeout"]["read"]
+        requested_timeouts.append(timeout)
+        if timeout < upstream_delay:
+            await asyncio.sleep(timeout)
+            raise httpx.ReadTimeout("timed out", request=request)
+        await asyncio.sleep(upstream_delay)
+        return httpx.Response(200, json={"id": 1})
+
+    client = AsyncHTTPClient("singleflight-deadline", 80, circuit_breaker_enabled=False, logger=RecordingLogger())
+    client.session = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(upstream))
+
+    bot = Bot("123456:TEST-token")
+    dp = Dispatcher()
+    include_tg_state_middleware(dp, TgMiddleware(
+        NoopTelemetry(),
+        _StateService(),
+        bot,
+        dialog_bg_factory=None,
+        update_deadline=1.0,
+        generation_deadline=240,
+    ))
+
+    outcomes: dict[int, object] = {}
+
+    @dp.message()
+    async def handler(message: Message):
+        if message.chat.id == 1:
+            await asyncio.sleep(0.9)
+        try:
+            outcomes[message.chat.id] = (await client.get("/employee/1")).json()
+        except DeadlineExceededError as err:
+            outcomes[message.chat.id] = err
+
+    async def late_update():
+        await asyncio.sleep(0.92)
+        await dp.feed_update(bot, _message_update(2))
+
+    async def scenario():
+        try:
+            await asyncio.gather(dp.feed_update(bot, _message_update(1)), late_update())
+        finally:
+            await client.close()
+            await bot.session.close()
+
+    asyncio.run(scenario())
+
+    assert isinstance(outcomes[1], DeadlineExceededError)
+    # B не получил чужую ошибку дедлайна, а повторил запрос со своим бюджетом
+    assert outcomes[2] == {"id": 1}
+    assert len(requested_timeouts) == 2
+    assert requested_timeouts[0] < 0.2
+    assert requested_timeouts[1] > upstream_delay